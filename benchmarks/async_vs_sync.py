@@ -0,0 +1,67 @@
+"""
+Compares the sync DRF dashboard views with their native async versions under uvicorn.
+
+    python -m benchmarks.async_vs_sync --concurrency 32 --duration 10
+
+Uses the database in BENCHMARK_DB, the project's by default (see benchmarks/settings.py;
+seed it first, e.g. with `manage.py populate_jobs`) and needs uvicorn installed.
+"""
+import argparse
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from dashboard.models import Job
+from login.tokens import issueToken
+from benchmarks.common import Server, print_table, run_load
+
+
+
+def scenarios(job_ids):
+    def job_body(i):
+        return {'jobId': job_ids[i % len(job_ids)]}
+
+    def list_body(i):
+        return {'minimumSalary': 10 * (i % 5), 'page_number': i % 5 + 1, 'page_size': 10}
+
+    return [
+        ('get-jobs-list', list_body),
+        ('get-job-details', job_body),
+        ('get-similar-jobs', job_body),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    job_ids = list(Job.objects.values_list('job_id', flat=True)[:1000])
+    if not job_ids:
+        raise SystemExit("No jobs in the database, run `manage.py populate_jobs` first.")
+
+    bodies = dict(scenarios(job_ids))
+    headers = {'Authorization': f'Bearer {issueToken("rahul")}'}
+    rows = []
+    with Server(workers=args.workers) as server:
+        for endpoint, make_body in scenarios(job_ids):
+            for mode, path in (('sync', f'/dashboard/{endpoint}'), ('async', f'/dashboard/async/{endpoint}')):
+                result = run_load(server.port, path, make_body, args.concurrency, args.duration, headers)
+                rows.append({'endpoint': endpoint, 'mode': mode, **result})
+
+        # The job page in one async call versus the two sync calls a client makes today
+        rows.append({
+            'endpoint': 'job page (details + similar)', 'mode': 'async',
+            **run_load(server.port, '/dashboard/async/get-job-page', bodies['get-job-details'], args.concurrency, args.duration, headers),
+        })
+
+    print_table(rows, ['endpoint', 'mode', 'requests', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'statuses'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmarks TokenAuthenticationMiddleware under a flood of bad tokens.
+
+    python -m benchmarks.auth_rejection --requests 5000
+    python -m benchmarks.auth_rejection --server --concurrency 32 --duration 10
+
+In-process mode sends requests through the full Django handler with the test
+client; --server floods a uvicorn process instead (needs uvicorn installed).
+A valid-token get-jobs-list call is measured alongside for scale.
+"""
+import argparse
+import logging
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from django.conf import settings
+from django.test import Client
+
+from login.tokens import issueToken
+from benchmarks.common import Server, print_table, run_load
+
+# A well-formed token signed with a different key
+FORGED_TOKEN = issueToken('rahul')[:-6] + 'AAAAAA'
+
+PAGE_BODY = {"page_number": 1, "page_size": 10, "count_mode": "none"}
+
+
+def scenarios():
+    valid = issueToken('rahul')
+    return [
+        ('forged bearer token', {'Authorization': f'Bearer {FORGED_TOKEN}'}, PAGE_BODY),
+        ('garbage bearer token', {'Authorization': 'Bearer abc'}, PAGE_BODY),
+        ('no token', {}, PAGE_BODY),
+        ('forged body token', {}, {**PAGE_BODY, "token": FORGED_TOKEN}),
+        ('valid bearer token', {'Authorization': f'Bearer {valid}'}, PAGE_BODY),
+    ]
+
+
+def run_in_process(requests):
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    # Every rejection would otherwise log a "Bad Request" warning
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    client = Client()
+    rows = []
+    for name, headers, body in scenarios():
+        statuses = {}
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = client.post('/dashboard/get-jobs-list', body, content_type='application/json', headers=headers)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+        rows.append({
+            'scenario': name,
+            'requests': requests,
+            'throughput': requests / elapsed,
+            'us_per_request': elapsed / requests * 1e6,
+            'statuses': statuses,
+        })
+    print_table(rows, ['scenario', 'requests', 'throughput', 'us_per_request', 'statuses'])
+
+
+def run_against_server(concurrency, duration):
+    rows = []
+    with Server() as server:
+        for name, headers, body in scenarios():
+            result = run_load(server.port, '/dashboard/get-jobs-list', lambda i: body, concurrency, duration, headers)
+            rows.append({'scenario': name, **result})
+    print_table(rows, ['scenario', 'requests', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'statuses'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--server', action='store_true')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.server:
+        run_against_server(args.concurrency, args.duration)
+    else:
+        run_in_process(args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Helpers shared by the benchmark scripts: starting an ASGI server in a subprocess
+and driving it with concurrent keep-alive HTTP clients.
+"""
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """
+    Runs `uvicorn config.asgi:application` in a subprocess for the duration of a with-block.
+    """
+
+    def __init__(self, workers=1, settings_module=None, extra_env=None):
+        self.port = free_port()
+        self.workers = workers
+        self.env = dict(os.environ, **(extra_env or {}))
+        if settings_module:
+            self.env['DJANGO_SETTINGS_MODULE'] = settings_module
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+                '--port', str(self.port), '--workers', str(self.workers),
+                '--log-level', 'warning', '--no-access-log',
+            ],
+            cwd=BASE_DIR,
+            env=self.env,
+            # Request warnings logged by the server would drown the results
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.2).close()
+                return self
+            except OSError:
+                if self.process.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup, run `uvicorn config.asgi:application` to see why")
+                time.sleep(0.1)
+        raise RuntimeError("uvicorn did not start listening in time")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(port, path, make_body, concurrency=16, duration=10.0, headers=None):
+    """
+    POSTs JSON bodies from make_body(i) to path with `concurrency` keep-alive clients
+    for `duration` seconds. Returns throughput, latency percentiles (ms), status counts and
+    the mean response body size as sent (compressed when the headers ask for it), plus the
+    mean queries per request when the server sends X-Query-Count (benchmarks.settings).
+    """
+    latencies = []
+    statuses = {}
+    query_counts = []
+    body_sizes = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    request_headers = {'Content-Type': 'application/json', **(headers or {})}
+
+    def client(client_index):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local_latencies = []
+        local_statuses = {}
+        local_query_counts = []
+        local_body_sizes = []
+        i = client_index
+        while time.monotonic() < stop_at:
+            body = json.dumps(make_body(i))
+            started = time.perf_counter()
+            connection.request('POST', path, body=body, headers=request_headers)
+            response = connection.getresponse()
+            content = response.read()
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            local_body_sizes.append(len(content))
+            local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+            query_count = response.getheader('X-Query-Count')
+            if query_count is not None:
+                local_query_counts.append(int(query_count))
+            i += concurrency
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            query_counts.extend(local_query_counts)
+            body_sizes.extend(local_body_sizes)
+            for code, count in local_statuses.items():
+                statuses[code] = statuses.get(code, 0) + count
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.fmean(latencies) if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'queries': statistics.fmean(query_counts) if query_counts else None,
+        'bytes': statistics.fmean(body_sizes) if body_sizes else 0.0,
+        'statuses': statuses,
+    }
+
+
+def print_table(rows, columns):
+    """
+    Prints a list of dicts as an aligned text table.
+    """
+    widths = {column: max(len(column), *(len(format_cell(row.get(column))) for row in rows)) for column in columns}
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print('  '.join(format_cell(row.get(column)).ljust(widths[column]) for column in columns))
+
+
+def format_cell(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
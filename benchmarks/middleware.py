@@ -0,0 +1,70 @@
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+
+QUERY_COUNT_HEADER = 'X-Query-Count'
+
+# [queries] of the request being handled, None outside a request
+current_query_count = ContextVar('current_query_count', default=None)
+
+
+def countQuery(execute, sql, params, many, context):
+    counter = current_query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def instrumentConnection(sender, connection, **kwargs):
+    # Installed on every connection, like config.instrumentation.timeQuery: the request
+    # is found through current_query_count, which follows the ORM calls of async views
+    # into the threads sync_to_async runs them in
+    if countQuery not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, countQuery)
+
+
+connection_created.connect(instrumentConnection, dispatch_uid='benchmarks.middleware')
+
+
+class QueryCountMiddleware:
+    """
+    Adds the number of SQL queries run while handling the request as an
+    X-Query-Count response header. Only installed by benchmarks.settings.
+    Runs natively under both WSGI and ASGI, so async views are not pushed through
+    a sync_to_async / async_to_sync hop by it.
+    Streaming responses (export-jobs) get no header: their queries run while the
+    body is sent, after the headers went out.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = [0]
+        token = current_query_count.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_query_count.reset(token)
+        return self.addHeader(response, counter)
+
+    async def __acall__(self, request):
+        counter = [0]
+        token = current_query_count.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_query_count.reset(token)
+        return self.addHeader(response, counter)
+
+    def addHeader(self, response, counter):
+        if not response.streaming:
+            response[QUERY_COUNT_HEADER] = str(counter[0])
+        return response
@@ -0,0 +1,148 @@
+"""
+Compares the production database profile in config/settings.py (persistent
+connections, WAL, mmap, busy_timeout) with Django's SQLite defaults under mixed
+read/write load.
+
+    python -m benchmarks.mixed_load --size 100000 --concurrency 16 --duration 10
+
+For each profile, concurrent HTTP clients read get-jobs-list pages and similar jobs
+from a uvicorn process (needs uvicorn installed). Meanwhile a separate writer process
+updates random jobs through Job.save(), so the signal handlers run as they would for
+any other write. Both use a copy of the benchmarks.suite dataset of that size.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from django.db import OperationalError, transaction
+
+from dashboard.models import Job
+from login.tokens import issueToken
+from benchmarks.common import BASE_DIR, Server, percentile, print_table, run_load
+from benchmarks.suite import DATA_DIR, JOB_ID_PREFIX, seed_dataset
+
+PROFILES = ('basic', 'production')
+
+
+def write_load(size, duration, writes_per_second=None):
+    """
+    Updates random jobs for `duration` seconds, one transaction per write.
+    Returns write throughput, latency percentiles (ms) and the number of failed writes.
+    """
+    rng = random.Random(1)
+    interval = 1 / writes_per_second if writes_per_second else 0
+    latencies = []
+    errors = 0
+    started_at = time.monotonic()
+    stop_at = started_at + duration
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                job = Job.objects.get(job_id=f"{JOB_ID_PREFIX}{rng.randrange(size):08d}")
+                job.stars = rng.randint(1, 5)
+                job.salary = rng.randint(1, 60)
+                job.save(update_fields=['stars', 'salary'])
+        except OperationalError:
+            errors += 1
+        else:
+            latencies.append((time.perf_counter() - started) * 1000)
+        if interval:
+            time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+    elapsed = time.monotonic() - started_at
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'mean_ms': statistics.fmean(latencies) if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'statuses': {'errors': errors},
+    }
+
+
+def run_profile(profile, dataset, args):
+    database = DATA_DIR / f'mixed-{profile}.sqlite3'
+    shutil.copyfile(dataset, database)
+    env = {'BENCHMARK_DB': str(database), 'BENCHMARK_DB_PROFILE': profile}
+    headers = {'Authorization': f'Bearer {issueToken("rahul")}'}
+    size = args.size
+
+    def list_body(i):
+        # count_mode none so every request reads the Job table rather than a cached count
+        return {'minimumSalary': 10 * (i % 4), 'page_number': i % 50 + 1, 'page_size': 10, 'count_mode': 'none'}
+
+    def similar_body(i):
+        return {'jobId': f"{JOB_ID_PREFIX}{(i * 7919) % size:08d}"}
+
+    readers = [
+        ('get-jobs-list', '/dashboard/get-jobs-list', list_body),
+        ('get-similar-jobs', '/dashboard/get-similar-jobs', similar_body),
+    ]
+    rows = []
+    try:
+        with Server(workers=args.server_workers, settings_module='benchmarks.settings', extra_env=env) as server:
+            writer = subprocess.Popen(
+                [sys.executable, '-m', 'benchmarks.mixed_load', '--writer', '--size', str(size),
+                 '--duration', str(args.duration), '--writes-per-second', str(args.writes_per_second or 0)],
+                cwd=BASE_DIR, env=dict(os.environ, **env), stdout=subprocess.PIPE,
+            )
+            results = {}
+
+            def read(name, path, make_body):
+                results[name] = run_load(server.port, path, make_body, max(1, args.concurrency // len(readers)), args.duration, headers)
+
+            threads = [threading.Thread(target=read, args=reader) for reader in readers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            write_result = json.loads(writer.communicate()[0])
+
+        for name, _, _ in readers:
+            rows.append({'profile': profile, 'load': f'read {name}', **results[name]})
+        rows.append({'profile': profile, 'load': 'write Job.save()', **write_result})
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            DATA_DIR.joinpath(database.name + suffix).unlink(missing_ok=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--concurrency', type=int, default=16, help="Reading clients, split over the read endpoints")
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--writes-per-second', type=float, default=None, help="Cap on the writer, unbounded by default")
+    parser.add_argument('--server-workers', type=int, default=1)
+    parser.add_argument('--seed-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--writer', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.writer:
+        print(json.dumps(write_load(args.size, args.duration, args.writes_per_second)))
+        return
+
+    dataset = seed_dataset(args.size, args.seed_workers)
+    rows = []
+    for profile in PROFILES:
+        rows.extend(run_profile(profile, dataset, args))
+    print_table(rows, ['profile', 'load', 'requests', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'statuses'])
+
+
+if __name__ == '__main__':
+    main()
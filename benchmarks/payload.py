@@ -0,0 +1,76 @@
+"""
+Measures response size on the wire and latency of get-jobs-list and get-similar-jobs
+for full cards versus sparse ones ("fields" + "snippetLength"), each sent as is,
+gzipped and, when the brotli package is installed, brotli compressed.
+
+    python -m benchmarks.payload --concurrency 16 --duration 5
+
+Uses the database in BENCHMARK_DB, the project's by default (see benchmarks/settings.py;
+seed it first, e.g. with `manage.py populate_jobs`) and needs uvicorn installed.
+"""
+import argparse
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from config.compression import brotli
+from dashboard.models import Job
+from login.tokens import issueToken
+from benchmarks.common import Server, print_table, run_load
+
+# What a list or similar-jobs card shows: everything but the full description
+CARD_OPTIONS = {
+    'fields': ['jobId', 'stars', 'roleName', 'companyLogoUrl', 'location', 'employmentType', 'salary', 'jobDescription'],
+    'snippetLength': 120,
+}
+SIMILAR_CARD_OPTIONS = {
+    'fields': [field for field in CARD_OPTIONS['fields'] if field != 'salary'],
+    'snippetLength': 120,
+}
+
+
+def scenarios(job_ids, page_size):
+    def list_body(options):
+        return lambda i: {'minimumSalary': 10 * (i % 5), 'page_number': i % 20 + 1, 'page_size': page_size, **options}
+
+    def similar_body(options):
+        return lambda i: {'jobId': job_ids[i % len(job_ids)], **options}
+
+    return [
+        ('get-jobs-list', 'full', list_body({})),
+        ('get-jobs-list', 'card', list_body(CARD_OPTIONS)),
+        ('get-similar-jobs', 'full', similar_body({})),
+        ('get-similar-jobs', 'card', similar_body(SIMILAR_CARD_OPTIONS)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    job_ids = list(Job.objects.values_list('job_id', flat=True)[:1000])
+    if not job_ids:
+        raise SystemExit("No jobs in the database, run `manage.py populate_jobs` first.")
+
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+    token = issueToken("rahul")
+    rows = []
+    with Server(workers=args.workers) as server:
+        for endpoint, payload, make_body in scenarios(job_ids, args.page_size):
+            for encoding in encodings:
+                headers = {'Authorization': f'Bearer {token}', 'Accept-Encoding': encoding}
+                result = run_load(server.port, f'/dashboard/{endpoint}', make_body, args.concurrency, args.duration, headers)
+                rows.append({'endpoint': endpoint, 'payload': payload, 'encoding': encoding, **result})
+
+    print_table(rows, ['endpoint', 'payload', 'encoding', 'bytes', 'requests', 'throughput', 'p50_ms', 'p99_ms', 'statuses'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Microbenchmark of the get-jobs-list / get-job-details response building:
+dict rows + DRF JSONRenderer (the original path) against the stored per-job
+JSON fragments + FastJSONRenderer.
+
+    python -m benchmarks.rendering --repeat 200
+
+Uses the database configured in DJANGO_SETTINGS_MODULE; seed it first and run
+`manage.py refresh_job_payloads` if the rows predate the stored payloads.
+"""
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from rest_framework.renderers import JSONRenderer
+
+from dashboard import storage
+from dashboard.models import Job
+from dashboard.renderers import FastJSONRenderer, orjson
+from benchmarks.common import print_table
+
+
+def time_call(function, repeat):
+    """
+    Returns the mean time of function() in microseconds and the size of its last result.
+    """
+    function()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = function()
+    return (time.perf_counter() - started) / repeat * 1e6, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    json_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    rows = []
+
+    for page_size in args.page_sizes:
+        def dict_path():
+            total_count, jobs = storage.fetchJobsListFromDB(limit=page_size, count_mode='none')
+            return json_renderer.render({"total_count": total_count, "data": jobs})
+
+        def fragment_path():
+            total_count, jobs = storage.fetchJobsListFromDB(limit=page_size, count_mode='none', as_fragments=True)
+            return fast_renderer.render({"total_count": total_count, "data": jobs})
+
+        for mode, function in (('dicts + JSONRenderer', dict_path), ('fragments + FastJSONRenderer', fragment_path)):
+            micros, size = time_call(function, args.repeat)
+            rows.append({'response': f'get-jobs-list page_size={page_size}', 'mode': mode, 'us_per_call': micros, 'bytes': size})
+
+    job_id = Job.objects.values_list('job_id', flat=True).first()
+    if job_id is not None:
+        # Uncached job reads, so both sides pay for the database lookup; the
+        # company's fields come from their cache, as they do when serving
+        detail_paths = (
+            ('dict + JSONRenderer', lambda: json_renderer.render({
+                "data": storage.joinCompanyDetails(storage.loadJobDetails(job_id))
+            })),
+            ('fragment + FastJSONRenderer', lambda: fast_renderer.render({
+                "data": storage.joinCompanyDetails(storage.loadJobPayload(job_id), as_fragment=True)
+            })),
+        )
+        for mode, function in detail_paths:
+            micros, size = time_call(function, args.repeat)
+            rows.append({'response': 'get-job-details', 'mode': mode, 'us_per_call': micros, 'bytes': size})
+
+    print(f"orjson: {'installed' if orjson is not None else 'not installed, using json'}")
+    print_table(rows, ['response', 'mode', 'us_per_call', 'bytes'])
+
+
+if __name__ == '__main__':
+    main()
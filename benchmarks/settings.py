@@ -0,0 +1,32 @@
+"""
+Settings used by the benchmarks: the project settings pointed at a dataset
+database given in BENCHMARK_DB, with per-request query counting.
+BENCHMARK_DB_PROFILE=basic swaps the production database profile for Django's
+defaults (a new connection per request, rollback journal) to compare the two.
+
+Admission control (dashboard/admission.py) is off: the load clients all send the
+token of one user, whose rate limit would turn most responses into 429s, and the
+pools would shed concurrent searches with 503s. BENCHMARK_ADMISSION_CONTROL=on
+keeps it, to measure the server as deployed.
+"""
+import os
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import DATABASES, MIDDLEWARE
+
+DATABASES = {
+    **DATABASES,
+    'default': {**DATABASES['default'], 'NAME': os.environ.get('BENCHMARK_DB', DATABASES['default']['NAME'])},
+}
+
+if os.environ.get('BENCHMARK_DB_PROFILE') == 'basic':
+    DATABASES['default'] = {
+        'ENGINE': DATABASES['default']['ENGINE'],
+        'NAME': DATABASES['default']['NAME'],
+        # WAL is a property of the file, switch it back explicitly
+        'OPTIONS': {'init_command': 'PRAGMA journal_mode = DELETE'},
+    }
+
+MIDDLEWARE = ['benchmarks.middleware.QueryCountMiddleware', *MIDDLEWARE]
+
+ADMISSION_CONTROL_ENABLED = os.environ.get('BENCHMARK_ADMISSION_CONTROL') == 'on'
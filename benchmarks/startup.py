@@ -0,0 +1,152 @@
+"""
+Compares worker startup and per-request middleware overhead of the full settings
+(config/settings.py) and the API-only profile (config/api_settings.py).
+
+    python -m benchmarks.startup --runs 10 --requests 2000
+
+Every run boots a fresh interpreter per profile, importing config.asgi as uvicorn
+does and loading the URLconf, i.e. every view module. It reports, as medians over
+the runs:
+
+- boot_ms: from before `import django` to a ready handler, in the worker
+- process_ms: a worker that exits once booted, seen from outside, interpreter
+  start and exit included
+- modules: entries in sys.modules once booted
+- rss_mb: the worker's peak resident memory after serving the requests below
+- request_us: one request through the test client, alternating POST
+  /login/validate-user and POST /login/get_user_data with a bearer token;
+  neither touches the database
+- middleware_us: request_us minus the same requests with MIDDLEWARE emptied
+
+The OS file cache is warm after the first run, so "cold" means a new process,
+not a cold disk.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BASE_DIR, print_table
+
+PROFILES = {
+    'full': 'config.settings',
+    'api': 'config.api_settings',
+}
+
+WARMUP_REQUESTS = 50
+
+RESULT_COLUMNS = ['profile', 'boot_ms', 'process_ms', 'modules', 'rss_mb', 'request_us', 'middleware_us']
+
+
+def time_requests(client, requests):
+    """
+    Returns the mean µs per request of `requests` calls alternating between two login endpoints.
+    """
+    from login.tokens import issueToken
+
+    headers = {'Authorization': f'Bearer {issueToken("rahul")}'}
+    credentials = {'username': 'rahul', 'password': 'rahul@2021'}
+
+    def call(i):
+        if i % 2:
+            response = client.post('/login/get_user_data', {}, content_type='application/json', headers=headers)
+        else:
+            response = client.post('/login/validate-user', credentials, content_type='application/json')
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.request['PATH_INFO']} answered {response.status_code}")
+
+    for i in range(WARMUP_REQUESTS):
+        call(i)
+    started = time.perf_counter()
+    for i in range(requests):
+        call(i)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def run_worker(requests):
+    """
+    Boots Django under DJANGO_SETTINGS_MODULE and prints its measurements as JSON,
+    only boot_ms and modules when requests is 0. Nothing is imported before the clock starts.
+    """
+    started = time.perf_counter()
+    import config.asgi  # noqa: F401 django.setup() and the handler, as uvicorn loads them
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    boot_ms = (time.perf_counter() - started) * 1000
+    modules = len(sys.modules)
+    if not requests:
+        print(json.dumps({'boot_ms': boot_ms, 'modules': modules}))
+        return
+
+    import logging
+    import resource
+
+    from django.conf import settings
+    from django.test import Client
+
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    logging.getLogger('config.instrumentation').setLevel(logging.ERROR)
+    request_us = time_requests(Client(), requests)
+    # KiB on Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    # A new client loads the middleware again, from the emptied list
+    settings.MIDDLEWARE = []
+    bare_us = time_requests(Client(), requests)
+
+    print(json.dumps({
+        'boot_ms': boot_ms,
+        'modules': modules,
+        'rss_mb': rss_mb,
+        'request_us': request_us,
+        'middleware_us': request_us - bare_us,
+    }))
+
+
+def run_worker_process(settings_module, requests):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--worker', '--requests', str(requests)],
+        cwd=BASE_DIR, env=env, stdout=subprocess.PIPE, check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def run_profile(settings_module, requests):
+    started = time.perf_counter()
+    run_worker_process(settings_module, 0)
+    process_ms = (time.perf_counter() - started) * 1000
+    return {**run_worker_process(settings_module, requests), 'process_ms': process_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=2000, help="Timed requests per worker and middleware list")
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.requests)
+        return
+
+    results = {profile: [] for profile in args.profiles}
+    # Profiles take turns so drift in machine load hits them alike
+    for _ in range(args.runs):
+        for profile in args.profiles:
+            results[profile].append(run_profile(PROFILES[profile], args.requests))
+
+    rows = [
+        {'profile': profile, **{column: statistics.median(run[column] for run in runs) for column in RESULT_COLUMNS[1:]}}
+        for profile, runs in results.items()
+    ]
+    print_table(rows, RESULT_COLUMNS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Load and latency benchmark suite for the dashboard and login endpoints.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --sizes 10000 100000 --baseline results.json --max-regression 15
+
+For every dataset size a database seeded with `manage.py populate_jobs` is kept
+under benchmarks/data/ and reused by later runs (--reseed rebuilds it). Each scenario
+is driven against a uvicorn process (needs uvicorn installed) by concurrent keep-alive
+clients. Query counts come from the X-Query-Count header added by benchmarks.settings.
+
+--output writes the results as JSON; --baseline compares them with an earlier
+--output file and, with --max-regression, exits with status 1 when a scenario's
+throughput dropped or its p99 latency grew by more than that many percent.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+django.setup()
+
+from login.tokens import issueToken
+from benchmarks.common import BASE_DIR, Server, print_table, run_load
+
+DATA_DIR = BASE_DIR / 'benchmarks' / 'data'
+DEFAULT_SIZES = [10000, 100000, 1000000]
+JOB_ID_PREFIX = 'bench-'
+PAGE_SIZE = 10
+
+# Every combination of these is benchmarked, from no filter to all three
+LIST_FILTERS = {
+    'salary': {'minimumSalary': 20},
+    'type': {'employmentType': ['FT', 'PT']},
+    'search': {'searchRoleName': 'dev'},
+}
+
+# Deep pages start this far into the filtered results
+DEEP_PAGE_FRACTION = 0.9
+
+RESULT_COLUMNS = ['scenario', 'requests', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'queries', 'statuses']
+
+
+def seed_dataset(size, workers, reseed=False):
+    """
+    Returns the path of a database holding `size` generated jobs, creating it when missing.
+    """
+    path = DATA_DIR / f'jobs-{size}.sqlite3'
+    if path.exists() and not reseed:
+        return path
+
+    DATA_DIR.mkdir(exist_ok=True)
+    # Seed into a scratch file so an interrupted run never leaves a half-seeded dataset behind
+    scratch = path.with_suffix('.seeding')
+    scratch.unlink(missing_ok=True)
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='benchmarks.settings', BENCHMARK_DB=str(scratch))
+    manage = [sys.executable, 'manage.py']
+    print(f"Seeding {size} jobs into {path.name}...")
+    subprocess.run([*manage, 'migrate', '--noinput', '-v', '0'], cwd=BASE_DIR, env=env, check=True)
+    subprocess.run([
+        *manage, 'populate_jobs', '--count', str(size), '--seed', '0', '--id-prefix', JOB_ID_PREFIX,
+        '--workers', str(workers), '--batch-size', '10000',
+    ], cwd=BASE_DIR, env=env, check=True)
+    scratch.replace(path)
+    return path
+
+
+def post_json(port, path, body, headers):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        connection.request('POST', path, body=json.dumps(body), headers={'Content-Type': 'application/json', **headers})
+        response = connection.getresponse()
+        content = response.read()
+        return response.status, json.loads(content) if content else None
+    finally:
+        connection.close()
+
+
+def scenarios(port, size, headers):
+    """
+    Yields (name, path, make_body) for every benchmarked request shape.
+    """
+    def job_id(i):
+        # Spread lookups over the whole table rather than its first rows
+        return f"{JOB_ID_PREFIX}{(i * 7919) % size:08d}"
+
+    for count in range(len(LIST_FILTERS) + 1):
+        for names in itertools.combinations(LIST_FILTERS, count):
+            filters = {key: value for name in names for key, value in LIST_FILTERS[name].items()}
+            label = '+'.join(names) or 'no filter'
+
+            status, first_page = post_json(port, '/dashboard/get-jobs-list', {**filters, 'page_size': PAGE_SIZE}, headers)
+            total_count = first_page['total_count'] if status == 200 else 0
+            deep_page = max(1, int(total_count / PAGE_SIZE * DEEP_PAGE_FRACTION))
+
+            for depth, page_number in (('shallow', 1), ('deep', deep_page)):
+                body = {**filters, 'page_number': page_number, 'page_size': PAGE_SIZE}
+                yield f'get-jobs-list {label}, {depth}', '/dashboard/get-jobs-list', lambda i, body=body: body
+
+    yield 'get-job-details', '/dashboard/get-job-details', lambda i: {'jobId': job_id(i)}
+    yield 'get-similar-jobs', '/dashboard/get-similar-jobs', lambda i: {'jobId': job_id(i)}
+    yield 'validate-user', '/login/validate-user', lambda i: {'username': 'rahul', 'password': 'rahul@2021'}
+
+
+def run_dataset(size, path, args):
+    headers = {'Authorization': f'Bearer {issueToken("rahul")}'}
+    rows = []
+    with Server(workers=args.server_workers, settings_module='benchmarks.settings', extra_env={'BENCHMARK_DB': str(path)}) as server:
+        for name, endpoint, make_body in scenarios(server.port, size, headers):
+            if args.warmup:
+                run_load(server.port, endpoint, make_body, args.concurrency, args.warmup, headers)
+            result = run_load(server.port, endpoint, make_body, args.concurrency, args.duration, headers)
+            rows.append({'dataset': size, 'scenario': name, 'endpoint': endpoint, **result})
+    return rows
+
+
+def compare(results, baseline, max_regression=None):
+    """
+    Prints the change of every scenario against the baseline results and
+    returns the (dataset, scenario) pairs regressing by more than max_regression percent.
+    """
+    previous = {(row['dataset'], row['scenario']): row for row in baseline['results']}
+    rows = []
+    regressions = []
+    for row in results:
+        before = previous.get((row['dataset'], row['scenario']))
+        if before is None:
+            continue
+        throughput_change = percent_change(before['throughput'], row['throughput'])
+        p99_change = percent_change(before['p99_ms'], row['p99_ms'])
+        rows.append({
+            'dataset': row['dataset'],
+            'scenario': row['scenario'],
+            'throughput': row['throughput'],
+            'throughput_change_%': throughput_change,
+            'p99_ms': row['p99_ms'],
+            'p99_change_%': p99_change,
+            'queries': row['queries'],
+            'baseline_queries': before['queries'],
+        })
+        if max_regression is not None and (-throughput_change > max_regression or p99_change > max_regression):
+            regressions.append((row['dataset'], row['scenario']))
+
+    if rows:
+        print("\nAgainst baseline:")
+        print_table(rows, list(rows[0]))
+    return regressions
+
+
+def percent_change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds measured per scenario")
+    parser.add_argument('--warmup', type=float, default=1.0, help="Seconds of unmeasured load before each scenario")
+    parser.add_argument('--server-workers', type=int, default=1)
+    parser.add_argument('--seed-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--reseed', action='store_true')
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare with the JSON results of an earlier run")
+    parser.add_argument('--max-regression', type=float, help="Percent; exit with status 1 when exceeded")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        path = seed_dataset(size, args.seed_workers, args.reseed)
+        rows = run_dataset(size, path, args)
+        print(f"\n{size} jobs:")
+        print_table(rows, RESULT_COLUMNS)
+        results.extend(rows)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'concurrency': args.concurrency,
+                'duration': args.duration,
+                'server_workers': args.server_workers,
+                'results': results,
+            }, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.max_regression)
+        if regressions:
+            print("\nRegressed beyond {}%: {}".format(
+                args.max_regression, ', '.join(f"{scenario} ({dataset})" for dataset, scenario in regressions)
+            ))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+API-only settings profile: config/settings.py without what the JSON API in
+dashboard and login never uses.
+
+    DJANGO_SETTINGS_MODULE=config.api_settings uvicorn config.asgi:application
+
+Left out:
+- the admin, auth, contenttypes, sessions, messages and staticfiles apps, with
+  their models, checks and signal handlers, and the /admin/ URLs (config/urls.py)
+- the session, CSRF, auth, message, common and clickjacking middleware. The API is
+  authenticated by TokenAuthenticationMiddleware, never by a cookie, so there is
+  nothing for CSRF protection to guard. Without CommonMiddleware the Host header
+  is only checked against ALLOWED_HOSTS when something reads it, which the API
+  never does; let the proxy in front reject unknown hosts
+- template engines, and DRF's browsable API renderer and session/basic
+  authentication, which need them and django.contrib.auth. request.user is None
+
+Workers start faster, hold less memory and run a shorter middleware chain per
+request; python -m benchmarks.startup compares the two profiles. Management
+commands that need the dropped apps (createsuperuser, the admin) still need
+config.settings.
+"""
+from config.settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'corsheaders',
+    'rest_framework',
+    'login',
+    'dashboard',
+]
+
+MIDDLEWARE = [
+    'config.instrumentation.InstrumentationMiddleware',
+    'config.compression.CompressionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'login.middleware.TokenAuthenticationMiddleware',
+    'dashboard.admission.AdmissionControlMiddleware',
+    # Still sets X-Content-Type-Options: nosniff and the referrer and COOP headers
+    'django.middleware.security.SecurityMiddleware',
+]
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'dashboard.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    # The default, AnonymousUser, lives in django.contrib.auth
+    'UNAUTHENTICATED_USER': None,
+}
+
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
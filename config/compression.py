@@ -0,0 +1,54 @@
+"""
+Response compression: brotli for clients accepting it when the optional brotli
+package is installed, gzip (django.middleware.gzip) otherwise.
+
+Responses smaller than RESPONSE_COMPRESSION_MIN_BYTES go out as they are, the
+saving would not pay for the CPU. Streaming responses (export-jobs) are gzipped.
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from .instrumentation import measurePhase
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, responses are gzipped without it
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+class CompressionMiddleware(GZipMiddleware):
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_bytes = getattr(settings, 'RESPONSE_COMPRESSION_MIN_BYTES', 1024)
+        self.brotli_quality = getattr(settings, 'RESPONSE_COMPRESSION_BROTLI_QUALITY', 4)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_bytes:
+            return response
+        with measurePhase('compress'):
+            if (
+                brotli is None
+                or response.streaming
+                or response.has_header("Content-Encoding")
+                or not re_accepts_brotli.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+            ):
+                return super().process_response(request, response)
+            return self.brotliResponse(response)
+
+    def brotliResponse(self, response):
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed_content = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
@@ -0,0 +1,268 @@
+"""
+Per-request instrumentation: SQL query count and time, the slowest statement and
+time spent per phase (auth, db, serialize, render), sent back as a Server-Timing
+header, logged for slow requests and aggregated into per-endpoint histograms.
+
+Turned off with INSTRUMENTATION_ENABLED = False, in which case the middleware
+removes itself from the stack and measurePhase / timedPhase cost one context
+variable lookup.
+"""
+import bisect
+import contextlib
+import functools
+import json
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets, the last one is open ended
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Longest SQL kept for the slowest statement
+MAX_LOGGED_SQL = 1000
+
+# Timings of the request being handled, None outside a request or when disabled
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.queries = 0
+        self.slowest_query_ms = 0.0
+        self.slowest_query = None
+
+    def addPhase(self, name, duration_ms):
+        self.phases[name] = self.phases.get(name, 0.0) + duration_ms
+
+    def addQuery(self, sql, duration_ms):
+        self.queries += 1
+        self.addPhase('db', duration_ms)
+        if duration_ms > self.slowest_query_ms:
+            self.slowest_query_ms = duration_ms
+            self.slowest_query = sql
+
+    def elapsedMs(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def addPhaseSince(self, name, started, db_ms_before):
+        """
+        Adds the time since started to a phase, minus the SQL time spent meanwhile,
+        e.g. a lazy queryset evaluated while serializing.
+        """
+        db_ms = self.phases.get('db', 0.0) - db_ms_before
+        self.addPhase(name, (time.perf_counter() - started) * 1000 - db_ms)
+
+
+@contextlib.contextmanager
+def measurePhase(name):
+    """
+    Adds the run time of the with-block to the named phase of the current request.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started, db_ms_before = time.perf_counter(), timings.phases.get('db', 0.0)
+    try:
+        yield
+    finally:
+        timings.addPhaseSince(name, started, db_ms_before)
+
+
+def timedPhase(name):
+    """
+    Decorator version of measurePhase.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = current_timings.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            started, db_ms_before = time.perf_counter(), timings.phases.get('db', 0.0)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.addPhaseSince(name, started, db_ms_before)
+        return wrapper
+    return decorator
+
+
+def timeQuery(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.addQuery(sql, (time.perf_counter() - started) * 1000)
+
+
+def instrumentConnection(sender, connection, **kwargs):
+    # Installed once per connection; the current request is found through current_timings,
+    # which also follows ORM calls that async views run in worker threads.
+    # Inserted first: connection.execute_wrapper() blocks pop the last wrapper on exit.
+    if timeQuery not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, timeQuery)
+
+
+# Connected on import, which happens while the apps load and before any connection is
+# opened; the wrapper does nothing unless the middleware is timing a request
+connection_created.connect(instrumentConnection, dispatch_uid='config.instrumentation')
+
+
+class EndpointStats:
+    """
+    Latency histogram and query totals of one endpoint.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.db_ms = 0.0
+        self.queries = 0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+
+    def add(self, duration_ms, timings):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.db_ms += timings.phases.get('db', 0.0)
+        self.queries += timings.queries
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS_MS, duration_ms)] += 1
+
+    def percentile(self, fraction):
+        """
+        Upper bound of the bucket holding the given fraction of requests.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def summary(self):
+        count = self.count or 1
+        return {
+            "count": self.count,
+            "meanMs": self.total_ms / count,
+            "p50Ms": self.percentile(0.50),
+            "p95Ms": self.percentile(0.95),
+            "p99Ms": self.percentile(0.99),
+            "meanDbMs": self.db_ms / count,
+            "queriesPerRequest": self.queries / count,
+            "histogram": {
+                **{f"le{bound}ms": count for bound, count in zip(HISTOGRAM_BUCKETS_MS, self.buckets)},
+                "inf": self.buckets[-1],
+            },
+        }
+
+
+endpoint_stats = {}
+endpoint_stats_lock = threading.Lock()
+
+
+def recordRequest(endpoint, duration_ms, timings):
+    with endpoint_stats_lock:
+        stats = endpoint_stats.get(endpoint)
+        if stats is None:
+            stats = endpoint_stats[endpoint] = EndpointStats()
+        stats.add(duration_ms, timings)
+
+
+def getEndpointStats():
+    """
+    Returns the aggregated timings of every endpoint served by this process.
+    Percentiles are bucket upper bounds (ms), None past the last bucket.
+    """
+    with endpoint_stats_lock:
+        return {endpoint: stats.summary() for endpoint, stats in sorted(endpoint_stats.items())}
+
+
+def resetEndpointStats():
+    with endpoint_stats_lock:
+        endpoint_stats.clear()
+
+
+def endpointName(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f"{request.method} (unresolved)"
+    return f"{request.method} /{match.route}"
+
+
+def serverTiming(timings, total_ms):
+    entries = [f'{name};dur={duration:.2f}' for name, duration in timings.phases.items()]
+    entries.append(f'total;dur={total_ms:.2f};desc="{timings.queries} queries"')
+    return ', '.join(entries)
+
+
+class InstrumentationMiddleware:
+    """
+    Times every request. Goes first in MIDDLEWARE so the phases of the other
+    middleware (e.g. auth) are included.
+    Streaming responses are timed up to the first byte.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTATION_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.slow_request_ms = getattr(settings, 'INSTRUMENTATION_SLOW_REQUEST_MS', 500)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        total_ms = timings.elapsedMs()
+        endpoint = endpointName(request)
+        response['Server-Timing'] = serverTiming(timings, total_ms)
+        recordRequest(endpoint, total_ms, timings)
+
+        if total_ms >= self.slow_request_ms:
+            logger.warning(json.dumps({
+                "event": "slow_request",
+                "endpoint": endpoint,
+                "path": request.path,
+                "status": response.status_code,
+                "durationMs": round(total_ms, 2),
+                "queries": timings.queries,
+                "phasesMs": {name: round(duration, 2) for name, duration in timings.phases.items()},
+                "slowestQueryMs": round(timings.slowest_query_ms, 2),
+                "slowestQuery": (timings.slowest_query or '')[:MAX_LOGGED_SQL],
+            }))
+        return response
@@ -29,6 +29,8 @@ ALLOWED_HOSTS = []
 
 
 # Application definition
+# config/api_settings.py is an API-only profile of these settings, without the
+# admin, sessions, templates and their middleware.
 
 INSTALLED_APPS = [
     'corsheaders',
@@ -44,7 +46,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.instrumentation.InstrumentationMiddleware',
+    'config.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'login.middleware.TokenAuthenticationMiddleware',
+    'dashboard.admission.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,6 +60,74 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'dashboard.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Serve get-jobs-list and get-job-details from the JSON stored on each Job
+# (list_payload / detail_payload) instead of rebuilding and re-serializing dicts
+DASHBOARD_FAST_JSON = True
+
+# Engine answering get-jobs-list (without searchRoleName) and get-similar-jobs:
+# "orm" runs SQL, "snapshot" filters an in-process columnar copy of the Job table
+# (dashboard/snapshot.py). Every worker holds its own copy, about 250 MB and a
+# 7 second load on its first read per million jobs.
+DASHBOARD_QUERY_BACKEND = 'orm'
+# Seconds between two polls of the JobChange log for writes made by other processes
+JOB_SNAPSHOT_REFRESH_INTERVAL = 1.0
+# Rows changed since the snapshot was loaded before it is reloaded from scratch;
+# also the most JobChange entries the autocomplete index applies one by one
+JOB_SNAPSHOT_MAX_DELTA = 2000
+
+# Rows validated and written per transaction by ingest-jobs and the ingest_jobs command
+JOB_INGEST_CHUNK_SIZE = 1000
+
+# Seconds between two polls of the JobChange log by the get-autocomplete prefix index
+# (dashboard/autocomplete.py), i.e. how stale its suggestions may be
+AUTOCOMPLETE_REFRESH_INTERVAL = 1.0
+
+# Admission control (dashboard/admission.py), per worker process. Past a pool's
+# concurrency requests queue up to timeout seconds, then get a 503 (a full queue
+# sheds at once); every request also costs its user's token bucket "cost" tokens,
+# a 429 once it is empty.
+ADMISSION_CONTROL_ENABLED = True
+ADMISSION_POOLS = {
+    # Detail lookups, mostly served from the caches
+    'cheap': {'concurrency': 16, 'queue': 64, 'timeout': 0.5, 'cost': 1},
+    'list': {'concurrency': 4, 'queue': 32, 'timeout': 1.0, 'cost': 2},
+    # Full-text searches and pages past ADMISSION_DEEP_OFFSET of the list endpoints
+    'expensive': {'concurrency': 2, 'queue': 8, 'timeout': 2.0, 'cost': 5},
+    # export-jobs and ingest-jobs hold their slot for the whole transfer
+    'bulk': {'concurrency': 1, 'queue': 2, 'timeout': 5.0, 'cost': 10},
+}
+ADMISSION_ROUTES = {
+    '/dashboard/get-job-details': 'cheap',
+    '/dashboard/get-jobs-details': 'cheap',
+    '/dashboard/get-similar-jobs': 'cheap',
+    '/dashboard/get-autocomplete': 'cheap',
+    '/dashboard/async/get-job-details': 'cheap',
+    '/dashboard/async/get-similar-jobs': 'cheap',
+    '/dashboard/async/get-job-page': 'cheap',
+    '/dashboard/get-jobs-list': 'list',
+    '/dashboard/async/get-jobs-list': 'list',
+    '/dashboard/get-jobs-facets': 'list',
+    '/dashboard/export-jobs': 'bulk',
+    '/dashboard/ingest-jobs': 'bulk',
+}
+ADMISSION_DEEP_OFFSET = 1000
+# Tokens per second and bucket size of each user
+ADMISSION_RATE_LIMIT = {'rate': 20, 'burst': 100}
+
+# Signed login tokens (login/tokens.py), verified by TokenAuthenticationMiddleware
+AUTH_TOKEN_MAX_AGE = 60 * 60 * 24
+AUTH_TOKEN_PROTECTED_PATHS = ('/dashboard/', '/login/get_user_data')
+# Also accept {"token": ...} in the JSON body, for clients that predate the Authorization header.
+# Off by default: a request without the header then has its whole body parsed before it is rejected.
+AUTH_ACCEPT_BODY_TOKEN = False
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 
@@ -80,13 +154,100 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Seconds a connection is kept open and reused across requests (0 closes it after
+# every request). Reused connections are checked before each request.
+# Only WSGI workers and management commands reuse them: Django's ASGI handler gives
+# every request its own connection, so under uvicorn the pragmas below are what count.
+DATABASE_CONN_MAX_AGE = 600
+
+# Pragmas run on every new SQLite connection.
+# WAL lets readers run alongside the single writer instead of queueing behind it,
+# and synchronous=NORMAL is durable in WAL mode except against power loss.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # KiB, i.e. 64 MiB per connection
+    'busy_timeout': 5000,  # ms a writer waits for the lock instead of failing
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name} = {value}' for name, value in SQLITE_PRAGMAS.items()),
+            # Take the write lock when a transaction starts: a deferred transaction upgrading
+            # to a writer fails with "database is locked" without honouring busy_timeout
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Alias in DATABASES of a read-only replica of 'default'. When set, the read-only
+# functions of dashboard.storage read from it and everything else uses 'default'.
+# None disables read routing. For example, a second read-only connection pool on
+# the same file, which never lags behind the primary:
+#
+# DATABASES['replica'] = {
+#     **DATABASES['default'],
+#     'NAME': f"file:{BASE_DIR / 'db.sqlite3'}?mode=ro",
+#     'OPTIONS': {'init_command': 'PRAGMA mmap_size = 268435456;PRAGMA busy_timeout = 5000'},
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICA_ALIAS = 'replica'
+#
+# A replica that lags (e.g. a Litestream/LiteFS copy) can serve a job's old details
+# under its new cache version until the next write or JOB_DETAIL_CACHE_TIMEOUT.
+DATABASE_REPLICA_ALIAS = None
+
+DATABASE_ROUTERS = ['dashboard.routers.ReadReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Holds the Job table generation, cached list counts and job details. Use a shared backend
+# (Redis, Memcached) when running several workers so invalidation reaches all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'learningassessment',
     }
 }
 
+# get-job-details payloads kept in each worker's in-process LRU, in front of CACHES
+JOB_DETAIL_LRU_SIZE = 1024
+# Companies whose get-job-details fields are kept the same way, joined into every job's details
+COMPANY_DETAIL_LRU_SIZE = 1024
+
+# Seconds a get-job-details payload, or a company's part of it, stays in CACHES
+JOB_DETAIL_CACHE_TIMEOUT = 3600
+# Seconds a get-jobs-list count or get-jobs-facets result stays in CACHES. There is
+# one entry per distinct filter, search string included, and a write to the Job table
+# only makes them stale, so they must expire on their own
+JOB_COUNT_CACHE_TIMEOUT = 3600
+
+
+# Request instrumentation (config/instrumentation.py): Server-Timing headers,
+# per-endpoint histograms at /dashboard/internal/stats and a warning logged by
+# "config.instrumentation" for requests slower than INSTRUMENTATION_SLOW_REQUEST_MS.
+INSTRUMENTATION_ENABLED = True
+
+INSTRUMENTATION_SLOW_REQUEST_MS = 500
+
+
+# Response compression (config/compression.py): brotli when the client accepts it and
+# the optional brotli package is installed, gzip otherwise, for responses of at least
+# RESPONSE_COMPRESSION_MIN_BYTES. Brotli quality 4 compresses better than gzip at a
+# similar CPU cost; higher qualities cost several times more per response.
+RESPONSE_COMPRESSION_MIN_BYTES = 1024
+
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 4
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
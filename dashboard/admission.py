@@ -0,0 +1,325 @@
+"""
+Admission control for the dashboard endpoints: past a pool's concurrency, requests
+wait in a bounded queue for up to the pool's timeout, then get a 503; a full queue
+sheds them at once. Each user also has a token bucket, charged the pool's cost per
+request, and gets a 429 when it runs dry. Both responses carry Retry-After.
+
+Requests go to a pool by path (ADMISSION_ROUTES). The list endpoints move to the
+"expensive" pool for a full-text search or a page past ADMISSION_DEEP_OFFSET, so
+they cannot take the slots of cheap ones. Paths not routed are not limited.
+
+Limits are per process: with N workers the database sees up to N times a pool's
+concurrency. Configured from settings when the middleware is created; the counters
+are served by internal/stats.
+"""
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+# Pool of the list endpoints' expensive requests
+EXPENSIVE_POOL = 'expensive'
+
+# Paths whose body decides between their pool and EXPENSIVE_POOL
+LIST_PATHS = ('/dashboard/get-jobs-list', '/dashboard/async/get-jobs-list', '/dashboard/get-jobs-facets')
+
+# Users whose token bucket is kept; the least recently seen beyond it start over full
+MAX_TRACKED_USERS = 10000
+
+
+class ConcurrencyPool:
+    """
+    At most concurrency requests at a time, queue_size more waiting in arrival order.
+    """
+
+    def __init__(self, name, concurrency, queue, timeout, cost=1):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue
+        self.timeout = timeout
+        self.cost = cost
+        self.condition = threading.Condition()
+        self.active = 0
+        # Waiters in arrival order, only the first may take a freed slot
+        self.waiters = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    def tryAcquire(self):
+        """
+        Takes a free slot if there is one, without waiting.
+        """
+        with self.condition:
+            return self.takeFreeSlot()
+
+    def takeFreeSlot(self):
+        if self.active < self.concurrency and not self.waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+        return False
+
+    def acquire(self):
+        """
+        Returns True once a slot is taken, False when the request is shed.
+        """
+        with self.condition:
+            if self.takeFreeSlot():
+                return True
+            if len(self.waiters) >= self.queue_size:
+                self.rejected_queue_full += 1
+                return False
+
+            waiter = object()
+            self.waiters.append(waiter)
+            self.queued += 1
+            deadline = time.monotonic() + self.timeout
+            try:
+                while self.active >= self.concurrency or self.waiters[0] is not waiter:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected_timeout += 1
+                        return False
+                    self.condition.wait(remaining)
+                self.active += 1
+                self.admitted += 1
+                return True
+            finally:
+                self.waiters.remove(waiter)
+                self.condition.notify_all()
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            return {
+                "concurrency": self.concurrency,
+                "queueSize": self.queue_size,
+                "active": self.active,
+                "queueDepth": len(self.waiters),
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "rejectedQueueFull": self.rejected_queue_full,
+                "rejectedTimeout": self.rejected_timeout,
+            }
+
+
+class TokenBucket:
+    """
+    rate tokens a second, up to burst.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost):
+        """
+        Returns 0 when cost tokens were taken, else the seconds until they would be there.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0
+        return (cost - self.tokens) / self.rate
+
+
+class AdmissionControl:
+    """
+    The pools and per-user token buckets of this process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.configure({}, {}, None)
+
+    def configure(self, pools, routes, rate_limit, deep_offset=1000):
+        """
+        pools: {name: {"concurrency", "queue", "timeout", "cost"}}, routes: {path: pool name},
+        rate_limit: {"rate", "burst"} tokens per user, or None for no rate limit.
+        """
+        with self.lock:
+            self.pools = {name: ConcurrencyPool(name, **options) for name, options in pools.items()}
+            self.routes = dict(routes)
+            self.rate_limit = rate_limit
+            self.deep_offset = deep_offset
+            self.buckets = OrderedDict()
+            self.rate_limited = 0
+
+    def poolFor(self, request):
+        name = self.routes.get(request.path)
+        if name is None:
+            return None
+        if request.path in LIST_PATHS and EXPENSIVE_POOL in self.pools and self.isExpensive(request):
+            name = EXPENSIVE_POOL
+        return self.pools[name]
+
+    def isExpensive(self, request):
+        """
+        True for a list request with a full-text search or a page past deep_offset.
+        """
+        if request.content_type != 'application/json':
+            return False
+        try:
+            body = json.loads(request.body or b'{}')
+        except ValueError:
+            return False
+        if not isinstance(body, dict):
+            return False
+        if body.get('searchRoleName'):
+            return True
+        page_number, page_size = body.get('page_number', 1), body.get('page_size', 10)
+        if 'cursor' in body or not isinstance(page_number, int) or not isinstance(page_size, int):
+            return False
+        return (page_number - 1) * page_size >= self.deep_offset
+
+    def retryAfterRateLimit(self, request, pool):
+        """
+        Charges the user of the request the pool's cost. Returns 0, or the
+        seconds to wait when the bucket has not enough tokens.
+        """
+        if self.rate_limit is None:
+            return 0
+        user = (getattr(request, 'auth_token', None) or {}).get('sub')
+        if user is None:
+            return 0
+        with self.lock:
+            bucket = self.buckets.get(user)
+            if bucket is None:
+                bucket = self.buckets[user] = TokenBucket(self.rate_limit['rate'], self.rate_limit['burst'])
+                if len(self.buckets) > MAX_TRACKED_USERS:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(user)
+            wait = bucket.take(pool.cost)
+            if wait:
+                self.rate_limited += 1
+            return wait
+
+    def stats(self):
+        with self.lock:
+            pools = list(self.pools.values())
+            rate_limited, tracked = self.rate_limited, len(self.buckets)
+        return {
+            "pools": {pool.name: pool.stats() for pool in pools},
+            "rateLimited": rate_limited,
+            "trackedUsers": tracked,
+        }
+
+
+admission_control = AdmissionControl()
+
+
+def rejection(status, message, retry_after):
+    response = JsonResponse({"errorMessage": message}, status=status)
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def releaseOnce(pool):
+    """
+    Returns a callable giving back a slot of pool on its first call only.
+    """
+    lock = threading.Lock()
+    released = False
+
+    def release():
+        nonlocal released
+        with lock:
+            if released:
+                return
+            released = True
+        pool.release()
+
+    return release
+
+
+class AdmissionControlMiddleware:
+    """
+    Applies admission_control to every request. Placed after the token middleware,
+    so only authenticated requests are counted and users can be told apart.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'ADMISSION_CONTROL_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        admission_control.configure(
+            getattr(settings, 'ADMISSION_POOLS', {}),
+            getattr(settings, 'ADMISSION_ROUTES', {}),
+            getattr(settings, 'ADMISSION_RATE_LIMIT', None),
+            getattr(settings, 'ADMISSION_DEEP_OFFSET', 1000),
+        )
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        pool = admission_control.poolFor(request)
+        if pool is None:
+            return self.get_response(request)
+        rejected = self.rateLimit(request, pool)
+        if rejected is not None:
+            return rejected
+        if not pool.acquire():
+            return self.overloaded(pool)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            pool.release()
+            raise
+        return self.holdWhileStreaming(response, pool)
+
+    async def __acall__(self, request):
+        pool = admission_control.poolFor(request)
+        if pool is None:
+            return await self.get_response(request)
+        rejected = self.rateLimit(request, pool)
+        if rejected is not None:
+            return rejected
+        # Waiting for a slot blocks, keep it off the event loop
+        if not pool.tryAcquire() and not await sync_to_async(pool.acquire, thread_sensitive=False)():
+            return self.overloaded(pool)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            pool.release()
+            raise
+        return self.holdWhileStreaming(response, pool)
+
+    def holdWhileStreaming(self, response, pool):
+        if not response.streaming:
+            pool.release()
+        else:
+            # Streamed content is produced after the view returns, the slot is held until
+            # the server closes the response: once it is sent, or when the client went
+            # away, read or not
+            response._resource_closers.append(releaseOnce(pool))
+        return response
+
+    def rateLimit(self, request, pool):
+        retry_after = admission_control.retryAfterRateLimit(request, pool)
+        if retry_after:
+            return rejection(429, "Too many requests", retry_after)
+        return None
+
+    def overloaded(self, pool):
+        return rejection(503, f"The server is busy ({pool.name}), try again shortly", pool.timeout)
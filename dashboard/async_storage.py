@@ -0,0 +1,286 @@
+"""
+Async counterparts of the read functions in dashboard.storage, built on Django's
+async ORM (acount, aget, async iteration) and async cache API for the views in
+dashboard.async_views. Query shapes, caching and payloads match the sync versions,
+including the stored JSON fragments and the fields / snippet_length cards.
+The "snapshot" DASHBOARD_QUERY_BACKEND refreshes its copy through the sync ORM,
+so requests it answers run the sync version in a thread.
+"""
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Company, Job, SimilarJob
+from .renderers import JsonFragment, dumpJson, joinJsonObjects
+from .routers import readsFromReplica
+from .similar import computeSimilarJobIds
+from .snapshot import snapshotEnabled
+from .storage import (
+    COMPANY_DETAIL_KEY_PREFIX, COMPANY_VERSION_KEY_PREFIX, CURSOR_ORDERING, ESTIMATED_COUNT_CAP,
+    JOB_DETAIL_KEY_PREFIX, JOB_FRAGMENT_FIELDS, JOB_LIST_FIELDS, JOB_PAYLOAD_KEY_PREFIX,
+    JOB_VERSION_KEY_PREFIX, JOBS_COUNT_KEY_PREFIX, JOBS_GENERATION_KEY, LIST_CARD_FIELDS,
+    SIMILAR_CARD_FIELDS, SIMILAR_JOB_FIELDS, buildJobPayloads, company_detail_lru,
+    countJobDetailLookup, decodeCursor, encodeCursor, fetchJobsListFromSnapshot, fetchSimilarJobs,
+    filterJobs, formatCompanyDetails, formatJobCards, formatJobFields, formatJobListItem,
+    formatJobsFragments, formatJobsList, formatSimilarJobs, jobCacheKey, job_detail_lru, normalizeFilters, selectJobCards
+)
+
+
+async def acountJobs(qs, filter_key, count_mode='exact'):
+    """
+    Async version of storage.countJobs.
+    """
+    if count_mode == 'none':
+        return None
+
+    cache_key = JOBS_COUNT_KEY_PREFIX + hashlib.sha1(repr(filter_key).encode()).hexdigest()
+    generation = await cache.aget_or_set(JOBS_GENERATION_KEY, time.time_ns(), timeout=None)
+    cached = await cache.aget(cache_key)
+
+    if cached is not None:
+        cached_generation, cached_count = cached
+        if cached_generation == generation or count_mode == 'estimated':
+            return cached_count
+
+    if count_mode == 'estimated':
+        return await qs[:ESTIMATED_COUNT_CAP].acount()
+
+    total_count = await qs.acount()
+    await cache.aset(cache_key, (generation, total_count), timeout=getattr(settings, 'JOB_COUNT_CACHE_TIMEOUT', 3600))
+    return total_count
+
+
+@readsFromReplica
+async def afetchJobsListFromDB(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None, limit=10, offset=0, count_mode='exact', as_fragments=False, fields=None, snippet_length=None):
+    """
+    Async version of storage.fetchJobsListFromDB.
+    """
+    if snapshotEnabled() and not search_role_name:
+        return await sync_to_async(fetchJobsListFromSnapshot)(min_salary, employment_type, required_skills, any_skills, limit, offset, count_mode, as_fragments, fields, snippet_length)
+
+    qs = filterJobs(min_salary, employment_type, search_role_name, required_skills, any_skills)
+
+    total_count = await acountJobs(qs, normalizeFilters(min_salary, employment_type, search_role_name, required_skills, any_skills), count_mode)
+
+    if search_role_name:
+        qs = qs.order_by('search_index__rank', *CURSOR_ORDERING)
+    else:
+        qs = qs.order_by(*CURSOR_ORDERING)
+
+    qs = qs[offset:offset + limit]
+
+    if fields is not None or snippet_length is not None:
+        fields = fields or LIST_CARD_FIELDS
+        return total_count, formatJobCards([row async for row in selectJobCards(qs, fields, snippet_length)], fields)
+
+    if as_fragments:
+        return total_count, await aformatJobsFragments([row async for row in qs.values(*JOB_FRAGMENT_FIELDS)])
+
+    jobs = [job async for job in qs.values(*JOB_LIST_FIELDS)]
+    return total_count, formatJobsList(jobs)
+
+
+@readsFromReplica
+async def afetchJobsPageFromDB(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None, limit=10, cursor=None, count_mode='exact', as_fragments=False, fields=None, snippet_length=None):
+    """
+    Async version of storage.fetchJobsPageFromDB.
+    Raises ValueError when the cursor is malformed.
+    """
+    qs = filterJobs(min_salary, employment_type, search_role_name, required_skills, any_skills)
+
+    if cursor:
+        stars, job_id = decodeCursor(cursor)
+        page_qs = qs.filter(Q(stars__lt=stars) | Q(stars=stars, job_id__gt=job_id))
+    else:
+        page_qs = qs
+
+    total_count = await acountJobs(qs, normalizeFilters(min_salary, employment_type, search_role_name, required_skills, any_skills), count_mode)
+
+    page_qs = page_qs.order_by(*CURSOR_ORDERING)
+    sparse = fields is not None or snippet_length is not None
+    if sparse:
+        fields = fields or LIST_CARD_FIELDS
+        # The cursor is built from stars and job_id, requested or not
+        page_qs = selectJobCards(page_qs, fields, snippet_length, extra=('job_id', 'stars'))
+    else:
+        page_qs = page_qs.values(*((*JOB_FRAGMENT_FIELDS, 'stars') if as_fragments else JOB_LIST_FIELDS))
+    jobs = [job async for job in page_qs[:limit + 1]]
+
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = encodeCursor(jobs[-1])
+
+    if sparse:
+        return total_count, formatJobCards(jobs, fields), next_cursor
+    if as_fragments:
+        return total_count, await aformatJobsFragments(jobs), next_cursor
+    return total_count, formatJobsList(jobs), next_cursor
+
+
+async def astreamJobsFromDB(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None, chunk_size=2000):
+    """
+    Async version of storage.streamJobsFromDB.
+    """
+    qs = filterJobs(min_salary, employment_type, search_role_name, required_skills, any_skills)
+    async for job in qs.values(*JOB_LIST_FIELDS).aiterator(chunk_size=chunk_size):
+        yield formatJobListItem(job)
+
+
+async def aformatJobsFragments(rows):
+    """
+    Async version of storage.formatJobsFragments: the rows with no stored payload
+    yet are read here, so that it never queries.
+    """
+    unserialized = [row['job_id'] for row in rows if not row['list_payload']]
+    if unserialized:
+        built = {job.job_id: buildJobPayloads(job)[0] async for job in Job.objects.filter(job_id__in=unserialized)}
+        rows = [row if row['list_payload'] else dict(row, list_payload=built[row['job_id']]) for row in rows]
+    return formatJobsFragments(rows)
+
+
+@readsFromReplica
+async def afetchJobFromDB(job_id, as_fragment=False):
+    """
+    Async version of storage.fetchJobFromDB, sharing its LRU, cache keys and counters.
+    """
+    if job_id is None:
+        return None
+
+    if as_fragment:
+        lru_key, key_prefix, load = ('payload', job_id), JOB_PAYLOAD_KEY_PREFIX, aloadJobPayload
+    else:
+        lru_key, key_prefix, load = job_id, JOB_DETAIL_KEY_PREFIX, aloadJobDetails
+
+    version = await cache.aget_or_set(jobCacheKey(JOB_VERSION_KEY_PREFIX, job_id), time.time_ns(), timeout=None)
+
+    cached = job_detail_lru.get(lru_key)
+    if cached is not None and cached[0] == version:
+        countJobDetailLookup("lruHits")
+        return await ajoinCompanyDetails(cached[1], as_fragment)
+
+    detail_key = f"{jobCacheKey(key_prefix, job_id)}:{version}"
+    job_details = await cache.aget(detail_key)
+    if job_details is not None:
+        countJobDetailLookup("cacheHits")
+    else:
+        countJobDetailLookup("misses")
+        job_details = await load(job_id)
+        if job_details is None:
+            return None
+        await cache.aset(detail_key, job_details, timeout=getattr(settings, 'JOB_DETAIL_CACHE_TIMEOUT', 3600))
+
+    job_detail_lru.set(lru_key, (version, job_details))
+    return await ajoinCompanyDetails(job_details, as_fragment)
+
+
+async def aloadJobDetails(job_id):
+    """
+    Async version of storage.loadJobDetails.
+    """
+    try:
+        job = await Job.objects.aget(job_id=job_id)
+    except Job.DoesNotExist:
+        return None
+    return job.company_id, formatJobFields(job)
+
+
+async def aloadJobPayload(job_id):
+    """
+    Async version of storage.loadJobPayload.
+    """
+    row = await Job.objects.filter(job_id=job_id).values_list('company_id', 'detail_payload').afirst()
+    if row is None:
+        return None
+    company_id, payload = row
+    if not payload:
+        payload = buildJobPayloads(await Job.objects.aget(job_id=job_id))[1]
+    return company_id, JsonFragment(payload)
+
+
+async def ajoinCompanyDetails(entry, as_fragment=False):
+    """
+    Async version of storage.joinCompanyDetails.
+    """
+    company_id, job_details = entry
+    version = await cache.aget_or_set(jobCacheKey(COMPANY_VERSION_KEY_PREFIX, company_id), time.time_ns(), timeout=None)
+
+    cached = company_detail_lru.get(company_id)
+    if cached is not None and cached[0] == version:
+        company = cached[1]
+    else:
+        detail_key = f"{jobCacheKey(COMPANY_DETAIL_KEY_PREFIX, company_id)}:{version}"
+        company = await cache.aget(detail_key)
+        if company is None:
+            try:
+                details = formatCompanyDetails(await Company.objects.aget(id=company_id))
+            except Company.DoesNotExist:
+                return None
+            company = (details, JsonFragment(dumpJson(details)))
+            await cache.aset(detail_key, company, timeout=getattr(settings, 'JOB_DETAIL_CACHE_TIMEOUT', 3600))
+        company_detail_lru.set(company_id, (version, company))
+
+    if as_fragment:
+        return joinJsonObjects(job_details, company[1])
+    return {**job_details, **company[0]}
+
+
+@readsFromReplica
+async def afetchSimilarJobs(job_id, fields=None, snippet_length=None):
+    """
+    Async version of storage.fetchSimilarJobs.
+    """
+    if snapshotEnabled():
+        return await sync_to_async(fetchSimilarJobs)(job_id, fields, snippet_length)
+
+    sparse = fields is not None or snippet_length is not None
+    fields = fields or SIMILAR_CARD_FIELDS
+
+    if sparse:
+        rows = [
+            row async for row in selectJobCards(
+                SimilarJob.objects.filter(job_id=job_id).order_by('position'),
+                fields, snippet_length, prefix='similar__'
+            )
+        ]
+        if rows:
+            return formatJobCards(rows, fields, prefix='similar__')
+        try:
+            current_job = await Job.objects.aget(job_id=job_id)
+        except Job.DoesNotExist:
+            return []
+        similar_ids = await sync_to_async(computeSimilarJobIds)(current_job)
+        return await afetchJobCardsByIds(similar_ids, fields, snippet_length)
+
+    rows = (
+        SimilarJob.objects
+        .filter(job_id=job_id)
+        .select_related('similar__company')
+        .only(*(f'similar__{field}' for field in SIMILAR_JOB_FIELDS))
+        .order_by('position')
+    )
+    similar_jobs = [row.similar async for row in rows]
+
+    if not similar_jobs:
+        try:
+            current_job = await Job.objects.aget(job_id=job_id)
+        except Job.DoesNotExist:
+            return []
+        similar_ids = await sync_to_async(computeSimilarJobIds)(current_job)
+        jobs_by_id = await Job.objects.select_related('company').only(*SIMILAR_JOB_FIELDS).ain_bulk(similar_ids)
+        similar_jobs = [jobs_by_id[similar_id] for similar_id in similar_ids]
+
+    return formatSimilarJobs(similar_jobs)
+
+
+async def afetchJobCardsByIds(job_ids, fields, snippet_length=None):
+    """
+    Async version of storage.fetchJobCardsByIds.
+    """
+    rows = selectJobCards(Job.objects.filter(job_id__in=job_ids), fields, snippet_length, extra=('job_id',))
+    rows_by_id = {row['job_id']: row async for row in rows}
+    return formatJobCards([rows_by_id[job_id] for job_id in job_ids if job_id in rows_by_id], fields)
@@ -0,0 +1,199 @@
+import asyncio
+import json
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from config.instrumentation import measurePhase
+from .async_storage import afetchJobsListFromDB, afetchJobsPageFromDB, afetchJobFromDB, afetchSimilarJobs
+from .etags import ajobDetailsETag, ajobsListETag, asimilarJobsETag, isNotModified
+from .renderers import encodeJson
+from .storage import COUNT_MODES, LIST_CARD_FIELDS, MAX_PAGE_SIZE, SIMILAR_CARD_FIELDS, isPageNumber, isPageSize, parseCardOptions, parseJobId, parseListFilters
+
+
+"""
+Native async versions of the dashboard endpoints, served under /dashboard/async/.
+Request and response bodies are the same as the sync DRF views in dashboard/views.py,
+"fields" and "snippetLength" included, and so are the settings they follow
+(DASHBOARD_FAST_JSON, DASHBOARD_QUERY_BACKEND); under an ASGI server they run on
+the event loop instead of a thread-pool hop.
+"""
+
+
+def parseBody(request):
+    """
+    Returns the JSON request body as a dict, or None when it is not a JSON object.
+    """
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def jsonResponse(data, headers=None):
+    """
+    Renders data like FastJSONRenderer renders the sync views, writing the stored
+    JsonFragment payloads of DASHBOARD_FAST_JSON as they are.
+    """
+    with measurePhase('render'):
+        content = encodeJson(data)
+    return HttpResponse(content, content_type='application/json', headers=headers)
+
+
+def errorResponse(errorMessage, status=400):
+    return JsonResponse({"errorMessage": errorMessage}, status=status)
+
+
+def noDataResponse():
+    return JsonResponse({"ErrorMessage": "No Data found"}, status=204)
+
+
+def notModifiedResponse(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def getJobsList(request):
+    data = parseBody(request)
+    if data is None:
+        return errorResponse("Invalid JSON body")
+
+    page_size = data.get('page_size', 10)
+    count_mode = data.get('count_mode', 'exact')
+
+    if count_mode not in COUNT_MODES:
+        return errorResponse("Invalid count_mode")
+    if not isPageSize(page_size):
+        return errorResponse(f"page_size must be an integer from 1 to {MAX_PAGE_SIZE}")
+    try:
+        filters = parseListFilters(data)
+        cardOptions = parseCardOptions(data, LIST_CARD_FIELDS)
+    except ValueError as error:
+        return errorResponse(str(error))
+
+    etag = await ajobsListETag(data)
+    if isNotModified(request, etag):
+        return notModifiedResponse(etag)
+
+    if 'cursor' in data:
+        cursor = data.get('cursor')
+        try:
+            total_count, jobs, next_cursor = await afetchJobsPageFromDB(
+                **filters,
+                limit=page_size,
+                cursor=cursor,
+                count_mode=count_mode,
+                as_fragments=settings.DASHBOARD_FAST_JSON,
+                **cardOptions
+            )
+        except ValueError:
+            return errorResponse("Invalid cursor")
+
+        if(jobs == [] and not cursor):
+            return noDataResponse()
+
+        return jsonResponse({
+            "total_count": total_count,
+            "data": jobs,
+            "next_cursor": next_cursor
+        }, headers={"ETag": etag})
+
+    page_number = data.get('page_number', 1)
+    if not isPageNumber(page_number):
+        return errorResponse("page_number must be a positive integer")
+    offset = (page_number - 1) * page_size
+
+    total_count, paginated_jobs = await afetchJobsListFromDB(
+        **filters,
+        limit=page_size,
+        offset=offset,
+        count_mode=count_mode,
+        as_fragments=settings.DASHBOARD_FAST_JSON,
+        **cardOptions
+    )
+
+    if(paginated_jobs == [] and page_number == 1):
+        return noDataResponse()
+
+    return jsonResponse({
+        "total_count": total_count,
+        "data": paginated_jobs
+    }, headers={"ETag": etag})
+
+
+@csrf_exempt
+@require_POST
+async def getJobDetails(request):
+    data = parseBody(request)
+    if data is None:
+        return errorResponse("Invalid JSON body")
+
+    jobId = parseJobId(data.get('jobId'))
+    etag = await ajobDetailsETag(jobId)
+    if isNotModified(request, etag):
+        return notModifiedResponse(etag)
+
+    jobDetails = await afetchJobFromDB(jobId, as_fragment=settings.DASHBOARD_FAST_JSON)
+    if(jobDetails is None):
+        return noDataResponse()
+    return jsonResponse({"data": jobDetails}, headers={"ETag": etag} if etag else None)
+
+
+@csrf_exempt
+@require_POST
+async def getSimilarJobs(request):
+    data = parseBody(request)
+    if data is None:
+        return errorResponse("Invalid JSON body")
+
+    jobId = parseJobId(data.get('jobId'))
+    try:
+        cardOptions = parseCardOptions(data, SIMILAR_CARD_FIELDS)
+    except ValueError as error:
+        return errorResponse(str(error))
+
+    etag = await asimilarJobsETag(data)
+    if isNotModified(request, etag):
+        return notModifiedResponse(etag)
+
+    similarJobs = await afetchSimilarJobs(jobId, **cardOptions)
+    return jsonResponse({"similarJobs": similarJobs}, headers={"ETag": etag})
+
+
+"""
+POST /dashboard/async/get-job-page
+Everything the job details page needs in one call, the details and the similar
+jobs being looked up concurrently.
+Request
+{"jobId":"abc123"}
+
+Response
+{
+    "data": { ...same fields as get-job-details... },
+    "similarJobs": [ ...same items as get-similar-jobs... ]
+}
+"""
+@csrf_exempt
+@require_POST
+async def getJobPage(request):
+    data = parseBody(request)
+    if data is None:
+        return errorResponse("Invalid JSON body")
+
+    jobId = parseJobId(data.get('jobId'))
+    jobDetails, similarJobs = await asyncio.gather(
+        afetchJobFromDB(jobId, as_fragment=settings.DASHBOARD_FAST_JSON),
+        afetchSimilarJobs(jobId)
+    )
+    if(jobDetails is None):
+        return noDataResponse()
+    return jsonResponse({
+        "data": jobDetails,
+        "similarJobs": similarJobs
+    })
@@ -0,0 +1,223 @@
+"""
+In-process prefix index of the role names and locations of jobs, answering
+get-autocomplete without SQL.
+
+Each column's distinct values are kept with the number of jobs having them, and
+every word of a value starts a key of a sorted array ("frontend developer",
+"developer"), so a prefix of any word is a bisect plus a scan of the matching keys.
+Matches are ranked by job count.
+
+Each worker process keeps its own copy, loaded on first use. Writes are picked up
+from the JobChange log (see dashboard.snapshot.recordJobChange): the changed jobs
+are read by primary key and their old values, remembered per job, swapped for the
+new ones in a new index, which then replaces the one lookups are reading, as
+dashboard.snapshot does. Lookups see other writes after at most
+AUTOCOMPLETE_REFRESH_INTERVAL seconds; the log is polled at most that often, never
+on every keystroke.
+"""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Max
+
+from .models import Job, JobChange
+from .snapshot import LOAD_CHUNK_SIZE, maxDelta
+
+# API name of each column served, and its Job field
+AUTOCOMPLETE_FIELDS = {
+    "roleName": "role_name",
+    "location": "location",
+}
+
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+
+
+def normalizePrefix(text):
+    return " ".join(text.casefold().split())
+
+
+def wordKeys(value):
+    """
+    The keys value is found under: its normalized text from each word on.
+    """
+    words = normalizePrefix(value).split()
+    return [" ".join(words[start:]) for start in range(len(words))]
+
+
+class PrefixIndex:
+    """
+    The distinct values of one column and their job counts.
+    Values whose count drops to zero stay in keys until the next load and are skipped.
+    Treated as immutable; withDeltas returns a new index.
+    """
+
+    def __init__(self, counts, keys=None):
+        self.counts = counts
+        if keys is None:
+            keys = sorted((key, value) for value in self.counts for key in wordKeys(value))
+        self.keys = keys
+
+    def withDeltas(self, deltas):
+        """
+        Returns a new index with deltas ({value: change in job count}) added to the counts.
+        keys is shared with this index unless a value is new.
+        """
+        if not deltas:
+            return self
+        counts = dict(self.counts)
+        keys = self.keys
+        for value, delta in deltas.items():
+            if value not in counts:
+                if keys is self.keys:
+                    keys = list(keys)
+                counts[value] = 0
+                for key in wordKeys(value):
+                    bisect.insort(keys, (key, value))
+            counts[value] += delta
+        return PrefixIndex(counts, keys)
+
+    def complete(self, prefix, limit):
+        """
+        Returns up to limit (value, count) whose words start with prefix, most frequent first.
+        """
+        prefix = normalizePrefix(prefix)
+        counts = self.counts
+        matches = set()
+        position = bisect.bisect_left(self.keys, (prefix,))
+        while position < len(self.keys):
+            key, value = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            if counts[value] > 0:
+                matches.add(value)
+            position += 1
+        ranked = sorted(matches, key=lambda value: (-counts[value], value))[:limit]
+        return [(value, counts[value]) for value in ranked]
+
+
+class AutocompleteIndex:
+    """
+    A PrefixIndex per AUTOCOMPLETE_FIELDS column, plus each job's values so a
+    change can be undone from the counts.
+    Lookups treat it as immutable; withChanges returns a new index. job_values is
+    the exception: lookups never read it and it is handed on to the new index rather
+    than copied, so only the latest index of an AutocompleteStore may be refreshed.
+    """
+
+    def __init__(self, columns, job_values, change_id):
+        self.columns = columns
+        self.job_values = job_values
+        self.change_id = change_id
+
+    @classmethod
+    def fromRows(cls, rows, change_id):
+        """
+        Builds an index from rows of (job_id, *values).
+        """
+        job_values = {}
+        interned = {}
+        counts = [{} for _ in AUTOCOMPLETE_FIELDS]
+        for job_id, *values in rows:
+            values = interned.setdefault(tuple(values), tuple(values))
+            job_values[job_id] = values
+            for column, value in enumerate(values):
+                counts[column][value] = counts[column].get(value, 0) + 1
+        columns = dict(zip(AUTOCOMPLETE_FIELDS, (PrefixIndex(column) for column in counts)))
+        return cls(columns, job_values, change_id)
+
+    @classmethod
+    def load(cls):
+        # Read the change counter first, changes logged while the rows are read are applied again later
+        change_id = JobChange.objects.aggregate(last=Max('id'))['last'] or 0
+        rows = (
+            Job.objects
+            .values_list('job_id', *AUTOCOMPLETE_FIELDS.values())
+            .iterator(chunk_size=LOAD_CHUNK_SIZE)
+        )
+        return cls.fromRows(rows, change_id)
+
+    def withChanges(self, change_id, rows, deleted_ids):
+        """
+        Returns a new index with the counts of the jobs in rows ((job_id, *values))
+        moved to their new values and the jobs in deleted_ids dropped.
+        """
+        changes = [(job_id, tuple(values)) for job_id, *values in rows]
+        changes += [(job_id, None) for job_id in deleted_ids]
+        deltas = [{} for _ in self.columns]
+        for job_id, values in changes:
+            previous = self.job_values.pop(job_id, None)
+            if previous is not None:
+                for column, value in enumerate(previous):
+                    deltas[column][value] = deltas[column].get(value, 0) - 1
+            if values is not None:
+                self.job_values[job_id] = values
+                for column, value in enumerate(values):
+                    deltas[column][value] = deltas[column].get(value, 0) + 1
+        columns = {
+            field: column.withDeltas({value: delta for value, delta in column_deltas.items() if delta})
+            for (field, column), column_deltas in zip(self.columns.items(), deltas)
+        }
+        return AutocompleteIndex(columns, self.job_values, change_id)
+
+    def complete(self, field, prefix, limit=DEFAULT_SUGGESTIONS):
+        return self.columns[field].complete(prefix, limit)
+
+
+class AutocompleteStore:
+    """
+    Holds this process's AutocompleteIndex and refreshes it from the JobChange log.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+        self.checked_at = 0.0
+
+    def reset(self):
+        with self.lock:
+            self.index = None
+
+    def get(self):
+        index = self.index
+        interval = getattr(settings, 'AUTOCOMPLETE_REFRESH_INTERVAL', 1.0)
+        if index is not None and time.monotonic() - self.checked_at < interval:
+            return index
+        # While another thread refreshes, keep serving the current index
+        if not self.lock.acquire(blocking=index is None):
+            return index
+        try:
+            self.checked_at = time.monotonic()
+            if self.index is None:
+                self.index = AutocompleteIndex.load()
+            else:
+                self.index = self.refreshed(self.index)
+            return self.index
+        finally:
+            self.lock.release()
+
+    def refreshed(self, index):
+        limit = maxDelta()
+        changes = list(
+            JobChange.objects
+            .filter(id__gt=index.change_id)
+            .order_by('id')
+            .values_list('id', 'job_id')[:limit + 1]
+        )
+        if not changes:
+            return index
+        job_ids = {job_id for _, job_id in changes}
+        if len(changes) > limit or None in job_ids:
+            return AutocompleteIndex.load()
+
+        job_ids = list(job_ids)
+        rows = []
+        for start in range(0, len(job_ids), 500):
+            rows += Job.objects.filter(job_id__in=job_ids[start:start + 500]).values_list('job_id', *AUTOCOMPLETE_FIELDS.values())
+        deleted_ids = set(job_ids) - {row[0] for row in rows}
+        return index.withChanges(changes[-1][0], rows, deleted_ids)
+
+
+autocomplete_index = AutocompleteStore()
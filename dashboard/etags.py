@@ -0,0 +1,99 @@
+"""
+ETags for the read endpoints, computed from data versions rather than from the
+response body, so a client repeating a request with If-None-Match gets a 304
+before anything is fetched or rendered.
+
+- get-job-details: the updated_at of the job and of its company, one primary key
+  lookup joined to another
+- get-similar-jobs and get-jobs-list: the jobs generation (storage.getJobsGeneration),
+  which every Job save or delete moves on, plus the request parameters
+
+The tags are weak: the same data may be rendered with different bytes
+(DASHBOARD_FAST_JSON, orjson or not).
+"""
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.utils.http import parse_etags
+
+from .models import Job
+from .routers import readsFromReplica
+from .storage import JOBS_GENERATION_KEY, getJobsGeneration
+
+# Request fields that do not change the response
+IGNORED_REQUEST_FIELDS = ('token',)
+
+
+def makeETag(*parts):
+    return 'W/"{}"'.format(hashlib.sha1(repr(parts).encode()).hexdigest())
+
+
+def requestKey(data):
+    """
+    Canonical form of a request body, whatever its key order.
+    """
+    fields = {key: value for key, value in data.items() if key not in IGNORED_REQUEST_FIELDS}
+    return json.dumps(fields, sort_keys=True, default=str)
+
+
+@readsFromReplica
+def jobDetailsETag(job_id):
+    """
+    Returns the ETag of a job's details, or None when the job does not exist.
+    """
+    if job_id is None:
+        return None
+    row = Job.objects.filter(job_id=job_id).values_list('updated_at', 'company__updated_at').first()
+    if row is None:
+        return None
+    return makeETag('details', job_id, *(updated_at.isoformat() for updated_at in row))
+
+
+def similarJobsETag(data):
+    return makeETag('similar', getJobsGeneration(), requestKey(data))
+
+
+def jobsListETag(data):
+    return makeETag('list', getJobsGeneration(), requestKey(data))
+
+
+@readsFromReplica
+async def ajobDetailsETag(job_id):
+    """
+    Async version of jobDetailsETag.
+    """
+    if job_id is None:
+        return None
+    row = await Job.objects.filter(job_id=job_id).values_list('updated_at', 'company__updated_at').afirst()
+    if row is None:
+        return None
+    return makeETag('details', job_id, *(updated_at.isoformat() for updated_at in row))
+
+
+async def ajobsGeneration():
+    return await cache.aget_or_set(JOBS_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+async def asimilarJobsETag(data):
+    return makeETag('similar', await ajobsGeneration(), requestKey(data))
+
+
+async def ajobsListETag(data):
+    return makeETag('list', await ajobsGeneration(), requestKey(data))
+
+
+def isNotModified(request, etag):
+    """
+    True when the request's If-None-Match lists etag, compared weakly as RFC 9110 asks.
+    """
+    if etag is None:
+        return False
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(candidate.removeprefix('W/') == opaque for candidate in parse_etags(header))
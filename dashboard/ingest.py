@@ -0,0 +1,324 @@
+"""
+Bulk upsert of jobs from a partner feed, for POST /dashboard/ingest-jobs and the
+ingest_jobs management command.
+
+The feed is read as a stream, a JSON array or NDJSON, and handled in chunks of
+JOB_INGEST_CHUNK_SIZE rows. Each chunk is validated row by row against the Job and
+Company fields; invalid rows are reported and skipped, the others written in one
+transaction with a single INSERT ... ON CONFLICT DO UPDATE, so a job_id already
+stored is updated rather than failing the load. Everything derived from jobs (skill
+index, similar jobs, change log, cached counts and details) is then updated once
+for the chunk; the search index follows through its triggers.
+
+Rows use the get-job-details keys plus companyName. A company is looked up by
+name; one not stored yet is created from the first row naming it, the company
+keys of the other rows are ignored.
+"""
+import codecs
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .constants import EmploymentType
+from .models import Company, Job, JobSkill
+from .similar import refreshManySimilarJobs
+from .skills import indexJobSkills, isSkillsFilter
+from .snapshot import recordJobChanges
+from .storage import bumpJobsGeneration, invalidateManyJobDetails
+
+# Row key of each Job field set from the feed
+JOB_INGEST_FIELDS = {
+    "jobId": "job_id",
+    "roleName": "role_name",
+    "location": "location",
+    "employmentType": "employment_type",
+    "salary": "salary",
+    "jobDescription": "job_description",
+    "stars": "stars",
+    "skills": "skills",
+}
+
+# Row key of each Company field, used when the company does not exist yet
+COMPANY_INGEST_FIELDS = {
+    "companyName": "name",
+    "companyLogoUrl": "logo_url",
+    "companyUrl": "careers_url",
+    "LifeAtCompanyDescription": "life_at_company_description",
+    "LifeAtCompanyImageUrl": "life_at_company_image_url",
+}
+
+# Job columns rewritten when a row's job_id already exists
+UPSERT_FIELDS = (
+    'role_name', 'company', 'location', 'employment_type', 'salary', 'job_description',
+    'stars', 'skills', 'list_payload', 'detail_payload', 'updated_at',
+)
+
+# Columns Job.clean_fields does not check: set from the company or generated
+UNCHECKED_JOB_FIELDS = ('company', 'list_payload', 'detail_payload', 'updated_at')
+
+EMPLOYMENT_TYPE_CODES = {
+    **{code: code for code in EmploymentType.values},
+    **{label: code for code, label in EmploymentType.choices},
+}
+
+MIN_STARS, MAX_STARS = 1, 5
+
+# Bytes read from the stream at a time while parsing a JSON array
+READ_SIZE = 64 * 1024
+
+# Per-row errors listed in a report; the count covers all of them
+MAX_REPORTED_ERRORS = 1000
+
+
+def chunkSize():
+    return getattr(settings, 'JOB_INGEST_CHUNK_SIZE', 1000)
+
+
+class IngestReport:
+    """
+    Counts and per-row errors of one ingest run.
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.error_message = None
+
+    def addError(self, row_number, job_id, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "jobId": job_id, "errors": errors})
+
+    def asDict(self):
+        report = {
+            "received": self.received,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+        if self.error_message is not None:
+            report["errorMessage"] = self.error_message
+        return report
+
+
+def iterNdjson(stream):
+    """
+    Yields (line number, row) for each non-blank line of a binary NDJSON stream;
+    row is a ValueError for a line that is not valid JSON.
+    """
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as error:
+            yield line_number, error
+
+
+def iterJsonArray(stream, read_size=READ_SIZE):
+    """
+    Yields (position, item) for each item of a top-level JSON array, starting at 1,
+    reading the binary stream read_size bytes at a time so the payload is never
+    held in memory whole. Raises ValueError when the payload is not such an array;
+    the items before the error have been yielded.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer, position, eof = '', 0, False
+    # "[" first, then an item (or "]" for an empty array), then "," or "]"
+    expecting = '['
+    count = 0
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\n\r':
+            position += 1
+        if position == len(buffer):
+            if eof:
+                raise ValueError("The JSON array is not closed")
+            data = stream.read(read_size)
+            eof = not data
+            buffer, position = buffer[position:] + text.decode(data, final=eof), 0
+            continue
+
+        char = buffer[position]
+        if expecting == '[':
+            if char != '[':
+                raise ValueError("The payload must be a JSON array")
+            position += 1
+            expecting = 'first'
+        elif char == ']' and expecting in ('first', ','):
+            return
+        elif expecting == ',':
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' after item {count}")
+            position += 1
+            expecting = 'item'
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                end = None
+            # An item reaching the end of the buffer may be cut short (e.g. a number), read on
+            if end is None or (end == len(buffer) and not eof):
+                if eof:
+                    raise ValueError(f"Item {count + 1} is not valid JSON")
+                data = stream.read(read_size)
+                eof = not data
+                buffer, position = buffer[position:] + text.decode(data, final=eof), 0
+                continue
+            count += 1
+            yield count, item
+            position = end
+            expecting = ','
+
+
+def ingestJobs(rows, chunk_size=None):
+    """
+    Upserts the jobs of an iterable of (row number, row) as produced by iterNdjson
+    or iterJsonArray. Returns an IngestReport; a ValueError raised by rows stops the
+    run after the rows read so far are written and is reported as its error_message.
+    """
+    chunk_size = chunk_size or chunkSize()
+    report = IngestReport()
+    chunk = []
+    rows = iter(rows)
+    while True:
+        try:
+            row_number, row = next(rows)
+        except StopIteration:
+            break
+        except ValueError as error:
+            report.error_message = str(error)
+            break
+        report.received += 1
+        chunk.append((row_number, row))
+        if len(chunk) >= chunk_size:
+            ingestChunk(chunk, report)
+            chunk = []
+    ingestChunk(chunk, report)
+    return report
+
+
+def ingestChunk(chunk, report):
+    jobs = validateChunk(chunk, report)
+    if not jobs:
+        return
+
+    with transaction.atomic():
+        new_companies = {job.company.name: job.company for job in jobs.values() if job.company.pk is None}
+        Company.objects.bulk_create(new_companies.values())
+        # bulk_create may not set the ids on every backend, read them back by name
+        if any(company.pk is None for company in new_companies.values()):
+            created = Company.objects.in_bulk(list(new_companies), field_name='name')
+            for job in jobs.values():
+                if job.company.pk is None:
+                    job.company = created[job.company.name]
+
+        job_ids = list(jobs)
+        previous = {
+            job_id: (company_id, stars)
+            for job_id, company_id, stars in Job.objects.filter(job_id__in=job_ids).values_list('job_id', 'company_id', 'stars')
+        }
+        for job in jobs.values():
+            job.refreshPayloads()
+        Job.objects.bulk_create(
+            jobs.values(),
+            update_conflicts=True,
+            unique_fields=['job_id'],
+            update_fields=UPSERT_FIELDS,
+        )
+
+        # Updated jobs may have dropped skills, reindex them from scratch
+        JobSkill.objects.filter(job_id__in=list(previous)).delete()
+        indexJobSkills(jobs.values())
+        refreshManySimilarJobs({
+            job_id: (previous.get(job_id), (job.company_id, job.stars)) for job_id, job in jobs.items()
+        })
+        recordJobChanges(job_ids)
+
+    invalidateManyJobDetails(job_ids)
+    bumpJobsGeneration()
+    report.updated += len(previous)
+    report.created += len(jobs) - len(previous)
+
+
+def validateChunk(chunk, report):
+    """
+    Returns {job_id: unsaved Job} for the valid rows of a chunk, a later row
+    winning over an earlier one with the same jobId, and reports the others.
+    Companies are looked up with one query for the chunk.
+    """
+    names = {row.get("companyName") for _, row in chunk if isinstance(row, dict)}
+    companies = Company.objects.in_bulk([name for name in names if isinstance(name, str)], field_name='name')
+
+    jobs = {}
+    for row_number, row in chunk:
+        if not isinstance(row, dict):
+            message = str(row) if isinstance(row, ValueError) else "A row must be a JSON object"
+            report.addError(row_number, None, {"row": [message]})
+            continue
+        job_id = row.get("jobId")
+        try:
+            job = buildJob(row, companies)
+        except ValidationError as error:
+            report.addError(row_number, job_id, error.message_dict)
+            continue
+        jobs.pop(job.job_id, None)
+        jobs[job.job_id] = job
+    return jobs
+
+
+def buildJob(row, companies):
+    """
+    Builds the unsaved Job of a feed row, with a saved Company or a new one
+    (added to companies) when the name is unknown. Raises ValidationError.
+    """
+    errors = {}
+    values = {field: row.get(key) for key, field in JOB_INGEST_FIELDS.items()}
+
+    if values["employment_type"] is None:
+        values["employment_type"] = EmploymentType.FULL_TIME
+    elif isinstance(values["employment_type"], str) and values["employment_type"] in EMPLOYMENT_TYPE_CODES:
+        values["employment_type"] = EMPLOYMENT_TYPE_CODES[values["employment_type"]]
+    for key in ("salary", "stars"):
+        value = row.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+            errors[key] = ["Must be an integer."]
+    if isinstance(values["stars"], int) and not MIN_STARS <= values["stars"] <= MAX_STARS:
+        errors["stars"] = [f"Must be from {MIN_STARS} to {MAX_STARS}."]
+    if isinstance(values["salary"], int) and values["salary"] < 0:
+        errors["salary"] = ["Must not be negative."]
+    if not isSkillsFilter(values["skills"]):
+        errors["skills"] = ["Must be a list of strings."]
+
+    job = Job(**values)
+    try:
+        job.clean_fields(exclude=[*UNCHECKED_JOB_FIELDS, *(JOB_INGEST_FIELDS[key] for key in errors)])
+    except ValidationError as error:
+        keys = {field: key for key, field in JOB_INGEST_FIELDS.items()}
+        errors.update({keys[field]: messages for field, messages in error.message_dict.items()})
+
+    name = row.get("companyName")
+    if not isinstance(name, str) or not name.strip():
+        errors["companyName"] = ["This field is required."]
+    elif name in companies:
+        job.company = companies[name]
+    else:
+        company = Company(**{field: row.get(key) for key, field in COMPANY_INGEST_FIELDS.items()})
+        try:
+            company.clean_fields()
+        except ValidationError as error:
+            keys = {field: key for key, field in COMPANY_INGEST_FIELDS.items()}
+            errors.update({keys[field]: messages for field, messages in error.message_dict.items()})
+        else:
+            companies[name] = company
+            job.company = company
+
+    if errors:
+        raise ValidationError(errors)
+    return job
@@ -0,0 +1,45 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.ingest import ingestJobs, iterJsonArray, iterNdjson
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+
+class Command(BaseCommand):
+    help = "Upserts jobs from a JSON array or NDJSON feed, see dashboard/ingest.py for the row format"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Feed file, or - for standard input")
+        parser.add_argument('--format', choices=('json', 'ndjson'), default=None,
+                            help="ndjson for .ndjson / .jsonl files and json otherwise by default")
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help="Rows per transaction, JOB_INGEST_CHUNK_SIZE by default")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be >= 1")
+        feed_format = options['format'] or ('ndjson' if path.endswith(NDJSON_SUFFIXES) else 'json')
+        parse = iterNdjson if feed_format == 'ndjson' else iterJsonArray
+
+        if path == '-':
+            report = ingestJobs(parse(sys.stdin.buffer), options['chunk_size'])
+        else:
+            try:
+                stream = open(path, 'rb')
+            except OSError as error:
+                raise CommandError(f"Cannot read {path}: {error}")
+            with stream:
+                report = ingestJobs(parse(stream), options['chunk_size'])
+
+        for error in report.errors:
+            self.stderr.write(json.dumps(error))
+        if report.failed > len(report.errors):
+            self.stderr.write(f"... and {report.failed - len(report.errors)} more rejected rows")
+        summary = f"{report.created} jobs created, {report.updated} updated, {report.failed} rejected."
+        if report.error_message is not None:
+            raise CommandError(f"{report.error_message}. Before it: {summary}")
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,280 @@
+import itertools
+import multiprocessing
+import random
+import time
+from collections import deque
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from dashboard.constants import EmploymentType
+from dashboard.models import Company, Job
+from dashboard.search import CREATE_SEARCH_TRIGGERS_SQL, DROP_SEARCH_TRIGGERS_SQL, indexNewJobs, lastJobRowid
+from dashboard.similar import rebuildAllSimilarJobs
+from dashboard.snapshot import recordJobChange
+from dashboard.skills import indexJobSkills
+from dashboard.storage import bumpJobsGeneration, invalidateManyJobDetails
+
+ROLES = ['DevOps Engineer', 'Frontend Developer', 'Backend Developer', 'Full Stack Developer', 'Data Scientist', 'Product Manager']
+ROLE_WEIGHTS = [10, 20, 25, 20, 15, 10]
+
+LOCATIONS = ['Delhi', 'Bangalore', 'Hyderabad', 'Mumbai', 'Pune', 'Remote']
+LOCATION_WEIGHTS = [15, 35, 15, 15, 10, 10]
+
+EMPLOYMENT_TYPE_WEIGHTS = {
+    EmploymentType.FULL_TIME: 70,
+    EmploymentType.PART_TIME: 10,
+    EmploymentType.INTERNSHIP: 12,
+    EmploymentType.FREELANCE: 8,
+}
+
+# Most jobs are rated 3-4, few 1 or 5
+STARS = [1, 2, 3, 4, 5]
+STARS_WEIGHTS = [5, 10, 30, 35, 20]
+
+# Salaries (LPA) are log-normal around ~12, capped to the range the filters use
+SALARY_MU = 2.5
+SALARY_SIGMA = 0.6
+MAX_SALARY = 100
+
+SKILLS = ["Python", "Java", "JavaScript", "C++", "C#", "Spring Boot", "Azure", "GCP", "Golang", "Node.js", "Django", "React", "AWS", "Docker", "Kubernetes", "SQL", "PostgreSQL", "MongoDB", "NoSQL"]
+
+WELL_KNOWN_COMPANIES = ['Google', 'Netflix', 'Amazon', 'Microsoft', 'Meta', 'Startup Inc']
+
+# Applied for the duration of the load and restored afterwards
+BULK_LOAD_PRAGMAS = {
+    'synchronous': 'OFF',
+    'journal_mode': 'MEMORY',
+    'temp_store': 'MEMORY',
+    'cache_size': '-262144',  # 256 MiB
+}
+
+
+def companyNames(count):
+    """
+    Returns count company names, the well known ones first.
+    """
+    extra = [f"Company {i:05d}" for i in range(max(count - len(WELL_KNOWN_COMPANIES), 0))]
+    return (WELL_KNOWN_COMPANIES + extra)[:count]
+
+
+def buildCompany(name):
+    slug = name.lower().replace(' ', '')
+    return Company(
+        name=name,
+        logo_url=slug,
+        careers_url=f"https://www.{slug}.com/careers",
+        life_at_company_description=f"Life at {name} is great! " * 7,
+        life_at_company_image_url=slug
+    )
+
+
+def generateJobs(seed, start, count, id_prefix, companies, company_skew):
+    """
+    Builds the Job objects numbered start .. start + count - 1, payloads included.
+    Each chunk has its own generator seeded from (seed, start), so the output does
+    not depend on how chunks are spread over worker processes.
+    companies are saved Company objects, passed along so workers need no queries.
+    Company sizes follow a Zipf law: company k gets a share proportional to 1 / k ** company_skew.
+    """
+    rng = random.Random(f"{seed}:{start}")
+    company_weights = list(itertools.accumulate(1 / rank ** company_skew for rank in range(1, len(companies) + 1)))
+    role_weights = list(itertools.accumulate(ROLE_WEIGHTS))
+    location_weights = list(itertools.accumulate(LOCATION_WEIGHTS))
+    type_weights = list(itertools.accumulate(EMPLOYMENT_TYPE_WEIGHTS.values()))
+    stars_weights = list(itertools.accumulate(STARS_WEIGHTS))
+    employment_types = list(EMPLOYMENT_TYPE_WEIGHTS)
+
+    jobs = []
+    for index in range(start, start + count):
+        role = rng.choices(ROLES, cum_weights=role_weights)[0]
+        company = rng.choices(companies, cum_weights=company_weights)[0]
+        skills = rng.sample(SKILLS, k=rng.randint(3, 6))
+
+        job = Job(
+            job_id=f"{id_prefix}{index:08d}",
+            role_name=role,
+            company=company,
+            location=rng.choices(LOCATIONS, cum_weights=location_weights)[0],
+            employment_type=rng.choices(employment_types, cum_weights=type_weights)[0],
+            salary=min(max(int(rng.lognormvariate(SALARY_MU, SALARY_SIGMA)), 1), MAX_SALARY),
+            job_description=f"Join {company.name} as a {role}. You will work with {', '.join(skills)}. " * 3,
+            stars=rng.choices(STARS, cum_weights=stars_weights)[0],
+            skills=skills
+        )
+        # bulk_create skips Job.save(), so serialize the stored payloads here
+        job.refreshPayloads()
+        jobs.append(job)
+    return jobs
+
+
+def generateChunk(chunk):
+    return generateJobs(*chunk)
+
+
+def setupWorker():
+    # Needed with the spawn start method; a no-op for forked workers
+    import django
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = "Generates synthetic jobs for development and benchmarking, up to millions of rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=150)
+        parser.add_argument('--seed', type=int, default=0,
+                            help="The same seed, count and batch size give the same jobs, whatever the number of workers")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Jobs generated and inserted per transaction")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Processes generating jobs; inserts always happen in this process")
+        parser.add_argument('--companies', type=int, default=500)
+        parser.add_argument('--company-skew', type=float, default=1.1)
+        parser.add_argument('--id-prefix', default=None,
+                            help="Prefix of the generated job ids, s<seed>- by default")
+        parser.add_argument('--clear', action='store_true',
+                            help="Delete every existing job first")
+
+    def handle(self, *args, **options):
+        count = options['count']
+        batch_size = options['batch_size']
+        workers = options['workers']
+        self.verbosity = options['verbosity']
+        id_prefix = options['id_prefix'] if options['id_prefix'] is not None else f"s{options['seed']}-"
+
+        if count < 0 or batch_size < 1 or workers < 1 or options['companies'] < 1:
+            raise CommandError("--count must be >= 0; --batch-size, --workers and --companies must be >= 1")
+        if not options['clear'] and Job.objects.filter(job_id__startswith=id_prefix).exists():
+            raise CommandError(f"Jobs with the id prefix {id_prefix!r} already exist, use --clear or another --seed / --id-prefix")
+
+        companies = self.ensureCompanies(companyNames(options['companies']))
+        chunks = [
+            (options['seed'], start, min(batch_size, count - start), id_prefix, companies, options['company_skew'])
+            for start in range(0, count, batch_size)
+        ]
+
+        started = time.monotonic()
+        pool = None
+        if workers > 1:
+            # Fork before the load pragmas are set: workers must not share the parent's SQLite connection
+            connections.close_all()
+            pool = multiprocessing.Pool(workers, initializer=setupWorker)
+        previous_pragmas = self.applyPragmas(BULK_LOAD_PRAGMAS)
+        cleared_ids = []
+        try:
+            with transaction.atomic():
+                self.runSql(DROP_SEARCH_TRIGGERS_SQL)
+                create_indexes_sql = self.dropIndexes()
+                if options['clear']:
+                    cleared_ids = list(Job.objects.values_list('job_id', flat=True))
+                    # Raw deletes, the ORM would load every row to cascade
+                    self.runSql(("DELETE FROM dashboard_similarjob", "DELETE FROM dashboard_jobskill", "DELETE FROM dashboard_job", "DELETE FROM dashboard_job_fts"))
+                last_rowid = lastJobRowid()
+            try:
+                created = self.insertChunks(chunks, pool, workers, started)
+            finally:
+                # The triggers are skipped during the load and the new rows indexed in one pass
+                with transaction.atomic():
+                    self.runSql(CREATE_SEARCH_TRIGGERS_SQL)
+                    indexNewJobs(last_rowid)
+                    self.runSql(create_indexes_sql)
+        finally:
+            self.applyPragmas(previous_pragmas)
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        # bulk_create skips post_save and the raw deletes post_delete, so invalidate cached
+        # counts and details, reload snapshots and rebuild similar jobs explicitly
+        bumpJobsGeneration()
+        for start in range(0, len(cleared_ids), batch_size):
+            invalidateManyJobDetails(cleared_ids[start:start + batch_size])
+        recordJobChange(None)
+        with transaction.atomic():
+            rebuildAllSimilarJobs(batch_size=batch_size)
+        # Row statistics let SQLite read a list page in (stars, job_id) index order when
+        # the filters are broad, instead of sorting every matching row
+        self.runSql(("ANALYZE",))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully created {created} jobs in {time.monotonic() - started:.1f}s."
+        ))
+
+    def insertChunks(self, chunks, pool, workers, started):
+        created = 0
+        if pool is None:
+            for chunk in chunks:
+                created += self.insertJobs(generateChunk(chunk))
+                self.reportProgress(created, started)
+            return created
+
+        # At most 2 chunks per worker are in flight, so memory stays flat whatever the count
+        pending = deque()
+        remaining = iter(chunks)
+        for chunk in itertools.islice(remaining, workers * 2):
+            pending.append(pool.apply_async(generateChunk, (chunk,)))
+        while pending:
+            jobs = pending.popleft().get()
+            for chunk in itertools.islice(remaining, 1):
+                pending.append(pool.apply_async(generateChunk, (chunk,)))
+            created += self.insertJobs(jobs)
+            self.reportProgress(created, started)
+        return created
+
+    def ensureCompanies(self, names):
+        """
+        Returns the Company of each name, in order, creating the missing ones.
+        """
+        existing = Company.objects.in_bulk(names, field_name='name')
+        Company.objects.bulk_create([buildCompany(name) for name in names if name not in existing])
+        by_name = Company.objects.in_bulk(names, field_name='name')
+        return [by_name[name] for name in names]
+
+    def insertJobs(self, jobs):
+        with transaction.atomic():
+            Job.objects.bulk_create(jobs, batch_size=len(jobs))
+            indexJobSkills(jobs)
+        return len(jobs)
+
+    def reportProgress(self, created, started):
+        if self.verbosity >= 2:
+            elapsed = time.monotonic() - started
+            self.stdout.write(f"{created} jobs inserted, {created / max(elapsed, 1e-9):.0f} jobs/s")
+
+    def dropIndexes(self):
+        """
+        Drops the secondary indexes of dashboard_job and returns the statements recreating them.
+        Building them once after the load beats updating them row by row.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name, sql FROM sqlite_master "
+                "WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL",
+                [Job._meta.db_table]
+            )
+            indexes = cursor.fetchall()
+            for name, sql in indexes:
+                cursor.execute(f'DROP INDEX "{name}"')
+        return [sql for name, sql in indexes]
+
+    def runSql(self, statements):
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def applyPragmas(self, pragmas):
+        """
+        Sets the given pragmas and returns their previous values.
+        Pragmas such as synchronous cannot change inside a transaction, so nothing
+        is changed when the command runs inside one (e.g. from a test).
+        """
+        if connection.vendor != 'sqlite' or connection.in_atomic_block:
+            return {}
+        previous = {}
+        with connection.cursor() as cursor:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}")
+                previous[name] = str(cursor.fetchone()[0])
+                cursor.execute(f"PRAGMA {name} = {value}")
+        return previous
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard.search import rebuildJobSearchIndex
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index over Job.role_name and Job.job_description"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuildJobSearchIndex()
+        self.stdout.write(self.style.SUCCESS("Job search index rebuilt."))
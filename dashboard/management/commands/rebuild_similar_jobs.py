@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard.similar import rebuildAllSimilarJobs
+
+
+class Command(BaseCommand):
+    help = "Recomputes the precomputed similar jobs of every Job"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            processed = rebuildAllSimilarJobs(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt similar jobs for {processed} jobs."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard.models import Job
+
+
+class Command(BaseCommand):
+    help = "Regenerates the pre-serialized list card and details JSON stored on every Job"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        refreshed = 0
+        batch = []
+        with transaction.atomic():
+            for job in Job.objects.order_by('job_id').iterator(chunk_size=batch_size):
+                job.refreshPayloads()
+                batch.append(job)
+                if len(batch) >= batch_size:
+                    Job.objects.bulk_update(batch, ['list_payload', 'detail_payload'])
+                    refreshed += len(batch)
+                    batch = []
+            Job.objects.bulk_update(batch, ['list_payload', 'detail_payload'])
+            refreshed += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed payloads of {refreshed} jobs."))
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:06
+
+import dashboard.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# FTS5 index over role_name and job_description. Rows share dashboard_job's rowid so
+# the triggers can find them without a scan, and carry job_id for the ORM join.
+CREATE_SEARCH_INDEX_SQL = [
+    """
+    CREATE VIRTUAL TABLE dashboard_job_fts USING fts5(
+        job_id UNINDEXED,
+        role_name,
+        job_description,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    # Rank role_name matches well above matches in the description
+    "INSERT INTO dashboard_job_fts(dashboard_job_fts, rank) VALUES('rank', 'bm25(0.0, 10.0, 1.0)')",
+    """
+    CREATE TRIGGER dashboard_job_fts_ai AFTER INSERT ON dashboard_job BEGIN
+        INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+        VALUES (new.rowid, new.job_id, new.role_name, new.job_description);
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_job_fts_ad AFTER DELETE ON dashboard_job BEGIN
+        DELETE FROM dashboard_job_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_job_fts_au AFTER UPDATE OF job_id, role_name, job_description ON dashboard_job BEGIN
+        DELETE FROM dashboard_job_fts WHERE rowid = old.rowid;
+        INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+        VALUES (new.rowid, new.job_id, new.role_name, new.job_description);
+    END
+    """,
+    """
+    INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+    SELECT rowid, job_id, role_name, job_description FROM dashboard_job
+    """,
+]
+
+DROP_SEARCH_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_au",
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_ad",
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_ai",
+    "DROP TABLE IF EXISTS dashboard_job_fts",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_job_list_and_similar_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchIndex',
+            fields=[
+                ('job', models.OneToOneField(db_column='job_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='dashboard.job')),
+                ('role_name', models.TextField()),
+                ('job_description', models.TextField()),
+                ('document', dashboard.models.FullTextSearchField(db_column='dashboard_job_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'dashboard_job_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(CREATE_SEARCH_INDEX_SQL, DROP_SEARCH_INDEX_SQL),
+    ]
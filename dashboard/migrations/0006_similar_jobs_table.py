@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_job_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_company_stars_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company_logo_url', '-stars', 'job_id'], name='job_company_stars_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='similarjob',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_jobs', to='dashboard.job'),
+        ),
+        migrations.AddField(
+            model_name='similarjob',
+            name='similar',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='dashboard.job'),
+        ),
+        migrations.AddConstraint(
+            model_name='similarjob',
+            constraint=models.UniqueConstraint(fields=('job', 'position'), name='similarjob_job_position_uniq'),
+        ),
+    ]
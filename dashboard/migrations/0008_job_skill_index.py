@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def normalizeSkills(skills):
+    """
+    dashboard.skills.normalizeSkills as of this migration, copied so later changes
+    to the app cannot alter it: the distinct non-empty skills, case-folded with
+    whitespace collapsed, sorted.
+    """
+    if not isinstance(skills, (list, tuple)):
+        return []
+    return sorted({normalized for normalized in (' '.join(str(skill).split()).casefold() for skill in skills) if normalized})
+
+
+def backfillJobSkills(apps, schema_editor):
+    Job = apps.get_model('dashboard', 'Job')
+    JobSkill = apps.get_model('dashboard', 'JobSkill')
+    rows = []
+    for job_id, skills in Job.objects.values_list('job_id', 'skills').iterator(chunk_size=1000):
+        rows.extend(JobSkill(job_id=job_id, skill=skill) for skill in normalizeSkills(skills))
+        if len(rows) >= 1000:
+            JobSkill.objects.bulk_create(rows)
+            rows = []
+    JobSkill.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_job_payloads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_index', to='dashboard.job')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'job'), name='jobskill_skill_job_uniq')],
+            },
+        ),
+        migrations.RunPython(backfillJobSkills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+# dashboard.search.RESTORE_SEARCH_INDEX_SQL as of this migration, copied so later changes
+# to the app cannot alter it. SQLite drops the search triggers whenever dashboard_job is
+# rebuilt, and the rebuild renumbers its rowids, so the index is repopulated too.
+RESTORE_SEARCH_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_ai",
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_ad",
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_au",
+    """
+    CREATE TRIGGER dashboard_job_fts_ai AFTER INSERT ON dashboard_job BEGIN
+        INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+        VALUES (new.rowid, new.job_id, new.role_name, new.job_description);
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_job_fts_ad AFTER DELETE ON dashboard_job BEGIN
+        DELETE FROM dashboard_job_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_job_fts_au AFTER UPDATE OF job_id, role_name, job_description ON dashboard_job BEGIN
+        DELETE FROM dashboard_job_fts WHERE rowid = old.rowid;
+        INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+        VALUES (new.rowid, new.job_id, new.role_name, new.job_description);
+    END
+    """,
+    "DELETE FROM dashboard_job_fts",
+    """
+    INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+    SELECT rowid, job_id, role_name, job_description FROM dashboard_job
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_job_skill_index'),
+    ]
+
+    operations = [
+        # Undoing the column below rebuilds dashboard_job again, restore the search index after it
+        migrations.RunSQL(migrations.RunSQL.noop, RESTORE_SEARCH_INDEX_SQL),
+        migrations.AddField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        # Adding the column rebuilt dashboard_job, which dropped the search triggers
+        migrations.RunSQL(RESTORE_SEARCH_INDEX_SQL, migrations.RunSQL.noop),
+    ]
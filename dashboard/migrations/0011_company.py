@@ -0,0 +1,153 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+# dashboard.search.RESTORE_SEARCH_INDEX_SQL as of this migration, copied so later changes
+# to the app cannot alter it. SQLite drops the search triggers whenever dashboard_job is
+# rebuilt, and the rebuild renumbers its rowids, so the index is repopulated too.
+RESTORE_SEARCH_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_ai",
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_ad",
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_au",
+    """
+    CREATE TRIGGER dashboard_job_fts_ai AFTER INSERT ON dashboard_job BEGIN
+        INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+        VALUES (new.rowid, new.job_id, new.role_name, new.job_description);
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_job_fts_ad AFTER DELETE ON dashboard_job BEGIN
+        DELETE FROM dashboard_job_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_job_fts_au AFTER UPDATE OF job_id, role_name, job_description ON dashboard_job BEGIN
+        DELETE FROM dashboard_job_fts WHERE rowid = old.rowid;
+        INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+        VALUES (new.rowid, new.job_id, new.role_name, new.job_description);
+    END
+    """,
+    "DELETE FROM dashboard_job_fts",
+    """
+    INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+    SELECT rowid, job_id, role_name, job_description FROM dashboard_job
+    """,
+]
+
+
+def backfillCompanies(apps, schema_editor):
+    """
+    One Company per distinct company_logo_url, which is what jobs were grouped
+    by until now; the other company attributes come from its first job.
+    """
+    Job = apps.get_model('dashboard', 'Job')
+    Company = apps.get_model('dashboard', 'Company')
+    companies = {}
+    rows = Job.objects.order_by('job_id').values_list(
+        'company_logo_url', 'company_url', 'life_at_company_description', 'life_at_company_image_url'
+    )
+    for logo_url, careers_url, life_description, life_image_url in rows.iterator(chunk_size=1000):
+        if logo_url not in companies:
+            companies[logo_url] = Company(
+                name=logo_url,
+                logo_url=logo_url,
+                careers_url=careers_url,
+                life_at_company_description=life_description,
+                life_at_company_image_url=life_image_url,
+            )
+    Company.objects.bulk_create(companies.values(), batch_size=1000)
+    Job.objects.update(company=Subquery(
+        Company.objects.filter(name=OuterRef('company_logo_url')).values('id')[:1]
+    ))
+
+
+def restoreCompanyColumns(apps, schema_editor):
+    Job = apps.get_model('dashboard', 'Job')
+    Company = apps.get_model('dashboard', 'Company')
+    company = Company.objects.filter(id=OuterRef('company_id'))
+    Job.objects.update(
+        company_logo_url=Subquery(company.values('logo_url')[:1]),
+        company_url=Subquery(company.values('careers_url')[:1]),
+        life_at_company_description=Subquery(company.values('life_at_company_description')[:1]),
+        life_at_company_image_url=Subquery(company.values('life_at_company_image_url')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_job_change_log'),
+    ]
+
+    operations = [
+        # Undoing the columns below rebuilds dashboard_job again, restore the search index after it
+        migrations.RunSQL(migrations.RunSQL.noop, RESTORE_SEARCH_INDEX_SQL),
+        migrations.CreateModel(
+            name='Company',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('logo_url', models.CharField(max_length=500)),
+                ('careers_url', models.URLField(blank=True, null=True)),
+                ('life_at_company_description', models.TextField()),
+                ('life_at_company_image_url', models.CharField(max_length=500)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='company',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='jobs', to='dashboard.company'),
+        ),
+        migrations.RunPython(backfillCompanies, restoreCompanyColumns),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_company_stars_id_idx',
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='company',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='jobs', to='dashboard.company'),
+        ),
+        # blank only changes the model state; it lets the columns dropped below be
+        # added back empty when migrating backwards, before restoreCompanyColumns fills them
+        migrations.AlterField(
+            model_name='job',
+            name='company_logo_url',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='life_at_company_description',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='life_at_company_image_url',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='company_logo_url',
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='company_url',
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='life_at_company_description',
+        ),
+        migrations.RemoveField(
+            model_name='job',
+            name='life_at_company_image_url',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company', '-stars', 'job_id'], name='job_company_stars_id_idx'),
+        ),
+        # Changing the columns rebuilt dashboard_job, which dropped the search triggers
+        migrations.RunSQL(RESTORE_SEARCH_INDEX_SQL, migrations.RunSQL.noop),
+    ]
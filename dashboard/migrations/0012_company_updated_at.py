@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def clearJobPayloads(apps, schema_editor):
+    """
+    The stored payloads embed the company's fields, which are now joined in at
+    render time. Emptied payloads are serialized on the fly until
+    `manage.py refresh_job_payloads` stores them again.
+    """
+    Job = apps.get_model('dashboard', 'Job')
+    Job.objects.update(list_payload=b'', detail_payload=b'')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_company'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        # Either payload format is rebuilt on the fly, so undoing empties them too
+        migrations.RunPython(clearJobPayloads, clearJobPayloads),
+    ]
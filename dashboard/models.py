@@ -1,13 +1,39 @@
 from django.db import models
+from django.db.models import Lookup
 from .constants import EmploymentType
 
 # Create your models here.
 
+class Company(models.Model):
+    """
+    The employer of a job. Its logo is shown on every job card, its careers page
+    and life-at-company section on get-job-details. None of it is stored with the
+    jobs: storage joins it into their cards and details when they are rendered.
+    """
+    name = models.CharField(max_length=200, unique=True)
+    logo_url = models.CharField(max_length=500)
+    careers_url = models.URLField(null=True, blank=True)
+    life_at_company_description = models.TextField()
+    life_at_company_image_url = models.CharField(max_length=500)
+    # Set on every save, part of the get-job-details ETag of its jobs
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # auto_now only writes updated_at when it is one of update_fields
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        super().save(*args, **kwargs)
+
+
 class Job(models.Model):
     job_id = models.CharField(max_length=100, primary_key=True)
     role_name = models.CharField(max_length=200)
-    company_logo_url = models.CharField(max_length=500)
-    company_url = models.URLField(null=True, blank=True)
+    # Indexed by job_company_stars_id_idx, which leads with it
+    company = models.ForeignKey(Company, on_delete=models.PROTECT, related_name='jobs', db_index=False)
     location = models.CharField(max_length=200)
     employment_type = models.CharField(
         max_length=2,
@@ -18,8 +44,127 @@ class Job(models.Model):
     job_description = models.TextField()
     stars = models.IntegerField()
     skills = models.JSONField()  # Requires Django 3.0+
-    life_at_company_description = models.TextField()
-    life_at_company_image_url = models.CharField(max_length=500)
+    # Pre-serialized get-jobs-list card and get-job-details JSON without the company's
+    # fields, regenerated on save
+    list_payload = models.BinaryField(default=b'', editable=False)
+    detail_payload = models.BinaryField(default=b'', editable=False)
+    # Set on every save, the get-job-details ETag is derived from it
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # get-jobs-list: employmentType IN (...) with an optional minSalary range
+            models.Index(fields=['employment_type', 'salary'], name='job_type_salary_idx'),
+            # get-jobs-list: minSalary alone
+            models.Index(fields=['salary'], name='job_salary_idx'),
+            # get-jobs-list cursor mode ordering, and the other-company fill in get-similar-jobs
+            models.Index(fields=['-stars', 'job_id'], name='job_stars_id_idx'),
+            # get-similar-jobs: same company ordered by stars desc, then job_id
+            models.Index(fields=['company', '-stars', 'job_id'], name='job_company_stars_id_idx'),
+        ]
 
     def __str__(self):
         return self.role_name
+
+    def refreshPayloads(self):
+        """
+        Regenerates list_payload and detail_payload from the current field values.
+        """
+        from .storage import buildJobPayloads
+        self.list_payload, self.detail_payload = buildJobPayloads(self)
+
+    def save(self, *args, **kwargs):
+        self.refreshPayloads()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # auto_now only writes updated_at when it is one of update_fields
+            kwargs['update_fields'] = {*update_fields, 'list_payload', 'detail_payload', 'updated_at'}
+        super().save(*args, **kwargs)
+
+
+class SimilarJob(models.Model):
+    """
+    Precomputed get-similar-jobs result: one row per (job, position).
+    Kept up to date by dashboard.similar from Job signals; "similar" is not a
+    database FK so a deleted neighbour can be replaced in the same transaction.
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='similar_jobs')
+    similar = models.ForeignKey(
+        Job,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    position = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'position'], name='similarjob_job_position_uniq'),
+        ]
+
+
+class JobSkill(models.Model):
+    """
+    Inverted index of Job.skills, one row per (skill, job), so the skills filters of
+    get-jobs-list are index lookups instead of JSON decoding per row.
+    Skills are stored normalized by dashboard.skills.normalizeSkill and kept in
+    sync by dashboard.skills from Job signals.
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='skill_index')
+    skill = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            # Also the (skill, job_id) index the filters look jobs up by
+            models.UniqueConstraint(fields=['skill', 'job'], name='jobskill_skill_job_uniq'),
+        ]
+
+
+class JobChange(models.Model):
+    """
+    Append-only log of Job writes, read by dashboard.snapshot to refresh its in-memory
+    copy of the table incrementally; the id is the change counter.
+    job_id is null for bulk writes that change too many rows to list (a full reload).
+    Also read by dashboard.autocomplete, so it is written whatever
+    settings.DASHBOARD_QUERY_BACKEND is.
+    """
+    job_id = models.CharField(max_length=100, null=True)
+
+
+class FullTextSearchField(models.TextField):
+    """
+    Maps the hidden FTS5 column that shares its table's name, so it can be used with __match.
+    """
+
+
+@FullTextSearchField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class JobSearchIndex(models.Model):
+    """
+    Read-only model over the dashboard_job_fts FTS5 table.
+    Rows are written by triggers on dashboard_job (see migration 0005), never through the ORM.
+    """
+    job = models.OneToOneField(
+        Job,
+        primary_key=True,
+        db_column='job_id',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_index'
+    )
+    role_name = models.TextField()
+    job_description = models.TextField()
+    document = FullTextSearchField(db_column='dashboard_job_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'dashboard_job_fts'
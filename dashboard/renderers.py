@@ -0,0 +1,70 @@
+from rest_framework.renderers import BaseRenderer
+
+from config.instrumentation import timedPhase
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library encoder
+    orjson = None
+    import json
+
+
+def dumpJson(value):
+    """
+    Serializes value to compact UTF-8 JSON bytes, the same output DRF's JSONRenderer gives.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class JsonFragment(bytes):
+    """
+    Already serialized JSON, written into a response as is.
+    """
+
+
+class JsonFragmentList(list):
+    """
+    A list of JsonFragment items, rendered as a JSON array by concatenating them.
+    """
+
+
+def joinJsonObjects(first, second):
+    """
+    Merges two serialized JSON objects, neither of them empty, into one JsonFragment
+    holding the keys of both, without decoding either.
+    """
+    return JsonFragment(first[:-1] + b',' + second[1:])
+
+
+def encodeJson(value):
+    """
+    Serializes a response, splicing in JsonFragment / JsonFragmentList values without re-encoding them.
+    Only the top-level dict is walked, everything else goes to dumpJson in one call.
+    """
+    if isinstance(value, JsonFragment):
+        return bytes(value)
+    if isinstance(value, JsonFragmentList):
+        return b'[' + b','.join(value) + b']'
+    if isinstance(value, dict) and any(isinstance(item, (JsonFragment, JsonFragmentList)) for item in value.values()):
+        return b'{' + b','.join(
+            dumpJson(str(key)) + b':' + encodeJson(item) for key, item in value.items()
+        ) + b'}'
+    return dumpJson(value)
+
+
+class FastJSONRenderer(BaseRenderer):
+    """
+    JSON renderer backed by orjson when it is installed, which also understands
+    the pre-serialized per-job fragments returned by the storage layer.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    @timedPhase('render')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return encodeJson(data)
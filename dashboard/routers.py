@@ -0,0 +1,88 @@
+import contextvars
+import functools
+import inspect
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# True while a function decorated with readsFromReplica runs
+reading_from_replica = contextvars.ContextVar('reading_from_replica', default=False)
+
+
+def replicaAlias():
+    return getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+
+
+def readsFromReplica(func):
+    """
+    Marks a read-only storage function: the ORM reads it issues go to
+    settings.DATABASE_REPLICA_ALIAS when one is configured.
+    Works on plain, generator and async functions.
+    """
+    if inspect.isasyncgenfunction(func):
+        raise TypeError("readsFromReplica does not support async generators")
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            token = reading_from_replica.set(True)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                reading_from_replica.reset(token)
+        return wrapper
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # The queries run while the generator is consumed, not when it is created
+            generator = func(*args, **kwargs)
+            while True:
+                token = reading_from_replica.set(True)
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    reading_from_replica.reset(token)
+                yield item
+        return wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = reading_from_replica.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            reading_from_replica.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads made inside readsFromReplica functions to the replica alias.
+    Everything else, writes included, goes to 'default', and the replica is never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = replicaAlias()
+        if alias and reading_from_replica.get():
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Without this, saving an instance read from the replica would write to the replica
+        if replicaAlias():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        if replicaAlias():
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replicaAlias():
+            return False
+        return None
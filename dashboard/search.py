@@ -0,0 +1,90 @@
+import re
+
+from django.db import connection
+
+# Searched text is split into word tokens, each matched as a prefix
+SEARCH_TOKEN = re.compile(r'\w+')
+
+# Triggers keeping dashboard_job_fts in sync with dashboard_job (created in migration 0005).
+# SQLite drops them whenever a migration rebuilds dashboard_job, so such migrations
+# must run RESTORE_SEARCH_INDEX_SQL afterwards.
+DROP_SEARCH_TRIGGERS_SQL = (
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_ai",
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_ad",
+    "DROP TRIGGER IF EXISTS dashboard_job_fts_au",
+)
+
+CREATE_SEARCH_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER dashboard_job_fts_ai AFTER INSERT ON dashboard_job BEGIN
+        INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+        VALUES (new.rowid, new.job_id, new.role_name, new.job_description);
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_job_fts_ad AFTER DELETE ON dashboard_job BEGIN
+        DELETE FROM dashboard_job_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER dashboard_job_fts_au AFTER UPDATE OF job_id, role_name, job_description ON dashboard_job BEGIN
+        DELETE FROM dashboard_job_fts WHERE rowid = old.rowid;
+        INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description)
+        VALUES (new.rowid, new.job_id, new.role_name, new.job_description);
+    END
+    """,
+)
+
+REBUILD_SEARCH_INDEX_SQL = (
+    "DELETE FROM dashboard_job_fts",
+    "INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description) "
+    "SELECT rowid, job_id, role_name, job_description FROM dashboard_job",
+)
+
+# Indexes the rows inserted after a given rowid while the triggers were dropped
+INDEX_NEW_JOBS_SQL = (
+    "INSERT INTO dashboard_job_fts(rowid, job_id, role_name, job_description) "
+    "SELECT rowid, job_id, role_name, job_description FROM dashboard_job WHERE rowid > %s"
+)
+
+# A rebuilt dashboard_job also renumbers its rowids, so the index is repopulated too
+RESTORE_SEARCH_INDEX_SQL = DROP_SEARCH_TRIGGERS_SQL + CREATE_SEARCH_TRIGGERS_SQL + REBUILD_SEARCH_INDEX_SQL
+
+
+def buildMatchQuery(search_text):
+    """
+    Turns free text typed in the search box into an FTS5 MATCH expression.
+    Every word must appear as a prefix of a word in role_name or job_description,
+    e.g. "back dev" -> '"back"* "dev"*'. Returns None when the text has no words.
+    """
+    tokens = SEARCH_TOKEN.findall(search_text.lower())
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def rebuildJobSearchIndex():
+    """
+    Repopulates dashboard_job_fts from dashboard_job.
+    The triggers keep the index in sync row by row; this is only needed after
+    a VACUUM renumbers dashboard_job rowids or the index is suspected stale.
+    """
+    with connection.cursor() as cursor:
+        for sql in REBUILD_SEARCH_INDEX_SQL:
+            cursor.execute(sql)
+
+
+def lastJobRowid():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM dashboard_job")
+        return cursor.fetchone()[0]
+
+
+def indexNewJobs(after_rowid):
+    """
+    Adds the jobs inserted after after_rowid to dashboard_job_fts, for bulk loads
+    that drop the triggers and index the new rows in one statement at the end.
+    New rows of a rowid table always get a rowid above the current maximum.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(INDEX_NEW_JOBS_SQL, [after_rowid])
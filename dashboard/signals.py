@@ -0,0 +1,96 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Company, Job
+from .similar import refreshSimilarJobs
+from .skills import syncJobSkills
+from .snapshot import recordJobChange
+from .storage import bumpJobsGeneration, invalidateCompanyDetails, invalidateJobDetails
+
+# Company columns shown on its jobs' cards and details; saving only others leaves their caches valid
+COMPANY_PAYLOAD_FIELDS = ('logo_url', 'careers_url', 'life_at_company_description', 'life_at_company_image_url')
+
+
+@receiver(pre_save, sender=Job)
+def rememberJobRanking(sender, instance, raw=False, **kwargs):
+    """
+    Keeps the stored (company, stars) of a Job about to be saved, so post_save
+    can tell which similar-jobs neighbourhoods it leaves.
+    """
+    if raw:
+        return
+    instance._previous_ranking = (
+        Job.objects
+        .filter(job_id=instance.job_id)
+        .values_list('company_id', 'stars')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Job)
+def onJobSaved(sender, instance, raw=False, **kwargs):
+    """
+    Invalidates cached job list counts and details, refreshes the affected similar jobs
+    and re-indexes the job's skills.
+    """
+    bumpJobsGeneration()
+    invalidateJobDetails(instance.job_id)
+    recordJobChange(instance.job_id)
+    if raw:
+        return
+    syncJobSkills(instance)
+    refreshSimilarJobs(
+        instance.job_id,
+        getattr(instance, '_previous_ranking', None),
+        (instance.company_id, instance.stars)
+    )
+
+
+@receiver(post_delete, sender=Job)
+def onJobDeleted(sender, instance, **kwargs):
+    """
+    Invalidates cached job list counts and details and refreshes the affected similar jobs.
+    """
+    bumpJobsGeneration()
+    invalidateJobDetails(instance.job_id)
+    recordJobChange(instance.job_id)
+    refreshSimilarJobs(instance.job_id, (instance.company_id, instance.stars), None)
+
+
+def companyPayloadFields(company):
+    return tuple(getattr(company, field) for field in COMPANY_PAYLOAD_FIELDS)
+
+
+@receiver(pre_save, sender=Company)
+def rememberCompanyPayload(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Keeps the stored COMPANY_PAYLOAD_FIELDS of a Company about to be saved, so
+    post_save can tell whether anything its jobs show changed. Nothing is read
+    when update_fields leaves them all out.
+    """
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(COMPANY_PAYLOAD_FIELDS):
+        instance._previous_payload = companyPayloadFields(instance)
+        return
+    instance._previous_payload = (
+        Company.objects
+        .filter(pk=instance.pk)
+        .values_list(*COMPANY_PAYLOAD_FIELDS)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Company)
+def onCompanySaved(sender, instance, created, raw=False, **kwargs):
+    """
+    Invalidates the cached company fields joined into its jobs' details, and the
+    cached job lists and similar jobs, whose cards show its logo, unless none of
+    COMPANY_PAYLOAD_FIELDS changed.
+    """
+    if created or raw:
+        return
+    if getattr(instance, '_previous_payload', None) == companyPayloadFields(instance):
+        return
+    invalidateCompanyDetails(instance.pk)
+    bumpJobsGeneration()
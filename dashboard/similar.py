@@ -0,0 +1,262 @@
+from django.db import connection
+from django.db.models import Count, Q
+
+from .models import Job, SimilarJob
+
+# Number of jobs returned by get-similar-jobs
+SIMILAR_JOBS_LIMIT = 3
+
+# Similar jobs are ranked by stars desc, job_id breaks ties
+SIMILAR_JOBS_ORDERING = ('-stars', 'job_id')
+
+# A job's same-company neighbours are always taken from the company's top
+# SIMILAR_JOBS_LIMIT + 1 jobs (its top list minus the job itself)
+COMPANY_TOP_SIZE = SIMILAR_JOBS_LIMIT + 1
+
+# Companies with at most SIMILAR_JOBS_LIMIT jobs fill the remaining slots from
+# other companies; the global top 2 * SIMILAR_JOBS_LIMIT always holds enough of them
+GLOBAL_TOP_SIZE = SIMILAR_JOBS_LIMIT * 2
+
+
+def companyTopJobIds(company):
+    """
+    Returns the ids of the best ranked jobs of a company.
+    """
+    return list(
+        Job.objects
+        .filter(company_id=company)
+        .order_by(*SIMILAR_JOBS_ORDERING)
+        .values_list('job_id', flat=True)[:COMPANY_TOP_SIZE]
+    )
+
+
+def globalTopJobs():
+    """
+    Returns (job_id, company_id) of the best ranked jobs across all companies.
+    """
+    return list(
+        Job.objects
+        .order_by(*SIMILAR_JOBS_ORDERING)
+        .values_list('job_id', 'company_id')[:GLOBAL_TOP_SIZE]
+    )
+
+
+def pickSimilarJobIds(job_id, company, company_top, global_top):
+    """
+    - Prefer same company as current job
+    - Within that, order by stars desc
+    - Fill remaining slots with other companies, still by stars desc
+    - Limit 3
+    """
+    similar_ids = [top_id for top_id in company_top if top_id != job_id][:SIMILAR_JOBS_LIMIT]
+    if len(similar_ids) < SIMILAR_JOBS_LIMIT:
+        similar_ids += [
+            top_id for top_id, top_company in global_top if top_company != company
+        ][:SIMILAR_JOBS_LIMIT - len(similar_ids)]
+    return similar_ids
+
+
+def computeSimilarJobIds(job):
+    """
+    Computes the similar job ids of one job straight from the Job table.
+    """
+    company_top = companyTopJobIds(job.company_id)
+    global_top = []
+    if len(company_top) <= SIMILAR_JOBS_LIMIT:
+        global_top = list(
+            Job.objects
+            .exclude(company_id=job.company_id)
+            .order_by(*SIMILAR_JOBS_ORDERING)
+            .values_list('job_id', 'company_id')[:SIMILAR_JOBS_LIMIT]
+        )
+    return pickSimilarJobIds(job.job_id, job.company_id, company_top, global_top)
+
+
+def writeSimilarJobs(neighbours):
+    """
+    Replaces the stored similar jobs of every job in the {job_id: [similar_id, ...]} mapping.
+    """
+    SimilarJob.objects.filter(job_id__in=list(neighbours)).delete()
+    SimilarJob.objects.bulk_create(
+        SimilarJob(job_id=job_id, similar_id=similar_id, position=position)
+        for job_id, similar_ids in neighbours.items()
+        for position, similar_id in enumerate(similar_ids)
+    )
+
+
+def rankedAbove(job_id, stars, company=None):
+    """
+    Counts, up to GLOBAL_TOP_SIZE, the other jobs ranked above (stars, job_id),
+    optionally within one company.
+    """
+    qs = Job.objects.exclude(job_id=job_id).filter(Q(stars__gt=stars) | Q(stars=stars, job_id__lt=job_id))
+    if company is not None:
+        qs = qs.filter(company_id=company)
+    return qs[:GLOBAL_TOP_SIZE].count()
+
+
+def refreshSimilarJobs(job_id, previous, current):
+    """
+    Recomputes only the neighbourhoods touched by one Job write.
+    previous and current are the job's (company_id, stars) before and after
+    the write, None when it did not exist before or was deleted.
+
+    A job's same-company neighbours come from its company's top COMPANY_TOP_SIZE jobs,
+    and the other-company fill from the global top GLOBAL_TOP_SIZE, so other jobs
+    are only affected when the written job enters or leaves one of those top lists.
+    """
+    if previous == current:
+        return
+
+    companies = set()
+    global_top_changed = False
+    for state in (previous, current):
+        if state is None:
+            continue
+        company, stars = state
+        if rankedAbove(job_id, stars, company) < COMPANY_TOP_SIZE:
+            companies.add(company)
+        if rankedAbove(job_id, stars) < GLOBAL_TOP_SIZE:
+            global_top_changed = True
+
+    refreshNeighbourhoods({job_id: current[0]} if current is not None else {}, companies, global_top_changed)
+
+
+def refreshManySimilarJobs(changes):
+    """
+    Batch version of refreshSimilarJobs for {job_id: (previous, current)}, e.g. one
+    bulk ingest chunk: the top lists of the companies involved are read once each
+    instead of counting the jobs ranked above every state.
+
+    A state is in a top list when fewer than its size other jobs rank above it. Tested
+    against the lists as they are after the writes, this flags every top list that
+    changed: a job that left one was ranked above all its current members.
+    """
+    changes = {job_id: states for job_id, states in changes.items() if states[0] != states[1]}
+    if not changes:
+        return
+
+    states_by_company = {}
+    for job_id, states in changes.items():
+        for state in states:
+            if state is not None:
+                states_by_company.setdefault(state[0], []).append((job_id, state[1]))
+
+    def topKeys(qs, size):
+        # One more than size, so size of them remain without any one job
+        rows = qs.order_by(*SIMILAR_JOBS_ORDERING).values_list('job_id', 'stars')[:size + 1]
+        return [(-stars, job_id) for job_id, stars in rows]
+
+    def inTop(job_id, stars, top_keys, size):
+        others = [key for key in top_keys if key[1] != job_id]
+        return len(others) < size or (-stars, job_id) < others[size - 1]
+
+    companies = set()
+    for company, states in states_by_company.items():
+        top_keys = topKeys(Job.objects.filter(company_id=company), COMPANY_TOP_SIZE)
+        if any(inTop(job_id, stars, top_keys, COMPANY_TOP_SIZE) for job_id, stars in states):
+            companies.add(company)
+    global_keys = topKeys(Job.objects.all(), GLOBAL_TOP_SIZE)
+    global_top_changed = any(
+        inTop(job_id, stars, global_keys, GLOBAL_TOP_SIZE)
+        for states in states_by_company.values() for job_id, stars in states
+    )
+
+    current_jobs = {job_id: current[0] for job_id, (_, current) in changes.items() if current is not None}
+    refreshNeighbourhoods(current_jobs, companies, global_top_changed)
+
+
+def refreshNeighbourhoods(current_jobs, companies, global_top_changed):
+    """
+    Rewrites the similar jobs of the written jobs ({job_id: company_id}), of every
+    job of the given companies, and when the global top changed of the small companies.
+    """
+    global_top = globalTopJobs()
+    company_tops = {}
+
+    def companyTop(company):
+        if company not in company_tops:
+            company_tops[company] = companyTopJobIds(company)
+        return company_tops[company]
+
+    # (job_id, company) pairs recomputed one by one
+    recompute = dict(current_jobs)
+
+    for company in companies:
+        company_top = companyTop(company)
+        for top_id in company_top:
+            recompute[top_id] = company
+        if len(company_top) == COMPANY_TOP_SIZE:
+            # Every job outside the top shares the same neighbours, rewrite them in place
+            for position, similar_id in enumerate(company_top[:SIMILAR_JOBS_LIMIT]):
+                (
+                    SimilarJob.objects
+                    .filter(job__company_id=company, position=position)
+                    .exclude(job_id__in=list(recompute))
+                    .update(similar_id=similar_id)
+                )
+
+    if global_top_changed:
+        small_companies = (
+            Job.objects
+            .values('company_id')
+            .annotate(members=Count('job_id'))
+            .filter(members__lte=SIMILAR_JOBS_LIMIT)
+            .values_list('company_id', flat=True)
+        )
+        for member_id, company in Job.objects.filter(company_id__in=small_companies).values_list('job_id', 'company_id'):
+            recompute[member_id] = company
+
+    writeSimilarJobs({
+        member_id: pickSimilarJobIds(member_id, company, companyTop(company), global_top)
+        for member_id, company in recompute.items()
+    })
+
+
+def rebuildAllSimilarJobs(batch_size=1000):
+    """
+    Recomputes the similar jobs of every job from scratch.
+    Returns the number of jobs processed.
+
+    Only a company's top COMPANY_TOP_SIZE jobs are computed one by one; every other
+    member gets the same neighbours, copied with one INSERT ... SELECT per position.
+    """
+    SimilarJob.objects.all().delete()
+    global_top = globalTopJobs()
+
+    processed = 0
+    rows = []
+    companies = Job.objects.order_by('company_id').values_list('company_id', flat=True).distinct()
+    for company in companies:
+        company_top = companyTopJobIds(company)
+        for member_id in company_top:
+            for position, similar_id in enumerate(pickSimilarJobIds(member_id, company, company_top, global_top)):
+                rows.append(SimilarJob(job_id=member_id, similar_id=similar_id, position=position))
+            processed += 1
+        if len(rows) >= batch_size:
+            SimilarJob.objects.bulk_create(rows)
+            rows = []
+
+        if len(company_top) == COMPANY_TOP_SIZE:
+            processed += copyCompanyNeighbours(company, company_top)
+    SimilarJob.objects.bulk_create(rows)
+    return processed
+
+
+def copyCompanyNeighbours(company, company_top):
+    """
+    Stores the company's top SIMILAR_JOBS_LIMIT jobs as the similar jobs of all
+    its members outside company_top. Returns the number of members written.
+    """
+    placeholders = ', '.join(['%s'] * len(company_top))
+    written = 0
+    with connection.cursor() as cursor:
+        for position, similar_id in enumerate(company_top[:SIMILAR_JOBS_LIMIT]):
+            cursor.execute(
+                f"INSERT INTO {SimilarJob._meta.db_table} (job_id, similar_id, position) "
+                f"SELECT job_id, %s, %s FROM {Job._meta.db_table} "
+                f"WHERE company_id = %s AND job_id NOT IN ({placeholders})",
+                [similar_id, position, company, *company_top]
+            )
+            written = cursor.rowcount
+    return written
@@ -0,0 +1,65 @@
+from .models import Job, JobSkill
+
+
+def normalizeSkill(skill):
+    """
+    Canonical form of a skill name: case-folded with whitespace collapsed,
+    so "Node.js", "node.js " and "NODE.JS" index and match alike.
+    """
+    return ' '.join(str(skill).split()).casefold()
+
+
+def normalizeSkills(skills):
+    """
+    Returns the distinct non-empty normalized skills of a list, sorted.
+    """
+    if not isinstance(skills, (list, tuple)):
+        return []
+    return sorted({normalized for normalized in map(normalizeSkill, skills) if normalized})
+
+
+def isSkillsFilter(value):
+    """
+    True when value can be used as requiredSkills / anySkills: absent or a list of strings.
+    """
+    return value is None or (isinstance(value, list) and all(isinstance(skill, str) for skill in value))
+
+
+def syncJobSkills(job):
+    """
+    Brings the JobSkill rows of one job in line with its skills.
+    """
+    skills = set(normalizeSkills(job.skills))
+    stored = set(JobSkill.objects.filter(job_id=job.job_id).values_list('skill', flat=True))
+    if stored - skills:
+        JobSkill.objects.filter(job_id=job.job_id, skill__in=stored - skills).delete()
+    if skills - stored:
+        JobSkill.objects.bulk_create(JobSkill(job_id=job.job_id, skill=skill) for skill in skills - stored)
+
+
+def indexJobSkills(jobs):
+    """
+    Adds the JobSkill rows of jobs inserted without Job.save(), e.g. by bulk_create.
+    """
+    JobSkill.objects.bulk_create(
+        (JobSkill(job_id=job.job_id, skill=skill) for job in jobs for skill in normalizeSkills(job.skills)),
+        ignore_conflicts=True
+    )
+
+
+def rebuildJobSkills(batch_size=1000):
+    """
+    Recreates the whole skill index from Job.skills.
+    Returns the number of jobs indexed.
+    """
+    JobSkill.objects.all().delete()
+    indexed = 0
+    rows = []
+    for job_id, skills in Job.objects.values_list('job_id', 'skills').iterator(chunk_size=batch_size):
+        rows.extend(JobSkill(job_id=job_id, skill=skill) for skill in normalizeSkills(skills))
+        indexed += 1
+        if len(rows) >= batch_size:
+            JobSkill.objects.bulk_create(rows)
+            rows = []
+    JobSkill.objects.bulk_create(rows)
+    return indexed
@@ -0,0 +1,463 @@
+"""
+In-process columnar snapshot of the Job table, answering the get-jobs-list filters
+and get-similar-jobs without SQL while settings.DASHBOARD_QUERY_BACKEND is "snapshot".
+
+Rows are held in rank order (stars desc, then job_id): job ids in a list, stars and
+interned companies in typed arrays. Every salary threshold, employment type and skill
+has a bitmap, a Python int whose bit p is set when the row at rank p matches, so a
+filter is a few ANDs / ORs done a machine word at a time, total_count a popcount, and
+a page the positions of the offset-th to (offset + limit)-th set bits. The page's
+rows are then read by primary key.
+
+Each worker process keeps its own copy. Writes are picked up from the JobChange log:
+changed rows are tombstoned in the bitmaps and kept in a small delta, merged into
+results by rank, until JOB_SNAPSHOT_MAX_DELTA rows changed and the snapshot is
+reloaded from scratch. Writes made by this process are seen by its next read, other
+processes' after at most JOB_SNAPSHOT_REFRESH_INTERVAL seconds.
+"""
+import array
+import bisect
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import Max
+
+from .models import Job, JobChange
+from .similar import SIMILAR_JOBS_LIMIT, SIMILAR_JOBS_ORDERING
+from .skills import normalizeSkills
+
+SNAPSHOT_FIELDS = ('job_id', 'stars', 'salary', 'employment_type', 'company_id', 'skills')
+
+# Bytes of a bitmap covered by one precomputed popcount, for jumping to deep offsets
+RANK_BLOCK_BYTES = 1024
+
+# Rows read per chunk while loading a snapshot
+LOAD_CHUNK_SIZE = 10000
+
+
+def negate(value):
+    return -value
+
+
+def snapshotEnabled():
+    return getattr(settings, 'DASHBOARD_QUERY_BACKEND', 'orm') == 'snapshot'
+
+
+def maxDelta():
+    return getattr(settings, 'JOB_SNAPSHOT_MAX_DELTA', 2000)
+
+
+@dataclass(frozen=True)
+class SnapshotRow:
+    """
+    A row changed since the snapshot was loaded, matched one by one.
+    """
+    job_id: str
+    stars: int
+    salary: int
+    employment_type: str
+    company: int
+    skills: frozenset
+
+    @classmethod
+    def fromValues(cls, job_id, stars, salary, employment_type, company, skills):
+        return cls(job_id, stars, salary, employment_type, company, frozenset(normalizeSkills(skills)))
+
+    @property
+    def rankKey(self):
+        return (-self.stars, self.job_id)
+
+    def matches(self, min_salary, employment_types, required_skills, any_skills):
+        return (
+            (min_salary is None or self.salary >= min_salary)
+            and (not employment_types or self.employment_type in employment_types)
+            and self.skills.issuperset(required_skills)
+            and (not any_skills or not self.skills.isdisjoint(any_skills))
+        )
+
+
+class BitRank:
+    """
+    Counts and selects the set bits of a bitmap, with one popcount per
+    RANK_BLOCK_BYTES so neither has to scan the bitmap from its start.
+    """
+
+    def __init__(self, mask, size):
+        self.data = mask.to_bytes((size + 7) // 8, 'little')
+        cumulative = [0]
+        for start in range(0, len(self.data), RANK_BLOCK_BYTES):
+            block = int.from_bytes(self.data[start:start + RANK_BLOCK_BYTES], 'little')
+            cumulative.append(cumulative[-1] + block.bit_count())
+        self.cumulative = cumulative
+        self.total = cumulative[-1]
+
+    def rank(self, position):
+        """
+        Returns the number of set bits below position.
+        """
+        byte, bit = divmod(position, 8)
+        block_start = byte - byte % RANK_BLOCK_BYTES
+        count = self.cumulative[block_start // RANK_BLOCK_BYTES]
+        count += int.from_bytes(self.data[block_start:byte], 'little').bit_count()
+        if bit:
+            count += (self.data[byte] & ((1 << bit) - 1)).bit_count()
+        return count
+
+    def select(self, start, count):
+        """
+        Returns the positions of the start-th to (start + count - 1)-th set bits.
+        """
+        positions = []
+        if count <= 0 or start >= self.total:
+            return positions
+        block = bisect.bisect_right(self.cumulative, start) - 1
+        seen = self.cumulative[block]
+        data = self.data
+        for byte in range(block * RANK_BLOCK_BYTES, len(data)):
+            value = data[byte]
+            if not value:
+                continue
+            bits = value.bit_count()
+            if seen + bits <= start:
+                seen += bits
+                continue
+            for bit in range(8):
+                if value >> bit & 1:
+                    if seen >= start:
+                        positions.append(byte * 8 + bit)
+                        if len(positions) == count:
+                            return positions
+                    seen += 1
+        return positions
+
+
+class SnapshotIndex:
+    """
+    The columns and bitmaps of a full load of the Job table, never modified afterwards.
+    """
+
+    def __init__(self, rows):
+        self.job_ids = []
+        self.stars = array.array('i')
+        self.company_of = array.array('I')
+        self.companies = {}  # name: number
+        salary_bits = {}
+        type_bits = {}
+        skill_bits = {}
+
+        def setBit(bitmaps, key, position):
+            bits = bitmaps.get(key)
+            if bits is None:
+                bits = bitmaps[key] = bytearray()
+            byte = position >> 3
+            if len(bits) <= byte:
+                bits.extend(bytes(byte - len(bits) + 1))
+            bits[byte] |= 1 << (position & 7)
+
+        for position, (job_id, stars, salary, employment_type, company, skills) in enumerate(rows):
+            self.job_ids.append(sys.intern(job_id))
+            self.stars.append(stars)
+            self.company_of.append(self.companies.setdefault(company, len(self.companies)))
+            setBit(salary_bits, salary, position)
+            setBit(type_bits, employment_type, position)
+            for skill in normalizeSkills(skills):
+                setBit(skill_bits, skill, position)
+
+        self.size = len(self.job_ids)
+        self.company_names = list(self.companies)
+        self.positions = {job_id: position for position, job_id in enumerate(self.job_ids)}
+        self.all_rows = (1 << self.size) - 1
+
+        def toMask(bits):
+            return int.from_bytes(bits, 'little')
+
+        # salary_masks[i]: rows paid at least salary_values[i]
+        self.salary_values = sorted(salary_bits)
+        self.salary_masks = [0] * len(self.salary_values)
+        at_least = 0
+        for i in range(len(self.salary_values) - 1, -1, -1):
+            at_least |= toMask(salary_bits[self.salary_values[i]])
+            self.salary_masks[i] = at_least
+        self.type_masks = {employment_type: toMask(bits) for employment_type, bits in type_bits.items()}
+        self.skill_masks = {skill: toMask(bits) for skill, bits in skill_bits.items()}
+
+        # Rows of each company, in rank order
+        company_rows = [array.array('I') for _ in self.companies]
+        for position, company in enumerate(self.company_of):
+            company_rows[company].append(position)
+        self.company_rows = company_rows
+
+    def rankKey(self, position):
+        return (-self.stars[position], self.job_ids[position])
+
+    def insertionPoint(self, key):
+        """
+        Returns the position a row with rank key (-stars, job_id) would take.
+        """
+        # stars is descending, so search it by -stars
+        low = bisect.bisect_left(self.stars, key[0], key=negate)
+        high = bisect.bisect_right(self.stars, key[0], lo=low, key=negate)
+        return bisect.bisect_left(self.job_ids, key[1], low, high)
+
+
+class JobsSnapshot:
+    """
+    A SnapshotIndex plus the rows changed since it was loaded: dead holds the
+    positions of changed or deleted rows, delta the current values of changed rows.
+    Treated as immutable; withChanges returns a new snapshot.
+    """
+
+    def __init__(self, index, change_id, dead=frozenset(), delta=None):
+        self.index = index
+        self.change_id = change_id
+        self.dead = dead
+        self.delta = delta or {}
+        dead_mask = 0
+        for position in dead:
+            dead_mask |= 1 << position
+        self.alive = index.all_rows & ~dead_mask
+
+    @classmethod
+    def load(cls):
+        # Read the change counter first, changes logged while the rows are read are applied again later
+        change_id = JobChange.objects.aggregate(last=Max('id'))['last'] or 0
+        rows = (
+            Job.objects
+            .order_by(*SIMILAR_JOBS_ORDERING)
+            .values_list(*SNAPSHOT_FIELDS)
+            .iterator(chunk_size=LOAD_CHUNK_SIZE)
+        )
+        return cls(SnapshotIndex(rows), change_id)
+
+    def withChanges(self, change_id, rows, deleted_ids):
+        """
+        Returns a new snapshot with rows (SnapshotRow) written and deleted_ids removed.
+        """
+        dead = set(self.dead)
+        delta = dict(self.delta)
+        for job_id in [row.job_id for row in rows] + list(deleted_ids):
+            position = self.index.positions.get(job_id)
+            if position is not None:
+                dead.add(position)
+            delta.pop(job_id, None)
+        for row in rows:
+            delta[row.job_id] = row
+        return JobsSnapshot(self.index, change_id, frozenset(dead), delta)
+
+    @property
+    def changedRows(self):
+        # Rows changed or deleted, plus the ones created since the load
+        return len(self.dead) + sum(1 for job_id in self.delta if job_id not in self.index.positions)
+
+    def filterMask(self, min_salary, employment_types, required_skills, any_skills):
+        index = self.index
+        mask = self.alive
+        if min_salary is not None:
+            i = bisect.bisect_left(index.salary_values, min_salary)
+            mask &= index.salary_masks[i] if i < len(index.salary_values) else 0
+        if employment_types:
+            types_mask = 0
+            for employment_type in employment_types:
+                types_mask |= index.type_masks.get(employment_type, 0)
+            mask &= types_mask
+        for skill in required_skills:
+            mask &= index.skill_masks.get(skill, 0)
+        if any_skills:
+            any_mask = 0
+            for skill in any_skills:
+                any_mask |= index.skill_masks.get(skill, 0)
+            mask &= any_mask
+        return mask
+
+    def jobsPage(self, min_salary=None, employment_type=None, required_skills=None, any_skills=None, offset=0, limit=10):
+        """
+        Returns (total_count, job_ids) of the jobs matching the list filters,
+        ranked by stars desc then job_id, for the page [offset, offset + limit).
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError("Negative indexing is not supported.")
+        min_salary = int(min_salary) if min_salary is not None else None
+        employment_types = set(employment_type) if employment_type else set()
+        required_skills = normalizeSkills(required_skills)
+        any_skills = normalizeSkills(any_skills)
+
+        ranked = BitRank(self.filterMask(min_salary, employment_types, required_skills, any_skills), self.index.size)
+        changed = sorted(
+            row.rankKey for row in self.delta.values()
+            if row.matches(min_salary, employment_types, required_skills, any_skills)
+        )
+        # Index of each changed row in the merged ranking
+        merged = [ranked.rank(self.index.insertionPoint(key)) + i for i, key in enumerate(changed)]
+
+        changed_before = bisect.bisect_left(merged, offset)
+        main_ids = iter([
+            self.index.job_ids[position]
+            for position in ranked.select(offset - changed_before, limit)
+        ])
+        page = []
+        next_changed = changed_before
+        for merged_index in range(offset, offset + limit):
+            if next_changed < len(changed) and merged[next_changed] == merged_index:
+                page.append(changed[next_changed][1])
+                next_changed += 1
+            else:
+                job_id = next(main_ids, None)
+                if job_id is None:
+                    break
+                page.append(job_id)
+        return ranked.total + len(changed), page
+
+    def currentRow(self, job_id):
+        """
+        Returns (rank key, company) of a job, or None when it does not exist.
+        """
+        row = self.delta.get(job_id)
+        if row is not None:
+            return row.rankKey, row.company
+        position = self.index.positions.get(job_id)
+        if position is None or position in self.dead:
+            return None
+        return self.index.rankKey(position), self.index.company_names[self.index.company_of[position]]
+
+    def similarJobIds(self, job_id):
+        """
+        Same ranking as dashboard.similar.pickSimilarJobIds: the job's company first,
+        then other companies, by stars desc then job_id.
+        """
+        current = self.currentRow(job_id)
+        if current is None:
+            return []
+        index = self.index
+        company = current[1]
+        company_number = index.companies.get(company)
+
+        # The first rows of the company and of the others are enough, the delta is merged in after
+        same = []
+        if company_number is not None:
+            for position in index.company_rows[company_number]:
+                if position not in self.dead and index.job_ids[position] != job_id:
+                    same.append(index.rankKey(position))
+                    if len(same) == SIMILAR_JOBS_LIMIT:
+                        break
+        same += [row.rankKey for row in self.delta.values() if row.company == company and row.job_id != job_id]
+        similar = sorted(same)[:SIMILAR_JOBS_LIMIT]
+
+        missing = SIMILAR_JOBS_LIMIT - len(similar)
+        if missing:
+            others = []
+            for position in range(index.size):
+                if position not in self.dead and index.company_of[position] != company_number:
+                    others.append(index.rankKey(position))
+                    if len(others) == missing:
+                        break
+            others += [row.rankKey for row in self.delta.values() if row.company != company]
+            similar += sorted(others)[:missing]
+        return [key[1] for key in similar]
+
+
+class SnapshotStore:
+    """
+    Holds this process's JobsSnapshot and refreshes it from the JobChange log.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.checked_at = 0.0
+        self.changed = False
+
+    def notifyChanged(self):
+        """
+        Called after this process wrote a Job, so its next read polls the log.
+        """
+        self.changed = True
+
+    def reset(self):
+        with self.lock:
+            self.snapshot = None
+            self.changed = False
+
+    def get(self):
+        snapshot = self.snapshot
+        interval = getattr(settings, 'JOB_SNAPSHOT_REFRESH_INTERVAL', 1.0)
+        if snapshot is not None and not self.changed and time.monotonic() - self.checked_at < interval:
+            return snapshot
+        # While another thread refreshes, keep serving the current snapshot
+        if not self.lock.acquire(blocking=snapshot is None or self.changed):
+            return snapshot
+        try:
+            self.changed = False
+            self.checked_at = time.monotonic()
+            if self.snapshot is None:
+                self.snapshot = JobsSnapshot.load()
+            else:
+                self.snapshot = self.refreshed(self.snapshot)
+            return self.snapshot
+        finally:
+            self.lock.release()
+
+    def refreshed(self, snapshot):
+        limit = maxDelta()
+        changes = list(
+            JobChange.objects
+            .filter(id__gt=snapshot.change_id)
+            .order_by('id')
+            .values_list('id', 'job_id')[:limit + 1]
+        )
+        if not changes:
+            return snapshot
+        job_ids = {job_id for _, job_id in changes}
+        if len(changes) > limit or None in job_ids or snapshot.changedRows + len(job_ids) > limit:
+            return JobsSnapshot.load()
+
+        job_ids = list(job_ids)
+        rows = []
+        for start in range(0, len(job_ids), 500):
+            rows += [
+                SnapshotRow.fromValues(*values)
+                for values in Job.objects.filter(job_id__in=job_ids[start:start + 500]).values_list(*SNAPSHOT_FIELDS)
+            ]
+        deleted_ids = set(job_ids) - {row.job_id for row in rows}
+        return snapshot.withChanges(changes[-1][0], rows, deleted_ids)
+
+
+jobs_snapshot = SnapshotStore()
+
+
+def recordJobChange(job_id):
+    """
+    Logs a write to one job, or with job_id None to any number of jobs.
+    Read by the snapshot and by the autocomplete index (dashboard.autocomplete),
+    which is always on, so the log is written whatever DASHBOARD_QUERY_BACKEND is.
+    Keeps the last 10 * JOB_SNAPSHOT_MAX_DELTA entries: a reader further behind
+    sees more than JOB_SNAPSHOT_MAX_DELTA of them and reloads anyway.
+    """
+    change = JobChange.objects.create(job_id=job_id)
+    pruneJobChanges(change.id - 1, change.id)
+    jobs_snapshot.notifyChanged()
+
+
+def recordJobChanges(job_ids):
+    """
+    recordJobChange for many jobs with one INSERT. More than JOB_SNAPSHOT_MAX_DELTA
+    of them are logged as a full reload, which readers would do anyway.
+    """
+    job_ids = list(job_ids)
+    if len(job_ids) > maxDelta():
+        recordJobChange(None)
+        return
+    if not job_ids:
+        return
+    changes = JobChange.objects.bulk_create([JobChange(job_id=job_id) for job_id in job_ids])
+    pruneJobChanges(changes[0].id - 1, changes[-1].id)
+    jobs_snapshot.notifyChanged()
+
+
+def pruneJobChanges(previous_id, last_id):
+    # Prunes every 10 * JOB_SNAPSHOT_MAX_DELTA entries, when the ids from previous_id to last_id crossed a multiple
+    keep = 10 * maxDelta()
+    if last_id // keep > previous_id // keep:
+        JobChange.objects.filter(id__lte=last_id - keep).delete()
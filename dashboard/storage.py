@@ -1,11 +1,297 @@
-from .models import Job
-from django.db.models import Case, When, IntegerField
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Company, Job, JobSkill, SimilarJob
+from .renderers import JsonFragment, JsonFragmentList, dumpJson, joinJsonObjects
+from .routers import readsFromReplica
+from config.instrumentation import measurePhase, timedPhase
+from .search import buildMatchQuery
+from .similar import computeSimilarJobIds
+from .skills import isSkillsFilter, normalizeSkills
+from .snapshot import jobs_snapshot, snapshotEnabled
+from django.db.models import Case, Count, Q, Value, When
+from django.db.models.functions import Substr
 from .constants import EmploymentType
 
-def fetchJobsListFromDB(min_salary=None, employment_type=None, search_role_name=None, limit=10, offset=0):
+# Columns selected for a job list card
+JOB_LIST_FIELDS = (
+    'job_id', 'role_name', 'company__logo_url', 'location',
+    'employment_type', 'salary', 'job_description', 'stars'
+)
+
+# Columns selected with a job's stored card JSON, which lacks the company's logo
+JOB_FRAGMENT_FIELDS = ('job_id', 'list_payload', 'company__logo_url')
+
+# Job column of every job card field, in card order; get-jobs-list cards have all of
+# them and get-similar-jobs cards all but salary. "fields" requests pick among these.
+JOB_CARD_COLUMNS = {
+    "jobId": "job_id",
+    "stars": "stars",
+    "roleName": "role_name",
+    "companyLogoUrl": "company__logo_url",
+    "location": "location",
+    "employmentType": "employment_type",
+    "salary": "salary",
+    "jobDescription": "job_description",
+}
+LIST_CARD_FIELDS = tuple(JOB_CARD_COLUMNS)
+SIMILAR_CARD_FIELDS = tuple(field for field in JOB_CARD_COLUMNS if field != "salary")
+
+# Alias of the job_description prefix selected when a snippetLength is given
+SNIPPET_COLUMN = 'job_description_snippet'
+
+# Stable ordering used by cursor pagination, job_id breaks ties between equal stars
+CURSOR_ORDERING = ('-stars', 'job_id')
+
+# Columns selected for a similar job card
+SIMILAR_JOB_FIELDS = (
+    'job_id', 'role_name', 'company__logo_url', 'stars',
+    'job_description', 'location', 'employment_type'
+)
+
+# total_count strategies accepted by the list endpoints
+COUNT_MODES = ('exact', 'estimated', 'none')
+
+# Upper bound on page_size accepted by the list endpoints
+MAX_PAGE_SIZE = 100
+
+# minimumSalary is compared with Job.salary, an IntegerField: 32-bit signed
+MAX_SALARY_FILTER = 2 ** 31 - 1
+
+# Upper bound for the count run by "estimated" mode when nothing is cached yet
+ESTIMATED_COUNT_CAP = 10000
+
+# Salary facet buckets as [min, max) in LPA, the last one open ended
+SALARY_BUCKETS = ((0, 5), (5, 10), (10, 20), (20, 30), (30, 50), (50, None))
+
+JOBS_GENERATION_KEY = 'dashboard:jobs:generation'
+JOBS_COUNT_KEY_PREFIX = 'dashboard:jobs:count:'
+JOBS_FACETS_KEY_PREFIX = 'dashboard:jobs:facets:'
+JOB_VERSION_KEY_PREFIX = 'dashboard:job:version:'
+JOB_DETAIL_KEY_PREFIX = 'dashboard:job:detail:'
+JOB_PAYLOAD_KEY_PREFIX = 'dashboard:job:payload:'
+COMPANY_VERSION_KEY_PREFIX = 'dashboard:company:version:'
+COMPANY_DETAIL_KEY_PREFIX = 'dashboard:company:detail:'
+
+
+def getJobsGeneration():
     """
-    Fetches jobs from the database with filtering and pagination applied at the database level.
-    Returns a tuple containing the total count of filtered jobs and the list of paginated jobs.
+    Returns the Job table generation, bumped on every Job save or delete.
+    Seeded from the clock so a counter evicted from the cache never goes back
+    to a value that older cache entries were stored under.
+    """
+    return cache.get_or_set(JOBS_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def bumpJobsGeneration():
+    """
+    Moves the Job table to a new generation, invalidating every cached count.
+    """
+    try:
+        cache.incr(JOBS_GENERATION_KEY)
+    except ValueError:
+        cache.set(JOBS_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def normalizeFilters(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None):
+    """
+    Returns a hashable key for the list filters, equal for filters that select the same rows.
+    """
+    return (
+        int(min_salary) if min_salary is not None else None,
+        tuple(sorted(set(employment_type))) if employment_type else (),
+        search_role_name.strip().lower() if search_role_name else None,
+        tuple(normalizeSkills(required_skills)),
+        tuple(normalizeSkills(any_skills))
+    )
+
+
+def parseJobId(value):
+    """
+    Returns the jobId of a request as a job id, or None, which finds no job, when it is
+    not a string: a list or a dict would fail the cache lookups instead of matching nothing.
+    """
+    return value if isinstance(value, str) else None
+
+
+def parseListFilters(data):
+    """
+    Returns the list filters of a get-jobs-list, get-jobs-facets or export-jobs request
+    body as keyword arguments of filterJobs. Raises ValueError naming the first one that
+    is neither absent nor well-formed: minimumSalary an integer (or a string of one),
+    employmentType a list of strings, searchRoleName a string and requiredSkills and
+    anySkills lists of strings.
+    """
+    min_salary = data.get('minimumSalary')
+    employment_type = data.get('employmentType')
+    search_role_name = data.get('searchRoleName')
+    required_skills = data.get('requiredSkills')
+    any_skills = data.get('anySkills')
+
+    if min_salary is not None:
+        try:
+            if isinstance(min_salary, bool) or not isinstance(min_salary, (int, str)):
+                raise ValueError
+            min_salary = int(min_salary)
+            if abs(min_salary) > MAX_SALARY_FILTER:
+                raise ValueError
+        except ValueError:
+            raise ValueError("minimumSalary must be an integer") from None
+    if not (employment_type is None or (isinstance(employment_type, list) and all(isinstance(code, str) for code in employment_type))):
+        raise ValueError("employmentType must be a list of strings")
+    if not (search_role_name is None or isinstance(search_role_name, str)):
+        raise ValueError("searchRoleName must be a string")
+    if not (isSkillsFilter(required_skills) and isSkillsFilter(any_skills)):
+        raise ValueError("requiredSkills and anySkills must be lists of strings")
+
+    return {
+        "min_salary": min_salary,
+        "employment_type": employment_type,
+        "search_role_name": search_role_name,
+        "required_skills": required_skills,
+        "any_skills": any_skills,
+    }
+
+
+def parseCardFields(fields, allowed):
+    """
+    Returns the card fields a "fields" request parameter selects, in card order,
+    or None when it is absent. Raises ValueError unless it is a non-empty list of
+    names from allowed.
+    """
+    if fields is None:
+        return None
+    if not isinstance(fields, list) or not fields or not all(field in allowed for field in fields):
+        raise ValueError("fields must be a non-empty list of: " + ", ".join(allowed))
+    return tuple(field for field in allowed if field in fields)
+
+
+def parseCardOptions(data, allowed_fields):
+    """
+    Returns the fields / snippet_length keyword arguments of a list or similar jobs
+    request body. Raises ValueError naming the one that is invalid.
+    """
+    fields = parseCardFields(data.get('fields'), allowed_fields)
+    snippet_length = data.get('snippetLength')
+    if not isSnippetLength(snippet_length):
+        raise ValueError("snippetLength must be a positive integer")
+    return {"fields": fields, "snippet_length": snippet_length}
+
+
+def isSnippetLength(value):
+    """
+    True when value can be used as snippetLength: absent or a positive integer.
+    """
+    return value is None or (isinstance(value, int) and not isinstance(value, bool) and value > 0)
+
+
+def isPageSize(value):
+    """
+    True when value can be used as page_size: an integer from 1 to MAX_PAGE_SIZE.
+    """
+    return isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= MAX_PAGE_SIZE
+
+
+def isPageNumber(value):
+    """
+    True when value can be used as page_number: a positive integer.
+    """
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def selectJobCards(qs, fields, snippet_length=None, prefix='', extra=()):
+    """
+    Returns qs.values() with only the columns of the given card fields, plus extra.
+    With snippet_length, job_description is cut to that many characters by SQLite
+    (as SNIPPET_COLUMN), so the full text is never read into Python.
+    prefix reaches the Job through a relation, e.g. 'similar__'.
+    """
+    snippet = snippet_length is not None and "jobDescription" in fields
+    columns = [
+        prefix + JOB_CARD_COLUMNS[field]
+        for field in fields
+        if not (snippet and field == "jobDescription")
+    ]
+    columns += [column for column in extra if column not in columns]
+    if snippet:
+        qs = qs.annotate(**{SNIPPET_COLUMN: Substr(prefix + 'job_description', 1, snippet_length)})
+        columns.append(SNIPPET_COLUMN)
+    return qs.values(*columns)
+
+
+@timedPhase('serialize')
+def formatJobCards(rows, fields, prefix=''):
+    """
+    Builds cards holding only the given fields from rows of selectJobCards.
+    """
+    cards = []
+    for row in rows:
+        card = {}
+        for field in fields:
+            if field == "jobDescription" and SNIPPET_COLUMN in row:
+                value = row[SNIPPET_COLUMN]
+            else:
+                value = row[prefix + JOB_CARD_COLUMNS[field]]
+            if field == "employmentType":
+                value = EmploymentType(value).label
+            card[field] = value
+        cards.append(card)
+    return cards
+
+
+def fetchJobCardsByIds(job_ids, fields, snippet_length=None):
+    """
+    Returns the cards of the given jobs in job_ids order, skipping ids that no longer exist.
+    """
+    rows = selectJobCards(Job.objects.filter(job_id__in=job_ids), fields, snippet_length, extra=('job_id',))
+    rows_by_id = {row['job_id']: row for row in rows}
+    return formatJobCards([rows_by_id[job_id] for job_id in job_ids if job_id in rows_by_id], fields)
+
+
+def countJobs(qs, filter_key, count_mode='exact'):
+    """
+    Returns total_count for a filtered queryset according to count_mode:
+    - exact: cached per filter key for up to JOB_COUNT_CACHE_TIMEOUT seconds, recomputed
+      once the table generation moves on
+    - estimated: any cached count for the filter key, even from an older generation,
+      otherwise a count capped at ESTIMATED_COUNT_CAP
+    - none: skips counting and returns None
+    """
+    if count_mode == 'none':
+        return None
+
+    cache_key = JOBS_COUNT_KEY_PREFIX + hashlib.sha1(repr(filter_key).encode()).hexdigest()
+    generation = getJobsGeneration()
+    cached = cache.get(cache_key)
+
+    if cached is not None:
+        cached_generation, cached_count = cached
+        if cached_generation == generation or count_mode == 'estimated':
+            return cached_count
+
+    if count_mode == 'estimated':
+        return qs[:ESTIMATED_COUNT_CAP].count()
+
+    total_count = qs.count()
+    cache.set(cache_key, (generation, total_count), timeout=getattr(settings, 'JOB_COUNT_CACHE_TIMEOUT', 3600))
+    return total_count
+
+
+def filterJobs(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None):
+    """
+    Returns the Job queryset with the list filters applied.
+    search_role_name is answered by the FTS5 index over role_name and job_description,
+    every word in it matching as a prefix.
+    required_skills (all of them) and any_skills (at least one) are answered by the
+    JobSkill index: one indexed IN (subquery) per required skill, intersected by
+    SQLite, and a single one for the any_skills set.
     """
     qs = Job.objects.all()
 
@@ -16,93 +302,708 @@ def fetchJobsListFromDB(min_salary=None, employment_type=None, search_role_name=
         qs = qs.filter(employment_type__in=employment_type)
     
     if search_role_name:
-        qs = qs.filter(role_name__icontains=search_role_name)
+        match_query = buildMatchQuery(search_role_name)
+        if match_query:
+            qs = qs.filter(search_index__document__match=match_query)
+
+    for skill in normalizeSkills(required_skills):
+        qs = qs.filter(job_id__in=JobSkill.objects.filter(skill=skill).values('job_id'))
+
+    any_skills = normalizeSkills(any_skills)
+    if any_skills:
+        qs = qs.filter(job_id__in=JobSkill.objects.filter(skill__in=any_skills).values('job_id'))
+
+    return qs
+
+
+def encodeCursor(job):
+    """
+    Builds an opaque cursor pointing just after the given job row.
+    """
+    raw = json.dumps([job['stars'], job['job_id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decodeCursor(cursor):
+    """
+    Decodes a cursor built by encodeCursor into (stars, job_id).
+    Raises ValueError when the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        stars, job_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, AttributeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(stars, int) or not isinstance(job_id, str):
+        raise ValueError("Invalid cursor")
+    return stars, job_id
+
+
+@readsFromReplica
+def fetchJobsListFromDB(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None, limit=10, offset=0, count_mode='exact', as_fragments=False, fields=None, snippet_length=None):
+    """
+    Fetches jobs from the database with filtering and pagination applied at the database level.
+    Jobs are ranked by stars desc then job_id, after the full-text rank when searching.
+    Returns a tuple containing the total count of filtered jobs and the list of paginated jobs.
+    total_count follows count_mode (see countJobs) and is None when count_mode is "none".
+    With as_fragments the jobs are the stored card JSON of each job, as a JsonFragmentList.
+    fields (card field names, see LIST_CARD_FIELDS) and snippet_length select and
+    serialize only part of each card instead; as_fragments is ignored then.
+    With the "snapshot" DASHBOARD_QUERY_BACKEND, requests without a search are answered
+    by fetchJobsListFromSnapshot.
+    """
+    if snapshotEnabled() and not search_role_name:
+        return fetchJobsListFromSnapshot(min_salary, employment_type, required_skills, any_skills, limit, offset, count_mode, as_fragments, fields, snippet_length)
+
+    qs = filterJobs(min_salary, employment_type, search_role_name, required_skills, any_skills)
+
+    total_count = countJobs(qs, normalizeFilters(min_salary, employment_type, search_role_name, required_skills, any_skills), count_mode)
+
+    # A fixed order, so a page holds the same rows whatever columns are selected
+    # (a narrower SELECT may be answered from another index) and on either backend
+    if search_role_name:
+        # Best full-text matches first
+        qs = qs.order_by('search_index__rank', *CURSOR_ORDERING)
+    else:
+        qs = qs.order_by(*CURSOR_ORDERING)
 
-    total_count = qs.count()
-    
     # Apply pagination
     qs = qs[offset:offset + limit]
 
-    jobs = qs.values(
-        'job_id', 'role_name', 'company_logo_url', 'location', 
-        'employment_type', 'salary', 'job_description', 'stars'
+    if fields is not None or snippet_length is not None:
+        fields = fields or LIST_CARD_FIELDS
+        return total_count, formatJobCards(selectJobCards(qs, fields, snippet_length), fields)
+
+    if as_fragments:
+        return total_count, formatJobsFragments(qs.values(*JOB_FRAGMENT_FIELDS))
+
+    jobs = qs.values(*JOB_LIST_FIELDS)
+    return total_count, formatJobsList(jobs)
+
+
+def fetchJobsListFromSnapshot(min_salary=None, employment_type=None, required_skills=None, any_skills=None, limit=10, offset=0, count_mode='exact', as_fragments=False, fields=None, snippet_length=None):
+    """
+    fetchJobsListFromDB answered by the in-process snapshot (dashboard.snapshot): the
+    filtering, counting and paging happen in memory and only the page is read, by
+    primary key. Jobs are ranked by stars desc then job_id and total_count is always exact.
+    """
+    with measurePhase('snapshot'):
+        total_count, job_ids = jobs_snapshot.get().jobsPage(min_salary, employment_type, required_skills, any_skills, offset, limit)
+    if count_mode == 'none':
+        total_count = None
+
+    # A job deleted by another process since the snapshot's last refresh is left out
+    if fields is not None or snippet_length is not None:
+        return total_count, fetchJobCardsByIds(job_ids, fields or LIST_CARD_FIELDS, snippet_length)
+
+    columns = JOB_FRAGMENT_FIELDS if as_fragments else JOB_LIST_FIELDS
+    rows_by_id = {row['job_id']: row for row in Job.objects.filter(job_id__in=job_ids).values(*columns)}
+    rows = [rows_by_id[job_id] for job_id in job_ids if job_id in rows_by_id]
+
+    if as_fragments:
+        return total_count, formatJobsFragments(rows)
+    return total_count, formatJobsList(rows)
+
+
+@readsFromReplica
+def fetchJobsPageFromDB(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None, limit=10, cursor=None, count_mode='exact', as_fragments=False, fields=None, snippet_length=None):
+    """
+    Fetches one page of jobs using keyset pagination instead of OFFSET.
+    Rows are ordered by stars desc then job_id, and the page starts right after the
+    row the cursor points to, so deep pages cost the same as the first one.
+    Returns a tuple of (total_count, jobs, next_cursor); next_cursor is None on the last page.
+    With as_fragments the jobs are the stored card JSON of each job, as a JsonFragmentList;
+    fields and snippet_length work as in fetchJobsListFromDB.
+    Raises ValueError when the cursor is malformed.
+    """
+    qs = filterJobs(min_salary, employment_type, search_role_name, required_skills, any_skills)
+
+    total_count = countJobs(qs, normalizeFilters(min_salary, employment_type, search_role_name, required_skills, any_skills), count_mode)
+
+    if cursor:
+        stars, job_id = decodeCursor(cursor)
+        qs = qs.filter(Q(stars__lt=stars) | Q(stars=stars, job_id__gt=job_id))
+
+    qs = qs.order_by(*CURSOR_ORDERING)
+    sparse = fields is not None or snippet_length is not None
+    if sparse:
+        fields = fields or LIST_CARD_FIELDS
+        # The cursor is built from stars and job_id, requested or not
+        qs = selectJobCards(qs, fields, snippet_length, extra=('job_id', 'stars'))
+    else:
+        qs = qs.values(*((*JOB_FRAGMENT_FIELDS, 'stars') if as_fragments else JOB_LIST_FIELDS))
+
+    # Fetch one extra row to know whether another page exists
+    jobs = list(qs[:limit + 1])
+
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = encodeCursor(jobs[-1])
+
+    if sparse:
+        return total_count, formatJobCards(jobs, fields), next_cursor
+    if as_fragments:
+        return total_count, formatJobsFragments(jobs), next_cursor
+    return total_count, formatJobsList(jobs), next_cursor
+
+
+@timedPhase('serialize')
+def formatJobsList(jobs):
+    """
+    Converts job list rows from .values() into the API response format (camelCase).
+    """
+    return [formatJobListItem(job) for job in jobs]
+
+
+@timedPhase('serialize')
+def formatJobsFragments(rows):
+    """
+    Collects the stored card JSON of job list rows of JOB_FRAGMENT_FIELDS, each
+    joined with its company's logo. Rows written without going through Job.save()
+    (e.g. bulk_create) have no payload yet and are serialized on the fly.
+    """
+    rows = list(rows)
+    unserialized = [row['job_id'] for row in rows if not row['list_payload']]
+    built = {}
+    if unserialized:
+        built = {job.job_id: buildJobPayloads(job)[0] for job in Job.objects.filter(job_id__in=unserialized)}
+    return JsonFragmentList(
+        joinJsonObjects(row['list_payload'] or built[row['job_id']], dumpJson({"companyLogoUrl": row['company__logo_url']}))
+        for row in rows
     )
-    
-    # Convert keys to match the API response format (camelCase)
-    formatted_jobs = []
-    for job in jobs:
-        # Get the label for the employment_type code
-        employment_type_label = EmploymentType(job['employment_type']).label
-        
-        formatted_jobs.append({
-            "jobId": job['job_id'],
-            "stars": job['stars'],
-            "roleName": job['role_name'],
-            "companyLogoUrl": job['company_logo_url'],
-            "location": job['location'],
-            "employmentType": employment_type_label,
-            "salary": job['salary'],
-            "jobDescription": job['job_description']
-        })
-    return total_count, formatted_jobs
-
-def fetchJobFromDB(job_id):
-    """
-    Fetches a single job by job_id and returns a dictionary with full details.
+
+
+def formatJobListItem(job):
+    """
+    Converts one job list row from .values() into the API response format (camelCase).
+    """
+    # Get the label for the employment_type code
+    employment_type_label = EmploymentType(job['employment_type']).label
+
+    return {
+        "jobId": job['job_id'],
+        "stars": job['stars'],
+        "roleName": job['role_name'],
+        "companyLogoUrl": job['company__logo_url'],
+        "location": job['location'],
+        "employmentType": employment_type_label,
+        "salary": job['salary'],
+        "jobDescription": job['job_description']
+    }
+
+
+@readsFromReplica
+def streamJobsFromDB(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None, chunk_size=2000):
+    """
+    Yields every job matching the list filters, formatted like fetchJobsListFromDB,
+    reading chunk_size rows at a time so memory stays flat however many rows match.
+    """
+    qs = filterJobs(min_salary, employment_type, search_role_name, required_skills, any_skills)
+    for job in qs.values(*JOB_LIST_FIELDS).iterator(chunk_size=chunk_size):
+        yield formatJobListItem(job)
+
+
+def salaryBucketLabel(low, high):
+    return f"{low}-{high}" if high is not None else f"{low}+"
+
+
+def salaryBucketExpression():
+    """
+    SQL CASE mapping Job.salary to the label of its SALARY_BUCKETS bucket.
+    """
+    return Case(
+        *(When(salary__lt=high, then=Value(salaryBucketLabel(low, high))) for low, high in SALARY_BUCKETS if high is not None),
+        default=Value(salaryBucketLabel(*SALARY_BUCKETS[-1]))
+    )
+
+
+@readsFromReplica
+def fetchJobFacetsFromDB(min_salary=None, employment_type=None, search_role_name=None, required_skills=None, any_skills=None):
+    """
+    Returns (total_count, facets) for the jobs matching the list filters, facets holding
+    the number of jobs per employment type, salary bucket and location.
+    All three come from one GROUP BY (employment_type, salary bucket, location) query,
+    cached per filter key until the Job table generation moves on.
+    """
+    cache_key = JOBS_FACETS_KEY_PREFIX + hashlib.sha1(
+        repr(normalizeFilters(min_salary, employment_type, search_role_name, required_skills, any_skills)).encode()
+    ).hexdigest()
+    generation = getJobsGeneration()
+    cached = cache.get(cache_key)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+
+    groups = (
+        filterJobs(min_salary, employment_type, search_role_name, required_skills, any_skills)
+        .order_by()
+        .annotate(salary_bucket=salaryBucketExpression())
+        .values('employment_type', 'salary_bucket', 'location')
+        .annotate(jobs=Count('job_id'))
+    )
+
+    by_type = dict.fromkeys(EmploymentType.values, 0)
+    by_salary = dict.fromkeys((salaryBucketLabel(low, high) for low, high in SALARY_BUCKETS), 0)
+    by_location = {}
+    for group in groups:
+        by_type[group['employment_type']] = by_type.get(group['employment_type'], 0) + group['jobs']
+        by_salary[group['salary_bucket']] += group['jobs']
+        by_location[group['location']] = by_location.get(group['location'], 0) + group['jobs']
+
+    result = (sum(by_type.values()), formatJobFacets(by_type, by_salary, by_location))
+    cache.set(cache_key, (generation, result), timeout=getattr(settings, 'JOB_COUNT_CACHE_TIMEOUT', 3600))
+    return result
+
+
+def formatJobFacets(by_type, by_salary, by_location):
+    """
+    Every employment type and salary bucket is listed, zero counts included,
+    locations only when they have jobs, the largest first.
+    """
+    return {
+        "employmentType": [
+            {"value": value, "label": EmploymentType(value).label if value in EmploymentType.values else value, "count": count}
+            for value, count in by_type.items()
+        ],
+        "salary": [
+            {"value": salaryBucketLabel(low, high), "min": low, "max": high, "count": by_salary[salaryBucketLabel(low, high)]}
+            for low, high in SALARY_BUCKETS
+        ],
+        "location": [
+            {"value": location, "count": count}
+            for location, count in sorted(by_location.items(), key=lambda item: (-item[1], item[0]))
+        ],
+    }
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU cache holding at most max_size entries.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                return default
+            return self.entries[key]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# get-job-details payloads without the company's fields: job_id -> (version, (company_id, details dict))
+# and ('payload', job_id) -> (version, (company_id, JsonFragment)). Sits in front of the Django cache
+# backend, which is shared between workers.
+job_detail_lru = LRUCache(getattr(settings, 'JOB_DETAIL_LRU_SIZE', 1024))
+
+# The company's get-job-details fields, stored once per company and joined into its jobs' details:
+# company_id -> (version, (details dict, JsonFragment)).
+company_detail_lru = LRUCache(getattr(settings, 'COMPANY_DETAIL_LRU_SIZE', 1024))
+
+job_detail_stats = {"lruHits": 0, "cacheHits": 0, "misses": 0}
+job_detail_stats_lock = threading.Lock()
+
+
+def countJobDetailLookup(outcome):
+    with job_detail_stats_lock:
+        job_detail_stats[outcome] += 1
+
+
+def jobCacheKey(prefix, job_id):
+    return prefix + hashlib.sha1(str(job_id).encode()).hexdigest()
+
+
+def getJobVersion(job_id):
+    """
+    Returns the cache version of one job, bumped whenever it is saved or deleted.
+    """
+    return cache.get_or_set(jobCacheKey(JOB_VERSION_KEY_PREFIX, job_id), time.time_ns(), timeout=None)
+
+
+def getCompanyVersion(company_id):
+    """
+    Returns the cache version of one company's details, bumped whenever they change.
+    """
+    return cache.get_or_set(jobCacheKey(COMPANY_VERSION_KEY_PREFIX, company_id), time.time_ns(), timeout=None)
+
+
+def invalidateJobDetails(job_id):
+    """
+    Evicts the cached details of a job in this process and moves it to a new
+    version so the copies held by the shared cache and other workers go stale.
+    """
+    job_detail_lru.delete(job_id)
+    job_detail_lru.delete(('payload', job_id))
+    version_key = jobCacheKey(JOB_VERSION_KEY_PREFIX, job_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, time.time_ns(), timeout=None)
+
+
+def invalidateCompanyDetails(company_id):
+    """
+    invalidateJobDetails for the company fields joined into the details of all of its jobs.
+    """
+    company_detail_lru.delete(company_id)
+    version_key = jobCacheKey(COMPANY_VERSION_KEY_PREFIX, company_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, time.time_ns(), timeout=None)
+
+
+def invalidateManyJobDetails(job_ids):
+    """
+    invalidateJobDetails for many jobs with one shared cache write: every job
+    moves to a version taken from the clock, past any version it had before.
+    """
+    for job_id in job_ids:
+        job_detail_lru.delete(job_id)
+        job_detail_lru.delete(('payload', job_id))
+    version = time.time_ns()
+    cache.set_many({jobCacheKey(JOB_VERSION_KEY_PREFIX, job_id): version for job_id in job_ids}, timeout=None)
+
+
+def getJobDetailsCacheStats():
+    """
+    Returns hit/miss counters of the job details cache, for sizing JOB_DETAIL_LRU_SIZE.
+    """
+    with job_detail_stats_lock:
+        stats = dict(job_detail_stats)
+    lookups = stats["lruHits"] + stats["cacheHits"] + stats["misses"]
+    stats["lookups"] = lookups
+    stats["hitRatio"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+    stats["lruSize"] = len(job_detail_lru)
+    stats["lruMaxSize"] = job_detail_lru.max_size
+    return stats
+
+
+@readsFromReplica
+def fetchJobFromDB(job_id, as_fragment=False):
+    """
+    Fetches a single job by job_id and returns a dictionary with full details,
+    or with as_fragment its get-job-details JSON as a JsonFragment.
+    Read-through: the in-process LRU first, then the Django cache, then the database.
+    Only the job's own fields are cached per job; its company's are joined in from
+    fetchCompaniesDetails, see joinCompanyDetails.
+    """
+    if job_id is None:
+        return None
+
+    if as_fragment:
+        lru_key, key_prefix, load = ('payload', job_id), JOB_PAYLOAD_KEY_PREFIX, loadJobPayload
+    else:
+        lru_key, key_prefix, load = job_id, JOB_DETAIL_KEY_PREFIX, loadJobDetails
+
+    version = getJobVersion(job_id)
+
+    cached = job_detail_lru.get(lru_key)
+    if cached is not None and cached[0] == version:
+        countJobDetailLookup("lruHits")
+        return joinCompanyDetails(cached[1], as_fragment)
+
+    detail_key = f"{jobCacheKey(key_prefix, job_id)}:{version}"
+    job_details = cache.get(detail_key)
+    if job_details is not None:
+        countJobDetailLookup("cacheHits")
+    else:
+        countJobDetailLookup("misses")
+        job_details = load(job_id)
+        if job_details is None:
+            return None
+        cache.set(detail_key, job_details, timeout=getattr(settings, 'JOB_DETAIL_CACHE_TIMEOUT', 3600))
+
+    job_detail_lru.set(lru_key, (version, job_details))
+    return joinCompanyDetails(job_details, as_fragment)
+
+
+@readsFromReplica
+def fetchJobsFromDB(job_ids):
+    """
+    Fetches the full details of many jobs at once, through the same caches as fetchJobFromDB.
+    Every job missing from the caches is read with a single query, and so is every company.
+    Returns a tuple of ({job_id: details}, [missing job ids]).
+    """
+    job_ids = list(dict.fromkeys(job_ids))
+    detail_timeout = getattr(settings, 'JOB_DETAIL_CACHE_TIMEOUT', 3600)
+
+    version_keys = {job_id: jobCacheKey(JOB_VERSION_KEY_PREFIX, job_id) for job_id in job_ids}
+    stored_versions = cache.get_many(list(version_keys.values()))
+    versions = {
+        job_id: stored_versions[key] if key in stored_versions else getJobVersion(job_id)
+        for job_id, key in version_keys.items()
+    }
+
+    entries = {}
+    for job_id in job_ids:
+        cached = job_detail_lru.get(job_id)
+        if cached is not None and cached[0] == versions[job_id]:
+            countJobDetailLookup("lruHits")
+            entries[job_id] = cached[1]
+
+    detail_keys = {
+        job_id: f"{jobCacheKey(JOB_DETAIL_KEY_PREFIX, job_id)}:{versions[job_id]}"
+        for job_id in job_ids if job_id not in entries
+    }
+    shared = cache.get_many(list(detail_keys.values()))
+    for job_id, key in detail_keys.items():
+        if key in shared:
+            countJobDetailLookup("cacheHits")
+            entries[job_id] = shared[key]
+
+    unresolved = [job_id for job_id in detail_keys if job_id not in entries]
+    if unresolved:
+        loaded = {}
+        for job_id, job in Job.objects.in_bulk(unresolved).items():
+            countJobDetailLookup("misses")
+            loaded[detail_keys[job_id]] = entries[job_id] = (job.company_id, formatJobFields(job))
+        cache.set_many(loaded, timeout=detail_timeout)
+
+    for job_id in detail_keys:
+        if job_id in entries:
+            job_detail_lru.set(job_id, (versions[job_id], entries[job_id]))
+
+    companies = fetchCompaniesDetails(company_id for company_id, _ in entries.values())
+    jobs = {
+        job_id: {**entries[job_id][1], **companies[entries[job_id][0]][0]}
+        for job_id in job_ids if job_id in entries and entries[job_id][0] in companies
+    }
+    missing_ids = [job_id for job_id in job_ids if job_id not in jobs]
+    return jobs, missing_ids
+
+
+def fetchCompaniesDetails(company_ids):
+    """
+    Returns {company_id: (details dict, JsonFragment)} holding the get-job-details fields
+    of the given companies, read through company_detail_lru and the Django cache like
+    job details, with one query for the companies found in neither.
+    Companies that do not exist are left out.
+    """
+    company_ids = list(dict.fromkeys(company_ids))
+
+    version_keys = {company_id: jobCacheKey(COMPANY_VERSION_KEY_PREFIX, company_id) for company_id in company_ids}
+    stored_versions = cache.get_many(list(version_keys.values()))
+    versions = {
+        company_id: stored_versions[key] if key in stored_versions else getCompanyVersion(company_id)
+        for company_id, key in version_keys.items()
+    }
+
+    companies = {}
+    for company_id in company_ids:
+        cached = company_detail_lru.get(company_id)
+        if cached is not None and cached[0] == versions[company_id]:
+            companies[company_id] = cached[1]
+    if len(companies) == len(company_ids):
+        return companies
+
+    detail_keys = {
+        company_id: f"{jobCacheKey(COMPANY_DETAIL_KEY_PREFIX, company_id)}:{versions[company_id]}"
+        for company_id in company_ids if company_id not in companies
+    }
+    shared = cache.get_many(list(detail_keys.values()))
+    for company_id, key in detail_keys.items():
+        if key in shared:
+            companies[company_id] = shared[key]
+
+    unresolved = [company_id for company_id in detail_keys if company_id not in companies]
+    if unresolved:
+        loaded = {}
+        for company_id, company in Company.objects.in_bulk(unresolved).items():
+            details = formatCompanyDetails(company)
+            loaded[detail_keys[company_id]] = companies[company_id] = (details, JsonFragment(dumpJson(details)))
+        cache.set_many(loaded, timeout=getattr(settings, 'JOB_DETAIL_CACHE_TIMEOUT', 3600))
+
+    for company_id in detail_keys:
+        if company_id in companies:
+            company_detail_lru.set(company_id, (versions[company_id], companies[company_id]))
+    return companies
+
+
+def joinCompanyDetails(entry, as_fragment=False):
+    """
+    Completes a (company_id, job details) entry of the job details cache into the
+    get-job-details payload: a new dict, or with as_fragment a JsonFragment.
+    Returns None when the company no longer exists.
+    """
+    company_id, job_details = entry
+    company = fetchCompaniesDetails((company_id,)).get(company_id)
+    if company is None:
+        return None
+    if as_fragment:
+        return joinJsonObjects(job_details, company[1])
+    return {**job_details, **company[0]}
+
+
+def loadJobDetails(job_id):
+    """
+    Reads a single job from the database and returns (company_id, its get-job-details fields).
     """
     try:
         job = Job.objects.get(job_id=job_id)
-        return {
-            "jobId": job.job_id,
-            "roleName": job.role_name,
-            "companyLogoUrl": job.company_logo_url,
-            "companyUrl": job.company_url,
-            "location": job.location,
-            "employmentType": job.get_employment_type_display(),
-            "stars":job.stars,
-            "salary": job.salary,
-            "jobDescription": job.job_description,
-            "skills": job.skills,
-            "LifeAtCompanyDescription": job.life_at_company_description,
-            "LifeAtCompanyImageUrl": job.life_at_company_image_url
-        }
     except Job.DoesNotExist:
         return None
+    return job.company_id, formatJobFields(job)
+
+
+def loadJobPayload(job_id):
+    """
+    Reads (company_id, stored get-job-details JSON) of a job, building the JSON when the row has none yet.
+    """
+    row = Job.objects.filter(job_id=job_id).values_list('company_id', 'detail_payload').first()
+    if row is None:
+        return None
+    company_id, payload = row
+    if not payload:
+        payload = buildJobPayloads(Job.objects.get(job_id=job_id))[1]
+    return company_id, JsonFragment(payload)
+
 
-def fetchSimilarJobs(job_id):
+def buildJobPayloads(job):
+    """
+    Serializes a Job into its (get-jobs-list card, get-job-details) JSON bytes,
+    both without the company's fields.
+    """
+    return dumpJson(formatJobCardFields(job)), dumpJson(formatJobFields(job))
+
+
+def formatJobCardFields(job):
+    """
+    Builds the get-jobs-list card of a Job, without its company's logo.
+    """
+    return {
+        "jobId": job.job_id,
+        "stars": job.stars,
+        "roleName": job.role_name,
+        "location": job.location,
+        "employmentType": job.get_employment_type_display(),
+        "salary": job.salary,
+        "jobDescription": job.job_description
+    }
+
+
+@timedPhase('serialize')
+def formatJobFields(job):
+    """
+    Builds the get-job-details payload of a Job, without its company's fields.
+    """
+    return {
+        "jobId": job.job_id,
+        "roleName": job.role_name,
+        "location": job.location,
+        "employmentType": job.get_employment_type_display(),
+        "stars":job.stars,
+        "salary": job.salary,
+        "jobDescription": job.job_description,
+        "skills": job.skills
+    }
+
+
+def formatCompanyDetails(company):
+    """
+    Builds the get-job-details fields that come from the job's Company.
+    """
+    return {
+        "companyLogoUrl": company.logo_url,
+        "companyUrl": company.careers_url,
+        "LifeAtCompanyDescription": company.life_at_company_description,
+        "LifeAtCompanyImageUrl": company.life_at_company_image_url
+    }
+
+
+@readsFromReplica
+def fetchSimilarJobs(job_id, fields=None, snippet_length=None):
     """
     - Prefer same company as current job
     - Within that, order by stars desc
     - Fill remaining slots with other companies, still by stars desc
     - Limit 3
+    Served with one indexed read of the precomputed SimilarJob rows (see dashboard.similar),
+    falling back to computing them live for a job that has none stored yet.
+    With the "snapshot" DASHBOARD_QUERY_BACKEND the ids come from the in-process snapshot instead.
+    fields (see SIMILAR_CARD_FIELDS) and snippet_length select only part of each card.
     """
-    try:
-        current_job = Job.objects.get(job_id=job_id)
-    except Job.DoesNotExist:
-        return []
-
-    qs = (
-        Job.objects
-        .exclude(job_id=current_job.job_id)
-        .annotate(
-            same_company=Case(
-                When(company_logo_url=current_job.company_logo_url, then=1),
-                default=0,
-                output_field=IntegerField()
-            )
-        )
-        .order_by('-same_company', '-stars')[:3]
+    sparse = fields is not None or snippet_length is not None
+    fields = fields or SIMILAR_CARD_FIELDS
+
+    if snapshotEnabled():
+        with measurePhase('snapshot'):
+            similar_ids = jobs_snapshot.get().similarJobIds(job_id)
+        if sparse:
+            return fetchJobCardsByIds(similar_ids, fields, snippet_length)
+        jobs_by_id = Job.objects.select_related('company').only(*SIMILAR_JOB_FIELDS).in_bulk(similar_ids)
+        return formatSimilarJobs([jobs_by_id[similar_id] for similar_id in similar_ids if similar_id in jobs_by_id])
+
+    if sparse:
+        rows = list(selectJobCards(
+            SimilarJob.objects.filter(job_id=job_id).order_by('position'),
+            fields, snippet_length, prefix='similar__'
+        ))
+        if rows:
+            return formatJobCards(rows, fields, prefix='similar__')
+        try:
+            current_job = Job.objects.get(job_id=job_id)
+        except Job.DoesNotExist:
+            return []
+        return fetchJobCardsByIds(computeSimilarJobIds(current_job), fields, snippet_length)
+
+    rows = (
+        SimilarJob.objects
+        .filter(job_id=job_id)
+        .select_related('similar__company')
+        .only(*(f'similar__{field}' for field in SIMILAR_JOB_FIELDS))
+        .order_by('position')
     )
+    similar_jobs = [row.similar for row in rows]
+
+    if not similar_jobs:
+        try:
+            current_job = Job.objects.get(job_id=job_id)
+        except Job.DoesNotExist:
+            return []
+        similar_ids = computeSimilarJobIds(current_job)
+        jobs_by_id = Job.objects.select_related('company').only(*SIMILAR_JOB_FIELDS).in_bulk(similar_ids)
+        similar_jobs = [jobs_by_id[similar_id] for similar_id in similar_ids]
 
+    return formatSimilarJobs(similar_jobs)
+
+
+@timedPhase('serialize')
+def formatSimilarJobs(similar_jobs):
+    """
+    Builds the get-similar-jobs cards of a list of Jobs.
+    """
     return [
         {
             "jobId": job.job_id,
             "roleName": job.role_name,
-            "companyLogoUrl": job.company_logo_url,
+            "companyLogoUrl": job.company.logo_url,
             "stars": job.stars,
             "jobDescription": job.job_description,
             "location": job.location,
             "employmentType": job.get_employment_type_display(),
         }
-        for job in qs
+        for job in similar_jobs
     ]
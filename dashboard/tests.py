@@ -1,3 +1,1356 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import warnings
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from config import compression
+from config.instrumentation import resetEndpointStats
+from login.tokens import issueToken
+
+from .admission import AdmissionControlMiddleware, ConcurrencyPool, admission_control
+from .autocomplete import AUTOCOMPLETE_FIELDS, AutocompleteIndex, autocomplete_index
+from .constants import EmploymentType
+from .models import Company, Job, SimilarJob
+from .renderers import FastJSONRenderer
+from .routers import ReadReplicaRouter, readsFromReplica
+from .similar import computeSimilarJobIds, rebuildAllSimilarJobs
+from .snapshot import BitRank, jobs_snapshot
+from . import async_storage, etags, ingest, storage, views
+
+
+def make_company(name):
+    company, _ = Company.objects.get_or_create(name=name, defaults={
+        "logo_url": name,
+        "careers_url": f"https://www.{name}.com/careers",
+        "life_at_company_description": "Life is great",
+        "life_at_company_image_url": name,
+    })
+    return company
+
+
+def make_job(job_id, company="google", **fields):
+    values = {
+        "role_name": "Backend Developer",
+        "company": company if isinstance(company, Company) else make_company(company),
+        "location": "Delhi",
+        "employment_type": EmploymentType.FULL_TIME,
+        "salary": 20,
+        "job_description": "Build APIs",
+        "stars": 4,
+        "skills": ["Python", "Django"],
+    }
+    values.update(fields)
+    return Job.objects.create(job_id=job_id, **values)
+
+
+def clear_caches():
+    cache.clear()
+    storage.job_detail_lru.clear()
+    storage.company_detail_lru.clear()
+
+
+class StorageQueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on every query a storage function issues and fails
+    when one of them falls back to a full table scan or an unindexed sort.
+    """
+
+    # "SCAN dashboard_job" with no index, or a temporary b-tree built for ORDER BY
+    DEGRADED_PLAN = re.compile(r'^SCAN \S+$|TEMP B-TREE')
+    # Sorting the rows an index found, for a page of a filtered list
+    PAGE_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+    @classmethod
+    def setUpTestData(cls):
+        companies = ["google", "netflix", "amazon"]
+        for i, employment_type in enumerate(EmploymentType.values * 5):
+            make_job(
+                f"job{i:03d}",
+                company=companies[i % len(companies)],
+                employment_type=employment_type,
+                salary=i * 3,
+                stars=i % 5 + 1,
+            )
+
+    def setUp(self):
+        clear_caches()
+
+    def assertIndexedQueries(self, fetch, *args, sorted_page=False, **kwargs):
+        """
+        sorted_page allows the page of a filtered list to be sorted once its rows are found.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            fetch(*args, **kwargs)
+        self.assertTrue(queries.captured_queries)
+
+        for query in queries.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plan = [row[-1] for row in cursor.fetchall()]
+            degraded = [
+                line for line in plan
+                if self.DEGRADED_PLAN.search(line) and not (sorted_page and line == self.PAGE_SORT)
+            ]
+            self.assertEqual(degraded, [], f"{query['sql']}\n" + "\n".join(plan))
+
+    def test_jobs_list_min_salary(self):
+        self.assertIndexedQueries(storage.fetchJobsListFromDB, min_salary=30, sorted_page=True)
+
+    def test_jobs_list_employment_type(self):
+        self.assertIndexedQueries(storage.fetchJobsListFromDB, employment_type=["FT", "PT"], sorted_page=True)
+
+    def test_jobs_list_min_salary_and_employment_type(self):
+        self.assertIndexedQueries(storage.fetchJobsListFromDB, min_salary=30, employment_type=["FT", "IT"], sorted_page=True)
+
+    def test_jobs_list_first_page(self):
+        self.assertIndexedQueries(storage.fetchJobsListFromDB, count_mode="none")
+
+    def test_jobs_page_first_page(self):
+        self.assertIndexedQueries(storage.fetchJobsPageFromDB, count_mode="none")
+
+    def test_jobs_page_with_cursor(self):
+        cursor = storage.encodeCursor({"stars": 3, "job_id": "job005"})
+        self.assertIndexedQueries(storage.fetchJobsPageFromDB, min_salary=10, cursor=cursor)
+
+    def test_similar_jobs_same_company(self):
+        self.assertIndexedQueries(storage.fetchSimilarJobs, "job000")
+
+    def test_similar_jobs_other_companies(self):
+        make_job("lonely", company="startup inc")
+        self.assertIndexedQueries(storage.fetchSimilarJobs, "lonely")
+
+    def test_job_details(self):
+        self.assertIndexedQueries(storage.fetchJobFromDB, "job000")
+
+    def test_jobs_list_search(self):
+        self.assertIndexedQueries(storage.fetchJobsListFromDB, search_role_name="back dev", sorted_page=True)
+
+    def test_jobs_list_skills(self):
+        self.assertIndexedQueries(storage.fetchJobsListFromDB, required_skills=["Python", "Django"], any_skills=["AWS", "Python"], sorted_page=True)
+
+
+class JobSearchTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_search_matches_prefixes_and_ranks_role_name_first(self):
+        make_job("desc", role_name="Data Scientist", job_description="Works with backend developers")
+        make_job("role", role_name="Backend Developer", job_description="Build APIs")
+        make_job("other", role_name="Product Manager", job_description="Plans releases")
+
+        total_count, jobs = storage.fetchJobsListFromDB(search_role_name="Back dev")
+
+        self.assertEqual(total_count, 2)
+        self.assertEqual([job["jobId"] for job in jobs], ["role", "desc"])
+
+    def test_search_index_follows_updates_and_deletes(self):
+        job = make_job("job1", role_name="Frontend Developer")
+        job.role_name = "Platform Engineer"
+        job.save()
+
+        self.assertEqual(storage.fetchJobsListFromDB(search_role_name="frontend")[0], 0)
+        self.assertEqual(storage.fetchJobsListFromDB(search_role_name="platf")[0], 1)
+
+        job.delete()
+        self.assertEqual(storage.fetchJobsListFromDB(search_role_name="platf")[0], 0)
+
+
+class JobSkillFilterTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def jobIds(self, **filters):
+        total_count, jobs = storage.fetchJobsListFromDB(**filters)
+        self.assertEqual(total_count, len(jobs))
+        return sorted(job["jobId"] for job in jobs)
+
+    def test_required_and_any_skills(self):
+        make_job("py", skills=["Python", "Django"])
+        make_job("pyaws", skills=["python", "AWS", "Docker"])
+        make_job("java", skills=["Java", "Spring Boot"])
+
+        self.assertEqual(self.jobIds(required_skills=["PYTHON"]), ["py", "pyaws"])
+        self.assertEqual(self.jobIds(required_skills=["python", " aws "]), ["pyaws"])
+        self.assertEqual(self.jobIds(any_skills=["django", "spring  boot"]), ["java", "py"])
+        self.assertEqual(self.jobIds(required_skills=["python"], any_skills=["docker", "java"]), ["pyaws"])
+        self.assertEqual(self.jobIds(required_skills=["rust"]), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        job = make_job("a", skills=["Python"])
+        job.skills = ["Go", "Python", "go"]
+        job.save()
+        self.assertEqual(sorted(job.skill_index.values_list("skill", flat=True)), ["go", "python"])
+        self.assertEqual(self.jobIds(required_skills=["go"]), ["a"])
+
+        job.delete()
+        self.assertEqual(self.jobIds(any_skills=["go"]), [])
+
+    def test_invalid_filter_is_rejected(self):
+        response = self.client.post(
+            "/dashboard/get-jobs-list", {"requiredSkills": "Python"}, content_type="application/json",
+            headers={"Authorization": f"Bearer {issueToken('rahul')}"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(AUTOCOMPLETE_REFRESH_INTERVAL=0)
+class AutocompleteTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        autocomplete_index.reset()
+
+    def suggest(self, field, prefix, **body):
+        response = self.client.post(
+            "/dashboard/get-autocomplete", {"field": field, "prefix": prefix, **body}, content_type="application/json",
+            headers={"Authorization": f"Bearer {issueToken('rahul')}"}
+        )
+        return response.status_code, response.json()
+
+    def test_ranks_word_prefix_matches_by_frequency_and_follows_writes(self):
+        make_job("a", role_name="Frontend Developer", location="New Delhi")
+        make_job("b", role_name="Backend Developer")
+        make_job("c", role_name="Backend Developer", location="Delhi")
+        make_job("d", role_name="DevOps Engineer", location="Pune")
+
+        self.assertEqual(self.suggest("roleName", " DEV")[1]["suggestions"], [
+            {"value": "Backend Developer", "count": 2},
+            {"value": "DevOps Engineer", "count": 1},
+            {"value": "Frontend Developer", "count": 1},
+        ])
+        self.assertEqual(self.suggest("roleName", "dev", limit=1)[1]["suggestions"], [{"value": "Backend Developer", "count": 2}])
+        self.assertEqual(self.suggest("location", "del")[1]["suggestions"], [
+            {"value": "Delhi", "count": 2}, {"value": "New Delhi", "count": 1}
+        ])
+        self.assertEqual(self.suggest("location", "x")[1]["suggestions"], [])
+
+        job = Job.objects.get(job_id="b")
+        job.role_name = "Data Scientist"
+        job.save()
+        Job.objects.get(job_id="c").delete()
+        make_job("e", role_name="Developer Advocate")
+        with self.assertNumQueries(2):
+            # The change log and the changed jobs
+            suggestions = autocomplete_index.get().complete("roleName", "dev")
+        self.assertEqual(suggestions, [("DevOps Engineer", 1), ("Developer Advocate", 1), ("Frontend Developer", 1)])
+        self.assertEqual(self.suggest("location", "de")[1]["suggestions"], [{"value": "Delhi", "count": 2}, {"value": "New Delhi", "count": 1}])
+
+        rebuilt = AutocompleteIndex.load()
+        for field in AUTOCOMPLETE_FIELDS:
+            self.assertEqual(rebuilt.complete(field, "", 50), autocomplete_index.get().complete(field, "", 50))
+
+    def test_refresh_leaves_the_index_being_read_unchanged(self):
+        make_job("a", role_name="Frontend Developer")
+        make_job("b", role_name="Backend Developer")
+        index = autocomplete_index.get()
+        keys = {field: list(column.keys) for field, column in index.columns.items()}
+        suggestions = index.complete("roleName", "dev")
+
+        Job.objects.get(job_id="a").delete()
+        make_job("c", role_name="Developer Advocate", location="Pune")
+        refreshed = autocomplete_index.get()
+
+        self.assertIsNot(refreshed, index)
+        self.assertEqual(index.complete("roleName", "dev"), suggestions)
+        self.assertEqual({field: column.keys for field, column in index.columns.items()}, keys)
+        self.assertEqual(refreshed.complete("roleName", "dev"), [("Backend Developer", 1), ("Developer Advocate", 1)])
+        self.assertEqual(refreshed.complete("location", "p"), [("Pune", 1)])
+
+    def test_rejects_invalid_requests(self):
+        self.assertEqual(self.suggest("companyName", "goo")[0], 400)
+        self.assertEqual(self.suggest("roleName", None)[0], 400)
+        self.assertEqual(self.suggest("roleName", "dev", limit=0)[0], 400)
+        self.assertEqual(self.suggest("roleName", "dev", limit="5")[0], 400)
+
+
+class JobFacetsTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_counts_in_one_cached_query(self):
+        make_job("a", employment_type=EmploymentType.FULL_TIME, salary=4, location="Pune")
+        make_job("b", employment_type=EmploymentType.FULL_TIME, salary=25, location="Delhi")
+        make_job("c", employment_type=EmploymentType.INTERNSHIP, salary=60, location="Delhi")
+
+        with self.assertNumQueries(1):
+            total_count, facets = storage.fetchJobFacetsFromDB(min_salary=1)
+        self.assertEqual(total_count, 3)
+        self.assertEqual(
+            {facet["value"]: facet["count"] for facet in facets["employmentType"]},
+            {"FT": 2, "PT": 0, "IT": 1, "FR": 0}
+        )
+        self.assertEqual(
+            [(facet["value"], facet["count"]) for facet in facets["salary"]],
+            [("0-5", 1), ("5-10", 0), ("10-20", 0), ("20-30", 1), ("30-50", 0), ("50+", 1)]
+        )
+        self.assertEqual(facets["location"], [{"value": "Delhi", "count": 2}, {"value": "Pune", "count": 1}])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(storage.fetchJobFacetsFromDB(min_salary=1), (total_count, facets))
+
+        make_job("d", location="Pune")
+        self.assertEqual(storage.fetchJobFacetsFromDB(min_salary=1)[0], 4)
+        self.assertEqual(storage.fetchJobFacetsFromDB(employment_type=["IT"])[0], 1)
+
+
+class JobExportTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.headers = {"Authorization": f"Bearer {issueToken('rahul')}"}
+
+    def export(self, body):
+        response = self.client.post("/dashboard/export-jobs", body, content_type="application/json", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        response.close()
+        self.assertTrue(all(chunk.endswith("\n") for chunk in chunks))
+        return chunks, [json.loads(line) for line in "".join(chunks).splitlines()]
+
+    def test_streams_every_matching_job_as_a_list_card(self):
+        company = make_company("google")
+        # One more chunk than EXPORT_CHUNK_SIZE fills
+        Job.objects.bulk_create(
+            Job(
+                job_id=f"job{i}", role_name="Backend Developer", company=company, location="Delhi",
+                employment_type=EmploymentType.INTERNSHIP if i % 2 else EmploymentType.FULL_TIME,
+                salary=i % 50, job_description="Build APIs", stars=4, skills=["Python"],
+            )
+            for i in range(views.EXPORT_CHUNK_SIZE + 5)
+        )
+
+        chunks, jobs = self.export({})
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(len(jobs), views.EXPORT_CHUNK_SIZE + 5)
+        self.assertEqual(len({job["jobId"] for job in jobs}), len(jobs))
+
+        listed = self.client.post(
+            "/dashboard/get-jobs-list", {"page_size": 1}, content_type="application/json", headers=self.headers
+        ).json()["data"][0]
+        self.assertIn(listed, jobs)
+
+        _, jobs = self.export({"minimumSalary": 40, "employmentType": ["FT"]})
+        self.assertEqual(
+            {job["jobId"] for job in jobs},
+            set(Job.objects.filter(salary__gte=40, employment_type="FT").values_list("job_id", flat=True))
+        )
+        self.assertTrue(all(job["employmentType"] == EmploymentType.FULL_TIME.label for job in jobs))
+
+    async def test_streams_without_buffering_under_asgi(self):
+        company = await sync_to_async(make_company)("google")
+        await Job.objects.abulk_create(
+            Job(
+                job_id=f"job{i}", role_name="Backend Developer", company=company, location="Delhi",
+                employment_type=EmploymentType.FULL_TIME, salary=i, job_description="Build APIs", stars=4, skills=["Python"],
+            )
+            for i in range(5)
+        )
+        response = await self.async_client.post(
+            "/dashboard/export-jobs", {"minimumSalary": 2}, content_type="application/json", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        # Raised as an error here, the warning Django gives when it has to buffer a synchronous iterator
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            chunks = [chunk async for chunk in response.streaming_content]
+        await sync_to_async(response.close)()
+        self.assertEqual(
+            sorted(json.loads(line)["jobId"] for line in b"".join(chunks).decode().splitlines()),
+            ["job2", "job3", "job4"]
+        )
+
+    def test_encode_ndjson_yields_one_string_per_chunk(self):
+        items = [{"jobId": f"job{i}", "roleName": "Dev\n\"ops\""} for i in range(5)]
+        chunks = list(views.encodeNdjson(items, 2))
+        self.assertEqual([chunk.count("\n") for chunk in chunks], [2, 2, 1])
+        self.assertEqual([json.loads(line) for line in "".join(chunks).splitlines()], items)
+        self.assertEqual(list(views.encodeNdjson([], 2)), [])
+
+
+class SimilarJobsTests(TestCase):
+
+    def storedNeighbours(self):
+        neighbours = {}
+        for job_id, similar_id in SimilarJob.objects.order_by('job_id', 'position').values_list('job_id', 'similar_id'):
+            neighbours.setdefault(job_id, []).append(similar_id)
+        return neighbours
+
+    def test_served_from_precomputed_rows_in_one_query(self):
+        make_job("a", stars=5)
+        make_job("b", stars=3)
+        make_job("c", stars=4, company="netflix")
+
+        with self.assertNumQueries(1):
+            similar_jobs = storage.fetchSimilarJobs("a")
+
+        self.assertEqual([job["jobId"] for job in similar_jobs], ["b", "c"])
+
+    def test_incremental_updates_match_full_rebuild(self):
+        rng = random.Random(7)
+        companies = ["google", "netflix", "amazon", "meta", "tiny"]
+        jobs = {}
+        for step in range(120):
+            action = rng.random()
+            if action < 0.5 or len(jobs) < 5:
+                job_id = f"job{step:03d}"
+                jobs[job_id] = make_job(job_id, company=rng.choice(companies), stars=rng.randint(1, 5))
+            elif action < 0.8:
+                job = jobs[rng.choice(sorted(jobs))]
+                job.stars = rng.randint(1, 5)
+                job.company = make_company(rng.choice(companies))
+                job.save()
+            else:
+                jobs.pop(rng.choice(sorted(jobs))).delete()
+
+            if step % 20 == 19:
+                incremental = self.storedNeighbours()
+                rebuildAllSimilarJobs()
+                self.assertEqual(incremental, self.storedNeighbours())
+
+
+@override_settings(DASHBOARD_QUERY_BACKEND="snapshot", JOB_SNAPSHOT_MAX_DELTA=25)
+class JobsSnapshotTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        jobs_snapshot.reset()
+
+    def ormJobIds(self, **filters):
+        return list(storage.filterJobs(**filters).order_by(*storage.CURSOR_ORDERING).values_list("job_id", flat=True))
+
+    def assertMatchesOrm(self):
+        for filters in (
+            {},
+            {"min_salary": 25},
+            {"employment_type": ["PT", "IT"]},
+            {"min_salary": 10, "employment_type": ["FT"], "required_skills": ["python"]},
+            {"any_skills": ["AWS", "Go"], "min_salary": 61},
+        ):
+            expected = self.ormJobIds(**filters)
+            for offset, limit in ((0, 10), (7, 5), (len(expected) - 3, 10)):
+                total_count, jobs = storage.fetchJobsListFromDB(**filters, offset=max(offset, 0), limit=limit)
+                self.assertEqual(total_count, len(expected), filters)
+                self.assertEqual([job["jobId"] for job in jobs], expected[max(offset, 0):max(offset, 0) + limit], filters)
+        for job in Job.objects.all()[:10]:
+            self.assertEqual([item["jobId"] for item in storage.fetchSimilarJobs(job.job_id)], computeSimilarJobIds(job))
+
+    def test_matches_the_orm_through_incremental_changes_and_reloads(self):
+        rng = random.Random(3)
+        companies = ["google", "netflix", "amazon", "tiny"]
+        skills = ["Python", "AWS", "Go", "SQL"]
+
+        def randomFields():
+            return {
+                "company": make_company(rng.choice(companies)),
+                "stars": rng.randint(1, 5),
+                "salary": rng.randint(1, 60),
+                "employment_type": rng.choice(["FT", "PT", "IT", "FR"]),
+                "skills": rng.sample(skills, 2),
+            }
+
+        jobs = [make_job(f"job{i:03d}", **randomFields()) for i in range(60)]
+        self.assertMatchesOrm()
+        loaded = jobs_snapshot.snapshot
+
+        for step in range(3):
+            for job in rng.sample(jobs, 4):
+                for field, value in randomFields().items():
+                    setattr(job, field, value)
+                job.save()
+            jobs.pop(rng.randrange(len(jobs))).delete()
+            jobs.append(make_job(f"new{step}", **randomFields()))
+            # The change log, the changed rows and the page
+            with self.assertNumQueries(3):
+                storage.fetchJobsListFromDB(limit=5)
+            with self.assertNumQueries(1):
+                storage.fetchJobsListFromDB(limit=5)
+            self.assertMatchesOrm()
+        self.assertIs(jobs_snapshot.snapshot.index, loaded.index)
+
+        # Past JOB_SNAPSHOT_MAX_DELTA changed rows the snapshot is reloaded
+        for job in jobs[:10]:
+            job.stars = 1
+            job.save()
+        self.assertMatchesOrm()
+        self.assertIsNot(jobs_snapshot.snapshot.index, loaded.index)
+        self.assertEqual(jobs_snapshot.snapshot.changedRows, 0)
+
+    def test_search_still_uses_full_text_index(self):
+        make_job("a", role_name="Data Scientist")
+        make_job("b", role_name="Backend Developer")
+        total_count, jobs = storage.fetchJobsListFromDB(search_role_name="data")
+        self.assertEqual((total_count, [job["jobId"] for job in jobs]), (1, ["a"]))
+        self.assertIsNone(jobs_snapshot.snapshot)
+
+    def test_bit_rank(self):
+        mask = int("1011000001" * 2000, 2)
+        bits = [position for position in range(20000) if mask >> position & 1]
+        ranked = BitRank(mask, 20000)
+        self.assertEqual(ranked.total, len(bits))
+        for position in (0, 1, 4, 9, 8191, 8192, 13333, 20000):
+            self.assertEqual(ranked.rank(position), sum(1 for bit in bits if bit < position))
+        for start in (0, 3, 1639, 7999, 8000):
+            self.assertEqual(ranked.select(start, 5), bits[start:start + 5])
+
+
+class JobDetailsCacheTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_repeat_lookups_skip_the_database(self):
+        make_job("a", role_name="Backend Developer")
+        first = storage.fetchJobFromDB("a")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(storage.fetchJobFromDB("a"), first)
+
+        storage.job_detail_lru.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(storage.fetchJobFromDB("a"), first)
+
+    def test_save_and_delete_evict_cached_details(self):
+        job = make_job("a", role_name="Backend Developer")
+        storage.fetchJobFromDB("a")
+
+        job.role_name = "Platform Engineer"
+        job.save()
+        self.assertEqual(storage.fetchJobFromDB("a")["roleName"], "Platform Engineer")
+
+        job.delete()
+        self.assertIsNone(storage.fetchJobFromDB("a"))
+
+    def test_batch_lookup_uses_one_query_and_reports_missing_ids(self):
+        make_job("a")
+        make_job("b", role_name="Data Scientist")
+        cached = storage.fetchJobFromDB("a")
+
+        with self.assertNumQueries(1):
+            jobs, missing_ids = storage.fetchJobsFromDB(["a", "b", "nope", "b"])
+
+        self.assertEqual(jobs["a"], cached)
+        self.assertEqual(jobs["b"], storage.fetchJobFromDB("b"))
+        self.assertEqual(missing_ids, ["nope"])
+
+        with self.assertNumQueries(0):
+            storage.fetchJobsFromDB(["a", "b"])
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.headers = {"Authorization": f"Bearer {issueToken('rahul')}"}
+        # Three jobs per star rating, so pages split groups of equal stars
+        for i in range(9):
+            make_job(f"job{i}", stars=i % 3 + 3)
+        self.expected = ["job2", "job5", "job8", "job1", "job4", "job7", "job0", "job3", "job6"]
+
+    def post(self, body, path="/dashboard/get-jobs-list"):
+        return self.client.post(path, body, content_type="application/json", headers=self.headers)
+
+    def test_next_cursor_walks_every_job_once(self):
+        for path in ("/dashboard/get-jobs-list", "/dashboard/async/get-jobs-list"):
+            with self.subTest(path=path):
+                seen, cursor, pages = [], None, 0
+                while True:
+                    response = self.post({"cursor": cursor, "page_size": 2}, path)
+                    self.assertEqual(response.status_code, 200)
+                    body = response.json()
+                    self.assertEqual(body["total_count"], 9)
+                    seen += [job["jobId"] for job in body["data"]]
+                    pages += 1
+                    cursor = body["next_cursor"]
+                    if cursor is None:
+                        break
+                self.assertEqual(seen, self.expected)
+                self.assertEqual(pages, 5)
+
+    def test_last_page_has_no_next_cursor(self):
+        body = self.post({"cursor": None, "page_size": 9}).json()
+        self.assertEqual([job["jobId"] for job in body["data"]], self.expected)
+        self.assertIsNone(body["next_cursor"])
+
+        cursor = self.post({"cursor": "", "page_size": 8}).json()["next_cursor"]
+        body = self.post({"cursor": cursor, "page_size": 8}).json()
+        self.assertEqual([job["jobId"] for job in body["data"]], ["job6"])
+        self.assertIsNone(body["next_cursor"])
+
+    def test_invalid_cursor_and_page_size_are_rejected(self):
+        cursor = self.post({"cursor": None, "page_size": 2}).json()["next_cursor"]
+        for path in ("/dashboard/get-jobs-list", "/dashboard/async/get-jobs-list"):
+            for body in (
+                {"cursor": cursor[:-3] + "!!!"},
+                {"cursor": "bm90IGpzb24"},
+                {"cursor": storage.encodeCursor({"stars": "4", "job_id": "job1"})},
+                {"cursor": 12},
+                {"cursor": None, "page_size": 0},
+                {"cursor": None, "page_size": -1},
+                {"cursor": None, "page_size": "10"},
+                {"page_size": 0},
+                {"page_size": storage.MAX_PAGE_SIZE + 1},
+                {"page_number": 0},
+                {"page_number": "2"},
+            ):
+                with self.subTest(path=path, body=body):
+                    response = self.post(body, path)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("errorMessage", response.json())
+
+
+class JobListFilterAndCountTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.headers = {"Authorization": f"Bearer {issueToken('rahul')}"}
+        for i in range(6):
+            make_job(f"job{i}", salary=10 * i)
+
+    def post(self, body, path="/dashboard/get-jobs-list"):
+        return self.client.post(path, body, content_type="application/json", headers=self.headers)
+
+    def test_count_modes(self):
+        for path in ("/dashboard/get-jobs-list", "/dashboard/async/get-jobs-list"):
+            with self.subTest(path=path):
+                clear_caches()
+                counts = {
+                    mode: self.post({"minimumSalary": 20, "count_mode": mode}, path).json()["total_count"]
+                    for mode in storage.COUNT_MODES
+                }
+                self.assertEqual(counts, {"exact": 4, "estimated": 4, "none": None})
+
+        make_job("job9", salary=90)
+        # "estimated" may answer with the count cached before the save, "exact" never does
+        self.assertEqual(storage.fetchJobsListFromDB(min_salary=20, count_mode="estimated")[0], 4)
+        self.assertEqual(storage.fetchJobsListFromDB(min_salary=20)[0], 5)
+
+    def test_count_cache_follows_job_saves_and_deletes(self):
+        self.assertEqual(storage.fetchJobsListFromDB(min_salary=20)[0], 4)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(storage.fetchJobsListFromDB(min_salary=20)[0], 4)
+        self.assertFalse([query for query in queries if "COUNT(" in query["sql"]])
+
+        generation = storage.getJobsGeneration()
+        job = Job.objects.get(job_id="job1")
+        job.salary = 50
+        job.save()
+        self.assertNotEqual(storage.getJobsGeneration(), generation)
+        self.assertEqual(storage.fetchJobsListFromDB(min_salary=20)[0], 5)
+
+        generation = storage.getJobsGeneration()
+        Job.objects.get(job_id="job5").delete()
+        self.assertNotEqual(storage.getJobsGeneration(), generation)
+        self.assertEqual(storage.fetchJobsListFromDB(min_salary=20)[0], 4)
+
+    @override_settings(JOB_COUNT_CACHE_TIMEOUT=60)
+    def test_counts_and_facets_expire_from_the_cache(self):
+        for search in ("backend", "developer", "back dev"):
+            storage.fetchJobsListFromDB(search_role_name=search)
+            async_to_sync(async_storage.afetchJobsListFromDB)(search_role_name=search, min_salary=10)
+            storage.fetchJobFacetsFromDB(search_role_name=search)
+
+        # LocMemCache keeps the expiry time of each key, None for keys that never expire
+        expiries = {
+            key: expiry for key, expiry in cache._expire_info.items()
+            if storage.JOBS_COUNT_KEY_PREFIX in key or storage.JOBS_FACETS_KEY_PREFIX in key
+        }
+        self.assertEqual(len(expiries), 9)
+        self.assertTrue(all(expiry <= time.time() + 60 for expiry in expiries.values()), expiries)
+
+    # More requests than the per-user burst allows
+    @override_settings(ADMISSION_CONTROL_ENABLED=False)
+    def test_malformed_filters_are_rejected(self):
+        bodies = (
+            {"employmentType": [["FT"]]},
+            {"employmentType": "FT"},
+            {"minimumSalary": "abc"},
+            {"minimumSalary": [20]},
+            {"minimumSalary": True},
+            {"minimumSalary": 10 ** 40},
+            {"searchRoleName": ["Backend"]},
+            {"requiredSkills": "Python"},
+        )
+        for path in (
+            "/dashboard/get-jobs-list",
+            "/dashboard/async/get-jobs-list",
+            "/dashboard/get-jobs-facets",
+            "/dashboard/export-jobs",
+        ):
+            for body in bodies:
+                with self.subTest(path=path, body=body):
+                    response = self.post(body, path)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("errorMessage", response.json())
+
+    def test_salary_may_be_a_string_of_digits(self):
+        response = self.post({"minimumSalary": "20", "employmentType": ["FT"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_count"], 4)
+
+
+@override_settings(ADMISSION_CONTROL_ENABLED=False)
+class AsyncViewParityTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        jobs_snapshot.reset()
+        self.headers = {"Authorization": f"Bearer {issueToken('rahul')}"}
+        for i in range(8):
+            make_job(
+                f"job{i}", company=("google", "netflix", "amazon")[i % 3], stars=i % 4 + 2,
+                salary=5 * i, employment_type=(EmploymentType.FULL_TIME, EmploymentType.PART_TIME)[i % 2],
+                role_name=("Backend Developer", "Data Scientist")[i % 2], skills=["Python", ("AWS", "Go")[i % 2]],
+            )
+        # Written without Job.save(), so without stored payloads
+        Job.objects.bulk_create([Job(
+            job_id="job8", role_name="Backend Developer", company=make_company("google"), location="Pune",
+            employment_type=EmploymentType.FULL_TIME, salary=50, job_description="Services", stars=5, skills=["Go"],
+        )])
+
+    def post(self, path, body):
+        return self.client.post(path, body, content_type="application/json", headers=self.headers)
+
+    def test_async_views_answer_like_the_sync_ones(self):
+        requests = [("get-jobs-list", body) for body in (
+            {},
+            {"page_size": 3, "page_number": 2},
+            {"minimumSalary": 10, "employmentType": ["FT"], "count_mode": "none"},
+            {"requiredSkills": ["python"], "anySkills": ["go"]},
+            {"searchRoleName": "backend"},
+            {"fields": ["jobId", "salary", "companyLogoUrl"], "snippetLength": 3},
+            {"snippetLength": 4, "page_size": 5},
+            {"cursor": None, "page_size": 4},
+            {"cursor": None, "page_size": 4, "fields": ["jobId"]},
+            {"page_size": 0},
+            {"fields": ["nope"]},
+            {"employmentType": [["FT"]]},
+        )] + [("get-job-details", {"jobId": job_id}) for job_id in ("job1", "job8", "nope")] + [
+            ("get-similar-jobs", {"jobId": "job1"}),
+            ("get-similar-jobs", {"jobId": "job8", "fields": ["jobId", "stars"], "snippetLength": 3}),
+            ("get-similar-jobs", {"jobId": "job2", "snippetLength": 0}),
+        ]
+        for fast_json in (True, False):
+            for backend in ("orm", "snapshot"):
+                with self.settings(DASHBOARD_FAST_JSON=fast_json, DASHBOARD_QUERY_BACKEND=backend):
+                    for endpoint, body in requests:
+                        with self.subTest(fast_json=fast_json, backend=backend, endpoint=endpoint, body=body):
+                            expected = self.post(f"/dashboard/{endpoint}", body)
+                            response = self.post(f"/dashboard/async/{endpoint}", body)
+                            self.assertEqual(response.status_code, expected.status_code)
+                            self.assertEqual(response.get("ETag"), expected.get("ETag"))
+                            if expected.status_code != 204:
+                                self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    def test_job_page_matches_details_and_similar_jobs(self):
+        for fast_json in (True, False):
+            with self.subTest(fast_json=fast_json), self.settings(DASHBOARD_FAST_JSON=fast_json):
+                page = self.post("/dashboard/async/get-job-page", {"jobId": "job8"}).json()
+                self.assertEqual(page["data"], self.post("/dashboard/get-job-details", {"jobId": "job8"}).json()["data"])
+                self.assertEqual(page["similarJobs"], self.post("/dashboard/get-similar-jobs", {"jobId": "job8"}).json()["similarJobs"])
+
+
+class ConditionalRequestTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.headers = {"Authorization": f"Bearer {issueToken('rahul')}"}
+
+    def post(self, path, body, etag=None):
+        headers = dict(self.headers, **({"If-None-Match": etag} if etag else {}))
+        return self.client.post(path, body, content_type="application/json", headers=headers)
+
+    def test_unchanged_responses_are_not_modified(self):
+        job = make_job("a")
+        make_job("b", stars=3)
+
+        for path, body in (
+            ("/dashboard/get-job-details", {"jobId": "a"}),
+            ("/dashboard/get-similar-jobs", {"jobId": "a"}),
+            ("/dashboard/get-jobs-list", {"minimumSalary": 10, "page_size": 5}),
+            ("/dashboard/async/get-job-details", {"jobId": "a"}),
+            ("/dashboard/async/get-jobs-list", {"minimumSalary": 10, "page_size": 5}),
+        ):
+            with self.subTest(path=path):
+                response = self.post(path, body)
+                self.assertEqual(response.status_code, 200)
+                etag = response["ETag"]
+
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.post(path, body, etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(response["ETag"], etag)
+                # Nothing beyond the version lookup of get-job-details
+                self.assertLessEqual(len(queries), 1)
+
+                self.assertEqual(self.post(path, dict(body, page_number=2) if "list" in path else {"jobId": "b"}, etag).status_code, 200)
+
+        details_etag = self.post("/dashboard/get-job-details", {"jobId": "a"})["ETag"]
+        list_etag = self.post("/dashboard/get-jobs-list", {})["ETag"]
+        job.salary = 30
+        job.save()
+        self.assertEqual(self.post("/dashboard/get-job-details", {"jobId": "a"}, details_etag).status_code, 200)
+        self.assertEqual(self.post("/dashboard/get-jobs-list", {}, list_etag).status_code, 200)
+
+    def test_saves_with_update_fields_change_the_etag(self):
+        job = make_job("a", stars=3)
+        for path in ("/dashboard/get-job-details", "/dashboard/async/get-job-details"):
+            with self.subTest(path=path):
+                etag = self.post(path, {"jobId": "a"})["ETag"]
+                job.stars += 1
+                job.save(update_fields=["stars"])
+                response = self.post(path, {"jobId": "a"}, etag)
+                self.assertEqual((response.status_code, response.json()["data"]["stars"]), (200, job.stars))
+
+                etag = response["ETag"]
+                job.company.logo_url = f"logo{job.stars}"
+                job.company.save(update_fields=["logo_url"])
+                response = self.post(path, {"jobId": "a"}, etag)
+                self.assertEqual((response.status_code, response.json()["data"]["companyLogoUrl"]), (200, job.company.logo_url))
+
+    def test_missing_job_has_no_etag(self):
+        response = self.post("/dashboard/get-job-details", {"jobId": "nope"}, "*")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_job_ids_that_are_not_strings_find_no_job(self):
+        make_job("a")
+        make_job("b")
+        for jobId in (["a"], {"jobId": "a"}, 1.5):
+            for path in ("/dashboard/get-job-details", "/dashboard/async/get-job-details", "/dashboard/async/get-job-page"):
+                with self.subTest(path=path, jobId=jobId):
+                    self.assertEqual(self.post(path, {"jobId": jobId}).status_code, 204)
+            for path in ("/dashboard/get-similar-jobs", "/dashboard/async/get-similar-jobs"):
+                with self.subTest(path=path, jobId=jobId):
+                    response = self.post(path, {"jobId": jobId})
+                    self.assertEqual((response.status_code, response.json()["similarJobs"]), (200, []))
+
+
+class SparseFieldsTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        jobs_snapshot.reset()
+        self.headers = {"Authorization": f"Bearer {issueToken('rahul')}"}
+
+    def post(self, path, body, **headers):
+        return self.client.post(path, body, content_type="application/json", headers=dict(self.headers, **headers))
+
+    def test_fields_and_snippet_length(self):
+        make_job("a", stars=5, job_description="Build and run the APIs")
+        make_job("b", stars=3, job_description="Short")
+        body = {"fields": ["salary", "jobId", "jobDescription"], "snippetLength": 9}
+        expected = [
+            {"jobId": "a", "salary": 20, "jobDescription": "Build and"},
+            {"jobId": "b", "salary": 20, "jobDescription": "Short"},
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post("/dashboard/get-jobs-list", dict(body, count_mode="none"))
+        self.assertEqual(sorted(response.json()["data"], key=lambda job: job["jobId"]), expected)
+        self.assertNotIn('"role_name"', queries[-1]["sql"])
+        self.assertIn("SUBSTR", queries[-1]["sql"].upper())
+
+        response = self.post("/dashboard/get-jobs-list", dict(body, cursor=None, page_size=1))
+        self.assertEqual(response.json()["data"], expected[:1])
+        response = self.post("/dashboard/get-jobs-list", dict(body, cursor=response.json()["next_cursor"], page_size=1))
+        self.assertEqual(response.json()["data"], expected[1:])
+
+        response = self.post("/dashboard/get-similar-jobs", {"jobId": "b", "fields": ["jobId", "employmentType"]})
+        self.assertEqual(response.json(), {"similarJobs": [{"jobId": "a", "employmentType": "Full Time"}]})
+        with override_settings(DASHBOARD_QUERY_BACKEND="snapshot"):
+            self.assertEqual(self.post("/dashboard/get-jobs-list", body).json()["data"], expected)
+            self.assertEqual(
+                self.post("/dashboard/get-similar-jobs", {"jobId": "b", "snippetLength": 5}).json()["similarJobs"][0]["jobDescription"],
+                "Build"
+            )
+
+        for invalid in ({"fields": ["salary"]}, {"fields": []}, {"snippetLength": 0}):
+            response = self.post("/dashboard/get-similar-jobs", dict(invalid, jobId="a"))
+            self.assertEqual(response.status_code, 400)
+
+    def test_fields_do_not_change_the_rows_of_a_page(self):
+        for i in range(12):
+            make_job(f"job{(i * 7) % 12:02d}", stars=i % 3 + 1, salary=i)
+
+        def page(body):
+            response = self.post("/dashboard/get-jobs-list", dict(body, page_size=5, count_mode="none"))
+            return [job["jobId"] for job in response.json()["data"]]
+
+        for page_number in (1, 2, 3):
+            with self.subTest(page_number=page_number):
+                body = {"page_number": page_number}
+                expected = page(body)
+                self.assertEqual(page(dict(body, fields=["jobId"])), expected)
+                self.assertEqual(page(dict(body, fields=["jobId", "stars"], snippetLength=3)), expected)
+                with override_settings(DASHBOARD_QUERY_BACKEND="snapshot"):
+                    self.assertEqual(page(body), expected)
+                    self.assertEqual(page(dict(body, fields=["jobId"])), expected)
+        self.assertEqual(page({"page_number": 1}), ["job02", "job05", "job08", "job11", "job01"])
+
+    def test_large_responses_are_compressed(self):
+        for i in range(10):
+            make_job(f"job{i}", job_description="Build APIs " * 50)
+
+        response = self.post("/dashboard/get-jobs-list", {}, **{"Accept-Encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))["data"]), 10)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        response = self.post("/dashboard/get-jobs-list", {"fields": ["jobId"]}, **{"Accept-Encoding": "gzip"})
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli_is_preferred(self):
+        for i in range(10):
+            make_job(f"job{i}", job_description="Build APIs " * 50)
+
+        response = self.post("/dashboard/get-jobs-list", {}, **{"Accept-Encoding": "gzip, deflate, br"})
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(len(json.loads(compression.brotli.decompress(response.content))["data"]), 10)
+
+
+class FastJsonTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_fragments_render_like_dicts(self):
+        make_job("a", role_name="Backend Développeur", stars=5)
+        make_job("b", employment_type=EmploymentType.INTERNSHIP)
+        # Rows written by bulk_create have no stored payload yet
+        Job.objects.bulk_create([Job(
+            job_id="c", role_name="Data Scientist", company=make_company("meta"), location="Pune",
+            employment_type=EmploymentType.FREELANCE, salary=30, job_description="Models", stars=3,
+            skills=["Python"]
+        )])
+        json_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+
+        total_count, jobs = storage.fetchJobsListFromDB()
+        _, fragments = storage.fetchJobsListFromDB(as_fragments=True)
+        self.assertEqual(
+            json.loads(fast_renderer.render({"total_count": total_count, "data": fragments})),
+            json.loads(json_renderer.render({"total_count": total_count, "data": jobs}))
+        )
+
+        for job_id in ("a", "c"):
+            self.assertEqual(
+                json.loads(fast_renderer.render({"data": storage.fetchJobFromDB(job_id, as_fragment=True)})),
+                {"data": storage.fetchJobFromDB(job_id)}
+            )
+
+    def test_save_regenerates_payloads(self):
+        job = make_job("a", salary=10)
+        job.salary = 45
+        job.save(update_fields=["salary"])
+
+        job.refresh_from_db()
+        self.assertEqual(json.loads(bytes(job.list_payload))["salary"], 45)
+        self.assertEqual(json.loads(bytes(job.detail_payload))["salary"], 45)
+
+
+class CompanyTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_company_changes_reach_cached_details_and_lists(self):
+        make_job("a")
+        make_job("b", company="netflix")
+        self.assertEqual(storage.fetchJobFromDB("a")["companyLogoUrl"], "google")
+        self.assertEqual(storage.fetchJobFromDB("a", as_fragment=True), storage.fetchJobFromDB("a", as_fragment=True))
+        etag = etags.jobDetailsETag("a")
+
+        company = Company.objects.get(name="google")
+        company.logo_url = "google-2024"
+        company.life_at_company_description = "Hybrid"
+        company.save()
+
+        details = storage.fetchJobFromDB("a")
+        self.assertEqual((details["companyLogoUrl"], details["LifeAtCompanyDescription"]), ("google-2024", "Hybrid"))
+        self.assertEqual(json.loads(storage.fetchJobFromDB("a", as_fragment=True))["companyLogoUrl"], "google-2024")
+        _, fragments = storage.fetchJobsListFromDB(as_fragments=True)
+        self.assertEqual({json.loads(card)["jobId"]: json.loads(card)["companyLogoUrl"] for card in fragments}, {"a": "google-2024", "b": "netflix"})
+        self.assertNotEqual(etags.jobDetailsETag("a"), etag)
+        self.assertEqual(storage.fetchJobFromDB("b")["companyLogoUrl"], "netflix")
+
+    def test_saving_fields_jobs_do_not_show_keeps_their_caches(self):
+        make_job("a")
+        storage.fetchJobFromDB("a")
+        company = Company.objects.get(name="google")
+        generation = storage.getJobsGeneration()
+
+        company.name = "Google LLC"
+        with self.assertNumQueries(1):
+            company.save(update_fields=["name"])
+        company.name = "Alphabet"
+        company.save()
+        company.logo_url = company.logo_url
+        company.save()
+
+        self.assertEqual(storage.getJobsGeneration(), generation)
+        with self.assertNumQueries(0):
+            storage.fetchJobFromDB("a")
+
+        company.careers_url = None
+        company.save(update_fields=["careers_url"])
+        self.assertNotEqual(storage.getJobsGeneration(), generation)
+        self.assertIsNone(storage.fetchJobFromDB("a")["companyUrl"])
+
+    def test_jobs_store_and_cache_no_company_fields(self):
+        make_job("a")
+        make_job("b")
+        storage.fetchJobsFromDB(["a", "b"])
+        storage.fetchJobFromDB("a", as_fragment=True)
+
+        company_keys = {"companyLogoUrl", "companyUrl", "LifeAtCompanyDescription", "LifeAtCompanyImageUrl"}
+        for job in Job.objects.all():
+            self.assertFalse(company_keys & json.loads(bytes(job.list_payload)).keys())
+            self.assertFalse(company_keys & json.loads(bytes(job.detail_payload)).keys())
+        for _, (company_id, job_details) in storage.job_detail_lru.entries.values():
+            self.assertFalse(company_keys & (json.loads(job_details) if isinstance(job_details, bytes) else job_details).keys())
+        # One entry for the company both jobs share
+        self.assertEqual(list(storage.company_detail_lru.entries), [Company.objects.get(name="google").pk])
+
+
+class IngestJobsTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def feedRow(self, job_id, **fields):
+        row = {
+            "jobId": job_id, "roleName": "Backend Developer", "companyName": "google", "location": "Delhi",
+            "employmentType": "FT", "stars": 4, "salary": 20, "jobDescription": "Build APIs", "skills": ["Python"],
+        }
+        row.update(fields)
+        return row
+
+    def storedNeighbours(self):
+        return list(SimilarJob.objects.order_by('job_id', 'position').values_list('job_id', 'similar_id'))
+
+    def test_upserts_valid_rows_and_reports_the_others(self):
+        for i in range(8):
+            make_job(f"old{i}", company=["google", "netflix"][i % 2], stars=i % 5 + 1)
+        self.assertEqual(storage.fetchJobFromDB("old0")["roleName"], "Backend Developer")
+
+        lines = [
+            self.feedRow("old0", roleName="Platform Engineer", stars=5, skills=["Go"], companyName="netflix"),
+            self.feedRow("new1", employmentType="Internship", companyName="Acme", companyLogoUrl="acme",
+                         LifeAtCompanyDescription="Small team", LifeAtCompanyImageUrl="acme"),
+            self.feedRow("new2", companyName="Acme", stars=1),
+            self.feedRow("bad1", stars=9, employmentType="XX"),
+            self.feedRow("bad2", companyName="Nowhere"),
+            self.feedRow("bad3", salary="20", skills="Python"),
+            self.feedRow("new3", salary=5),
+            self.feedRow("new3", salary=50),
+        ]
+        body = "\n".join(json.dumps(line) for line in lines[:6]) + "\n{not json\n\n" + "\n".join(json.dumps(line) for line in lines[6:])
+        with override_settings(JOB_INGEST_CHUNK_SIZE=5):
+            response = self.client.post(
+                "/dashboard/ingest-jobs", body, content_type="application/x-ndjson",
+                headers={"Authorization": f"Bearer {issueToken('rahul')}"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(
+            {key: report[key] for key in ("received", "created", "updated", "failed")},
+            {"received": 9, "created": 3, "updated": 1, "failed": 4}
+        )
+        self.assertEqual([(error["row"], error["jobId"]) for error in report["errors"]], [(4, "bad1"), (5, "bad2"), (6, "bad3"), (7, None)])
+        self.assertEqual(set(report["errors"][0]["errors"]), {"stars", "employmentType"})
+        self.assertEqual(set(report["errors"][1]["errors"]), {"companyLogoUrl", "LifeAtCompanyDescription", "LifeAtCompanyImageUrl"})
+        self.assertEqual(set(report["errors"][2]["errors"]), {"salary", "skills"})
+
+        details = storage.fetchJobFromDB("old0")
+        self.assertEqual((details["roleName"], details["stars"], details["companyLogoUrl"]), ("Platform Engineer", 5, "netflix"))
+        self.assertEqual(storage.fetchJobFromDB("new1")["employmentType"], "Internship")
+        self.assertEqual(Job.objects.get(job_id="new3").salary, 50)
+        self.assertEqual(Company.objects.get(name="Acme").jobs.count(), 2)
+        self.assertEqual(storage.fetchJobsListFromDB(search_role_name="platform")[0], 1)
+        self.assertEqual(storage.fetchJobsListFromDB(required_skills=["go"])[0], 1)
+        self.assertEqual(storage.fetchJobsListFromDB(required_skills=["python"])[0], 10)
+
+        incremental = self.storedNeighbours()
+        rebuildAllSimilarJobs()
+        self.assertEqual(incremental, self.storedNeighbours())
+
+    def test_chunked_similar_jobs_updates_match_full_rebuild(self):
+        rng = random.Random(11)
+        companies = ["google", "netflix", "amazon", "tiny"]
+        for company in companies:
+            make_company(company)
+        for step in range(8):
+            rows = [
+                self.feedRow(f"job{rng.randrange(40):02d}", companyName=rng.choice(companies), stars=rng.randint(1, 5))
+                for _ in range(rng.randint(1, 12))
+            ]
+            report = ingest.ingestJobs(enumerate(rows, 1), chunk_size=5)
+            self.assertEqual(report.failed, 0)
+            incremental = self.storedNeighbours()
+            rebuildAllSimilarJobs()
+            self.assertEqual(incremental, self.storedNeighbours(), step)
+
+    def test_streams_json_arrays(self):
+        make_job("a")
+        feed = json.dumps([self.feedRow(f"job{i}", stars=i % 5 + 1, roleName="Dévelopeur") for i in range(30)] + [self.feedRow("a", salary=99)])
+        rows = ingest.iterJsonArray(io.BytesIO(feed.encode()), read_size=7)
+        self.assertEqual([(position, row["jobId"]) for position, row in rows][-2:], [(30, "job29"), (31, "a")])
+
+        report = ingest.ingestJobs(ingest.iterJsonArray(io.BytesIO(feed.encode()), read_size=100), chunk_size=8)
+        self.assertEqual((report.created, report.updated, report.failed), (30, 1, 0))
+        self.assertEqual(Job.objects.get(job_id="a").salary, 99)
+
+        with self.assertRaises(ValueError):
+            list(ingest.iterJsonArray(io.BytesIO(b'{"jobId": "a"}')))
+        truncated = ingest.ingestJobs(ingest.iterJsonArray(io.BytesIO(b'[' + json.dumps(self.feedRow("b")).encode() + b', {"jobId"')))
+        self.assertEqual((truncated.created, truncated.error_message), (1, "Item 2 is not valid JSON"))
+
+    def test_content_type_parameters_are_ignored(self):
+        make_company("google")
+        headers = {"Authorization": f"Bearer {issueToken('rahul')}"}
+        for content_type, body in (
+            ("application/json; charset=utf-8", json.dumps([self.feedRow("a")])),
+            ("Application/X-NDJSON;charset=UTF-8", json.dumps(self.feedRow("b"))),
+            ("text/plain; charset=utf-8", json.dumps(self.feedRow("c"))),
+        ):
+            with self.subTest(content_type=content_type):
+                response = self.client.post("/dashboard/ingest-jobs", body, content_type=content_type, headers=headers)
+                if content_type.startswith("text/"):
+                    self.assertEqual(response.status_code, 400)
+                else:
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(sorted(Job.objects.values_list("job_id", flat=True)), ["a", "b"])
+
+    def test_command_reads_a_feed_file(self):
+        make_company("google")
+        path = os.path.join(tempfile.mkdtemp(), "feed.ndjson")
+        with open(path, "w") as feed:
+            feed.write(json.dumps(self.feedRow("a")) + "\n" + json.dumps(self.feedRow("b", stars=0)) + "\n")
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command("ingest_jobs", path, stdout=stdout, stderr=stderr)
+        self.assertIn("1 jobs created, 0 updated, 1 rejected", stdout.getvalue())
+        self.assertEqual(json.loads(stderr.getvalue())["jobId"], "b")
+
+
+class ConcurrencyPoolTests(SimpleTestCase):
+
+    def test_queues_in_order_until_the_deadline(self):
+        pool = ConcurrencyPool("test", concurrency=1, queue=1, timeout=5)
+        self.assertTrue(pool.acquire())
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(pool.acquire()))
+        waiter.start()
+        while pool.stats()["queueDepth"] == 0:
+            time.sleep(0.001)
+        # The queue is full, the next request is shed at once
+        self.assertFalse(pool.acquire())
+        pool.release()
+        waiter.join()
+        self.assertEqual(results, [True])
+
+        pool.timeout = 0.01
+        self.assertFalse(pool.acquire())
+        self.assertEqual(
+            {key: value for key, value in pool.stats().items() if key not in ("concurrency", "queueSize")},
+            {"active": 1, "queueDepth": 0, "admitted": 2, "queued": 2, "rejectedQueueFull": 1, "rejectedTimeout": 1}
+        )
+
+
+@override_settings(
+    ADMISSION_CONTROL_ENABLED=True,
+    ADMISSION_POOLS={
+        "list": {"concurrency": 1, "queue": 0, "timeout": 0.1, "cost": 1},
+        "expensive": {"concurrency": 1, "queue": 0, "timeout": 0.1, "cost": 3},
+    },
+    ADMISSION_ROUTES={"/dashboard/get-jobs-list": "list"},
+    ADMISSION_RATE_LIMIT={"rate": 0.001, "burst": 5},
+)
+class AdmissionControlTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        make_job("a")
+
+    def post(self, body, user="rahul"):
+        return self.client.post(
+            "/dashboard/get-jobs-list", body, content_type="application/json",
+            headers={"Authorization": f"Bearer {issueToken(user)}"}
+        )
+
+    def test_sheds_busy_pools_and_rate_limits_users(self):
+        self.assertEqual(self.post({}).status_code, 200)
+        list_pool = admission_control.pools["list"]
+        self.assertTrue(list_pool.acquire())
+        try:
+            response = self.post({})
+        finally:
+            list_pool.release()
+        self.assertEqual((response.status_code, response["Retry-After"]), (503, "1"))
+
+        # Shed requests still cost their tokens; searches and deep pages use their own pool and cost more
+        self.assertEqual(self.post({"searchRoleName": "backend"}).status_code, 200)
+        response = self.post({"page_number": 200, "page_size": 10})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 1000)
+        self.assertEqual(self.post({}, user="priya").status_code, 200)
+
+        stats = self.client.get("/dashboard/internal/stats", headers={"Authorization": f"Bearer {issueToken('rahul')}"}).json()["admission"]
+        self.assertEqual((stats["pools"]["list"]["admitted"], stats["pools"]["list"]["rejectedQueueFull"]), (3, 1))
+        self.assertEqual(stats["pools"]["expensive"]["admitted"], 1)
+        self.assertEqual((stats["rateLimited"], stats["trackedUsers"]), (1, 2))
+
+    def test_streaming_responses_hold_their_slot_until_closed(self):
+        async def aview(request):
+            async def content():
+                yield b"row\n"
+            return StreamingHttpResponse(content())
+
+        async def aread(response):
+            return b"".join([part async for part in response])
+
+        request = RequestFactory().post("/dashboard/get-jobs-list", {}, content_type="application/json")
+        for name, middleware in (
+            ("sync", AdmissionControlMiddleware(lambda request: StreamingHttpResponse(iter([b"row\n"])))),
+            ("async", AdmissionControlMiddleware(aview)),
+        ):
+            for read in (False, True):
+                with self.subTest(middleware=name, read=read):
+                    pool = admission_control.pools["list"]
+                    response = async_to_sync(middleware)(request) if name == "async" else middleware(request)
+                    self.assertEqual(pool.stats()["active"], 1)
+                    if read:
+                        self.assertEqual(b"".join(response) if name == "sync" else async_to_sync(aread)(response), b"row\n")
+                        self.assertEqual(pool.stats()["active"], 1)
+                    # Closed without being read when the client went away before the body
+                    response.close()
+                    response.close()
+                    self.assertEqual(pool.stats()["active"], 0)
+
+
+class PopulateJobsCommandTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def generatedJobs(self):
+        return list(Job.objects.order_by('job_id').values_list(
+            'job_id', 'role_name', 'company__name', 'employment_type', 'salary', 'stars', 'skills'
+        ))
+
+    def test_seeded_output_is_deterministic_and_fully_indexed(self):
+        make_job("existing", role_name="Data Scientist")
+        call_command('populate_jobs', count=30, seed=4, batch_size=7, stdout=io.StringIO())
+
+        self.assertEqual(Job.objects.count(), 31)
+        self.assertFalse(Job.objects.filter(list_payload=b'').exists())
+        self.assertEqual(storage.fetchJobsListFromDB(search_role_name="data sci")[0], Job.objects.filter(role_name="Data Scientist").count())
+        self.assertEqual(SimilarJob.objects.values('job_id').distinct().count(), 31)
+
+        first = self.generatedJobs()
+        call_command('populate_jobs', count=30, seed=4, batch_size=7, clear=True, stdout=io.StringIO())
+        self.assertEqual(self.generatedJobs(), [job for job in first if job[0] != "existing"])
+
+    def test_clear_invalidates_cached_details(self):
+        call_command('populate_jobs', count=3, seed=4, id_prefix="p-", stdout=io.StringIO())
+        cached = storage.fetchJobFromDB("p-00000000")
+        storage.fetchJobsListFromDB()
+
+        call_command('populate_jobs', count=1, seed=5, id_prefix="p-", clear=True, stdout=io.StringIO())
+        job = Job.objects.get(job_id="p-00000000")
+        self.assertNotEqual(cached, storage.fetchJobFromDB("p-00000000"))
+        self.assertEqual(storage.fetchJobFromDB("p-00000000")["roleName"], job.role_name)
+        self.assertIsNone(storage.fetchJobFromDB("p-00000001"))
+        self.assertEqual(storage.fetchJobsListFromDB()[0], 1)
+
+
+class ReadReplicaRouterTests(SimpleTestCase):
+
+    def test_only_decorated_reads_go_to_the_replica(self):
+        router = ReadReplicaRouter()
+
+        @readsFromReplica
+        def read():
+            return router.db_for_read(Job)
+
+        @readsFromReplica
+        def stream():
+            yield router.db_for_read(Job)
+            yield router.db_for_read(Job)
+
+        @readsFromReplica
+        async def aread():
+            return router.db_for_read(Job)
+
+        self.assertIsNone(read())
+
+        with override_settings(DATABASE_REPLICA_ALIAS="replica"):
+            self.assertEqual(read(), "replica")
+            self.assertEqual(async_to_sync(aread)(), "replica")
+            generator = stream()
+            self.assertIsNone(router.db_for_read(Job))
+            self.assertEqual(list(generator), ["replica", "replica"])
+            self.assertIsNone(router.db_for_read(Job))
+            self.assertEqual(router.db_for_write(Job), "default")
+            self.assertFalse(router.allow_migrate("replica", "dashboard"))
+
+
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        resetEndpointStats()
+        self.headers = {"Authorization": f"Bearer {issueToken('rahul')}"}
+
+    def test_server_timing_stats_and_slow_request_log(self):
+        make_job("a", stars=5)
+        make_job("b", stars=3)
+
+        with override_settings(INSTRUMENTATION_SLOW_REQUEST_MS=0), self.assertLogs("config.instrumentation", "WARNING") as logs:
+            response = self.client.post(
+                "/dashboard/get-similar-jobs", {"jobId": "a"}, content_type="application/json", headers=self.headers
+            )
+            stats = self.client.get("/dashboard/internal/stats", headers=self.headers).json()
+
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r"auth;dur=[\d.]+")
+        self.assertRegex(timing, r"db;dur=[\d.]+")
+        self.assertIn('desc="1 queries"', timing)
+        slow_request = json.loads(logs.records[0].getMessage())
+        self.assertEqual(slow_request["endpoint"], "POST /dashboard/get-similar-jobs")
+        self.assertEqual(slow_request["queries"], 1)
+        self.assertIn("dashboard_similarjob", slow_request["slowestQuery"])
+
+        similar_stats = stats["endpoints"]["POST /dashboard/get-similar-jobs"]
+        self.assertEqual(similar_stats["count"], 1)
+        self.assertEqual(similar_stats["queriesPerRequest"], 1)
+        self.assertIn("jobDetailsCache", stats)
+
+    @override_settings(INSTRUMENTATION_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.post("/dashboard/get-similar-jobs", {"jobId": "a"}, content_type="application/json", headers=self.headers)
+        self.assertNotIn("Server-Timing", response)
@@ -1,9 +1,19 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path('get-jobs-list', views.getJobsList, name = 'joblist'),
     path('get-job-details', views.getJobDetails, name = 'jobdetails'),
-    path('get-similar-jobs', views.getSimilarJobs, name = 'similarjobs')
+    path('get-jobs-details', views.getJobsDetails, name = 'jobsdetails'),
+    path('get-similar-jobs', views.getSimilarJobs, name = 'similarjobs'),
+    path('get-jobs-facets', views.getJobsFacets, name = 'jobsfacets'),
+    path('get-autocomplete', views.getAutocomplete, name = 'autocomplete'),
+    path('export-jobs', views.exportJobs, name = 'exportjobs'),
+    path('ingest-jobs', views.ingestJobs, name = 'ingestjobs'),
+    path('internal/stats', views.getStats, name = 'stats'),
+    path('async/get-jobs-list', async_views.getJobsList, name = 'asyncjoblist'),
+    path('async/get-job-details', async_views.getJobDetails, name = 'asyncjobdetails'),
+    path('async/get-similar-jobs', async_views.getSimilarJobs, name = 'asyncsimilarjobs'),
+    path('async/get-job-page', async_views.getJobPage, name = 'asyncjobpage')
 ]
 
@@ -1,7 +1,31 @@
+import io
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .storage import fetchJobsListFromDB, fetchJobFromDB, fetchSimilarJobs
+from config.instrumentation import getEndpointStats, measurePhase
+from .admission import admission_control
+from .async_storage import astreamJobsFromDB
+from .autocomplete import AUTOCOMPLETE_FIELDS, DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS, autocomplete_index
+from .etags import isNotModified, jobDetailsETag, jobsListETag, similarJobsETag
+from .storage import COUNT_MODES, LIST_CARD_FIELDS, MAX_PAGE_SIZE, isPageNumber, isPageSize, SIMILAR_CARD_FIELDS, parseCardOptions, parseJobId, parseListFilters, fetchJobFacetsFromDB, fetchJobsListFromDB, fetchJobsPageFromDB, fetchJobFromDB, fetchJobsFromDB, fetchSimilarJobs, getJobDetailsCacheStats, streamJobsFromDB
+
+# Every endpoint here needs the login token; it is verified by
+# login.middleware.TokenAuthenticationMiddleware before the view runs.
+
+# Upper bound on jobIds accepted by get-jobs-details in one call
+MAX_BATCH_JOB_IDS = 100
+
+# Jobs read from the database and written to the response per export chunk
+EXPORT_CHUNK_SIZE = 2000
+
+
+def notModifiedResponse(etag):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
 
 """
@@ -11,7 +35,36 @@ Request
 {
     "minSalary" : 30,
     "employmentType" : [Full Time, Part Time],
-    "searchRoleName":"abc"
+    "searchRoleName":"abc",
+    "requiredSkills": ["Python", "Django"],
+    "anySkills": ["AWS", "GCP"],
+    "page_number": 1,
+    "page_size": 10,
+    "count_mode": "exact",
+    "fields": ["jobId", "roleName", "salary"],
+    "snippetLength": 120
+}
+
+requiredSkills keeps jobs listing every one of the skills, anySkills jobs listing at
+least one of them; both are case-insensitive.
+
+fields limits each job to the listed keys (any of jobId, stars, roleName, companyLogoUrl,
+location, employmentType, salary, jobDescription); snippetLength cuts jobDescription
+to that many characters. Both also apply to get-similar-jobs.
+
+page_size is 1 to 100 (10 by default) and page_number starts at 1.
+minimumSalary is an integer, employmentType a list of codes (FT, PT, ...) and
+searchRoleName a string; anything else is a 400, as for get-jobs-facets and export-jobs.
+
+count_mode controls total_count: "exact" (default, cached until jobs change),
+"estimated" (may be stale or capped) or "none" (skipped, total_count is null).
+
+Cursor mode: send "cursor" instead of "page_number" (null or "" for the first page,
+then the "next_cursor" from the previous response). Rows are ordered by stars desc,
+then jobId, and every page costs the same no matter how deep it is.
+{
+    "cursor": "WzQsImFiYzEyMyJd",
+    "page_size": 10
 }
 
 Response
@@ -37,34 +90,97 @@ Response
             "salary": 15
             "jobDescription": "......"
         }
-    ]
+    ],
+    "next_cursor": "WzUsImFiYjEyMiJd"   (cursor mode only, null on the last page)
 }
+
+Responses carry an ETag that changes whenever any job changes; sending it back in
+If-None-Match with the same request body returns 304 Not Modified with no body.
+This also applies to get-job-details and get-similar-jobs.
 """
 @api_view(['POST'])
 def getJobsList(request):
-    token = request.data.get('token')
-    if(not validate_token(token)):
+    page_size = request.data.get('page_size', 10)
+    count_mode = request.data.get('count_mode', 'exact')
+
+    if count_mode not in COUNT_MODES:
         return Response({
-            "errorMessage":"NAVIGATE TO LOGIN"
+            "errorMessage": "Invalid count_mode"
         },
-            status = status.HTTP_400_BAD_REQUEST
+        status=status.HTTP_400_BAD_REQUEST
         )
 
-    minimumSalary = request.data.get('minimumSalary')
-    employmentType = request.data.get('employmentType')
-    searchRoleName = request.data.get('searchRoleName')
+    if not isPageSize(page_size):
+        return Response({
+            "errorMessage": f"page_size must be an integer from 1 to {MAX_PAGE_SIZE}"
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        filters = parseListFilters(request.data)
+        cardOptions = parseCardOptions(request.data, LIST_CARD_FIELDS)
+    except ValueError as error:
+        return Response({
+            "errorMessage": str(error)
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+
+    etag = jobsListETag(request.data)
+    if isNotModified(request, etag):
+        return notModifiedResponse(etag)
+
+    if 'cursor' in request.data:
+        cursor = request.data.get('cursor')
+        try:
+            total_count, jobs, next_cursor = fetchJobsPageFromDB(
+                **filters,
+                limit=page_size,
+                cursor=cursor,
+                count_mode=count_mode,
+                as_fragments=settings.DASHBOARD_FAST_JSON,
+                **cardOptions
+            )
+        except ValueError:
+            return Response({
+                "errorMessage": "Invalid cursor"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if(jobs == [] and not cursor):
+            return Response({
+                "ErrorMessage":"No Data found"
+            },
+            status=  status.HTTP_204_NO_CONTENT)
+
+        return Response({
+            "total_count": total_count,
+            "data": jobs,
+            "next_cursor": next_cursor
+            },
+            status = status.HTTP_200_OK,
+            headers = {"ETag": etag}
+        )
 
     page_number = request.data.get('page_number', 1)
-    page_size = request.data.get('page_size', 10)
-    
+    if not isPageNumber(page_number):
+        return Response({
+            "errorMessage": "page_number must be a positive integer"
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+
     offset = (page_number - 1) * page_size
 
     total_count, paginated_jobs = fetchJobsListFromDB(
-        min_salary=minimumSalary,
-        employment_type=employmentType,
-        search_role_name=searchRoleName,
+        **filters,
         limit=page_size,
-        offset=offset
+        offset=offset,
+        count_mode=count_mode,
+        as_fragments=settings.DASHBOARD_FAST_JSON,
+        **cardOptions
     )
 
     if(paginated_jobs == [] and page_number == 1):
@@ -77,10 +193,234 @@ def getJobsList(request):
         "total_count": total_count,
         "data": paginated_jobs
         },
+        status = status.HTTP_200_OK,
+        headers = {"ETag": etag}
+    )
+
+
+"""
+POST /dashboard/get-jobs-facets
+Counts for the filter sidebar, for the jobs matching the get-jobs-list filters.
+Request (all optional, same as get-jobs-list)
+{
+    "minimumSalary" : 30,
+    "employmentType" : ["FT", "PT"],
+    "searchRoleName":"abc",
+    "requiredSkills": ["Python"],
+    "anySkills": ["AWS", "GCP"]
+}
+
+Response
+{
+    "total_count": 42,
+    "facets": {
+        "employmentType": [{"value": "FT", "label": "Full Time", "count": 30}, ...],
+        "salary": [{"value": "0-5", "min": 0, "max": 5, "count": 3}, ..., {"value": "50+", "min": 50, "max": null, "count": 1}],
+        "location": [{"value": "Bangalore", "count": 20}, ...]
+    }
+}
+Salary buckets are [min, max) in LPA.
+"""
+@api_view(['POST'])
+def getJobsFacets(request):
+    try:
+        filters = parseListFilters(request.data)
+    except ValueError as error:
+        return Response({
+            "errorMessage": str(error)
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+
+    total_count, facets = fetchJobFacetsFromDB(**filters)
+    return Response({
+        "total_count": total_count,
+        "facets": facets
+        },
+        status = status.HTTP_200_OK
+    )
+
+
+"""
+POST /dashboard/get-autocomplete
+Suggestions for the search box, matching the start of any word of a role name or location.
+Answered from an in-process index (dashboard/autocomplete.py), which may lag writes by
+AUTOCOMPLETE_REFRESH_INTERVAL seconds.
+Request
+{
+    "field": "roleName",    // or "location"
+    "prefix": "dev",
+    "limit": 10             // optional, 1 to 50
+}
+
+Response
+{
+    "suggestions": [{"value": "Backend Developer", "count": 250}, {"value": "DevOps Engineer", "count": 100}, ...]
+}
+Most frequent first.
+"""
+@api_view(['POST'])
+def getAutocomplete(request):
+    field = request.data.get('field')
+    prefix = request.data.get('prefix')
+    limit = request.data.get('limit', DEFAULT_SUGGESTIONS)
+    if field not in AUTOCOMPLETE_FIELDS:
+        return Response({
+            "errorMessage": "field must be one of: " + ", ".join(AUTOCOMPLETE_FIELDS)
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+    if not isinstance(prefix, str):
+        return Response({
+            "errorMessage": "prefix must be a string"
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+    if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= MAX_SUGGESTIONS:
+        return Response({
+            "errorMessage": f"limit must be an integer from 1 to {MAX_SUGGESTIONS}"
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+
+    with measurePhase('autocomplete'):
+        suggestions = autocomplete_index.get().complete(field, prefix, limit)
+    return Response({
+        "suggestions": [{"value": value, "count": count} for value, count in suggestions]
+        },
         status = status.HTTP_200_OK
     )
 
 
+"""
+POST /dashboard/ingest-jobs
+Creates or updates jobs in bulk from a partner feed, read as a stream: a JSON array
+(Content-Type: application/json) or one job per line (application/x-ndjson).
+The token must be sent in the Authorization header. Rows are the get-job-details
+keys plus companyName; the other company keys are only used to create a company
+not stored yet. employmentType takes a code or a label and defaults to FT.
+[
+    {
+        "jobId": "abc123",
+        "roleName": "Devops Engineer",
+        "companyName": "Netflix",
+        "companyLogoUrl": "netflix",
+        "companyUrl": "https://www.netflix.com/careers",
+        "location": "Delhi",
+        "employmentType": "FT",
+        "stars": 4,
+        "salary": 20,
+        "jobDescription": "...",
+        "skills": ["Python", "Django"],
+        "LifeAtCompanyDescription": "...",
+        "LifeAtCompanyImageUrl": "netflix"
+    },
+    ...
+]
+
+Response
+{
+    "received": 1000,
+    "created": 900,
+    "updated": 98,
+    "failed": 2,
+    "errors": [{"row": 17, "jobId": "x1", "errors": {"stars": ["Must be from 1 to 5."]}}, ...]
+}
+Invalid rows are skipped and listed (the first 1000), the others written
+JOB_INGEST_CHUNK_SIZE at a time. A malformed JSON array stops the load with a 400
+carrying the same report plus errorMessage; the chunks before it stay written.
+"""
+@api_view(['POST'])
+def ingestJobs(request):
+    # Only this endpoint needs the feed parser and the bulk write path, load them on first use
+    from . import ingest
+
+    # DRF's content_type is the raw header, parameters such as "; charset=utf-8" included
+    media_type = request.content_type.split(';')[0].strip().lower()
+    if media_type == 'application/x-ndjson':
+        parse = ingest.iterNdjson
+    elif media_type == 'application/json':
+        parse = ingest.iterJsonArray
+    else:
+        return Response({
+            "errorMessage": "Content-Type must be application/json or application/x-ndjson"
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+
+    stream = request.stream if request.stream is not None else io.BytesIO()
+    report = ingest.ingestJobs(parse(stream))
+    return Response(
+        report.asDict(),
+        status=status.HTTP_400_BAD_REQUEST if report.error_message is not None else status.HTTP_200_OK
+    )
+
+
+"""
+POST /dashboard/export-jobs
+Streams every job matching the get-jobs-list filters as newline-delimited JSON,
+one get-jobs-list card per line, without paging or counting. Rows are read and
+sent EXPORT_CHUNK_SIZE at a time under WSGI and ASGI alike.
+Request
+{
+    "minimumSalary" : 30,
+    "employmentType" : ["FT", "PT"],
+    "searchRoleName":"abc",
+    "requiredSkills": ["Python"],
+    "anySkills": ["AWS", "GCP"]
+}
+
+Response (application/x-ndjson)
+{"jobId": "abc123", "stars": 4, "roleName": "Devops Engineer", ...}
+{"jobId": "abb122", "stars": 5, "roleName": "Intern", ...}
+"""
+@api_view(['POST'])
+def exportJobs(request):
+    try:
+        filters = parseListFilters(request.data)
+    except ValueError as error:
+        return Response({
+            "errorMessage": str(error)
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Under ASGI a synchronous iterator would be read into a list before the first byte is sent
+    if isinstance(request._request, ASGIRequest):
+        content = aencodeNdjson(astreamJobsFromDB(**filters, chunk_size=EXPORT_CHUNK_SIZE), EXPORT_CHUNK_SIZE)
+    else:
+        content = encodeNdjson(streamJobsFromDB(**filters, chunk_size=EXPORT_CHUNK_SIZE), EXPORT_CHUNK_SIZE)
+    return StreamingHttpResponse(content, content_type='application/x-ndjson')
+
+
+def encodeNdjson(items, chunk_size):
+    """
+    Encodes items as NDJSON, yielding one string per chunk_size lines.
+    """
+    lines = []
+    for item in items:
+        lines.append(json.dumps(item, separators=(',', ':')))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+async def aencodeNdjson(items, chunk_size):
+    """
+    encodeNdjson for an async iterator of items.
+    """
+    lines = []
+    async for item in items:
+        lines.append(json.dumps(item, separators=(',', ':')))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
 """
 Request
 {"jobId":"abc123"}
@@ -101,16 +441,12 @@ Response
 """
 @api_view(['POST'])
 def getJobDetails(request):
-    token = request.data.get('token')
-    if (not validate_token(token)):
-        return Response({
-            "errorMessage": "NAVIGATE TO LOGIN"
-        },
-        status=status.HTTP_400_BAD_REQUEST
-        )
+    jobId = parseJobId(request.data.get('jobId'))
+    etag = jobDetailsETag(jobId)
+    if isNotModified(request, etag):
+        return notModifiedResponse(etag)
 
-    jobId = request.data.get('jobId')
-    jobDetails = fetchJobFromDB(jobId)
+    jobDetails = fetchJobFromDB(jobId, as_fragment=settings.DASHBOARD_FAST_JSON)
     if(jobDetails == None):
         return Response({
             "ErrorMessage":"No Data found"
@@ -119,6 +455,42 @@ def getJobDetails(request):
     return Response({
         "data":jobDetails
         },
+        status = status.HTTP_200_OK,
+        headers = {"ETag": etag} if etag else None
+    )
+
+"""
+POST /dashboard/get-jobs-details
+Resolves up to 100 jobIds in one call, e.g. for a saved-jobs list or prefetching.
+Request
+{"jobIds":["abc123", "abb122", "zzz999"]}
+
+Response
+{
+    "data": {
+        "abc123": { ...same fields as get-job-details... },
+        "abb122": { ... }
+    },
+    "missingJobIds": ["zzz999"]
+}
+"""
+@api_view(['POST'])
+def getJobsDetails(request):
+    jobIds = request.data.get('jobIds')
+    if (not isinstance(jobIds, list)
+            or not all(isinstance(jobId, str) for jobId in jobIds)
+            or len(jobIds) > MAX_BATCH_JOB_IDS):
+        return Response({
+            "errorMessage": f"jobIds must be a list of at most {MAX_BATCH_JOB_IDS} job ids"
+        },
+        status=status.HTTP_400_BAD_REQUEST
+        )
+
+    jobsDetails, missingJobIds = fetchJobsFromDB(jobIds)
+    return Response({
+        "data": jobsDetails,
+        "missingJobIds": missingJobIds
+        },
         status = status.HTTP_200_OK
     )
 
@@ -127,6 +499,7 @@ def getSimilarJobs(request):
     """
     Request
     {"jobid":"abc123"}
+    optionally with "fields" and "snippetLength" as in get-jobs-list (without salary)
 
     Response
     {
@@ -144,26 +517,62 @@ def getSimilarJobs(request):
         ]
     }
     """
-    token = request.data.get('token')
-    if (not validate_token(token)):
+    jobId = parseJobId(request.data.get('jobId'))
+    try:
+        cardOptions = parseCardOptions(request.data, SIMILAR_CARD_FIELDS)
+    except ValueError as error:
         return Response({
-            "errorMessage": "NAVIGATE TO LOGIN"
+            "errorMessage": str(error)
         },
         status=status.HTTP_400_BAD_REQUEST
         )
 
-    jobId = request.data.get('jobId')
-    similarJobs = fetchSimilarJobs(jobId)
+    etag = similarJobsETag(request.data)
+    if isNotModified(request, etag):
+        return notModifiedResponse(etag)
+
+    similarJobs = fetchSimilarJobs(jobId, **cardOptions)
 
     return Response({
         "similarJobs": similarJobs
     },
-    status=status.HTTP_200_OK
+    status=status.HTTP_200_OK,
+    headers={"ETag": etag}
     )
 
-
-@staticmethod
-def validate_token(token:str):
-    if(token == 'abc'):
-        return True
-    return False
+"""
+GET /dashboard/internal/stats
+Request timings and cache counters aggregated by this worker process since it started.
+Response
+{
+    "endpoints": {
+        "POST /dashboard/get-jobs-list": {
+            "count": 120, "meanMs": 8.1, "p50Ms": 10, "p95Ms": 20, "p99Ms": 50,
+            "meanDbMs": 3.2, "queriesPerRequest": 2.0,
+            "histogram": {"le1ms": 0, "le2ms": 4, ..., "inf": 0}
+        },
+        ...
+    },
+    "jobDetailsCache": { ...same as getJobDetailsCacheStats()... },
+    "admission": {
+        "pools": {
+            "list": {"concurrency": 4, "queueSize": 32, "active": 1, "queueDepth": 0,
+                     "admitted": 118, "queued": 9, "rejectedQueueFull": 0, "rejectedTimeout": 2},
+            ...
+        },
+        "rateLimited": 3,
+        "trackedUsers": 12
+    }
+}
+Percentiles are histogram bucket bounds. "endpoints" stays empty while
+INSTRUMENTATION_ENABLED is off, and "admission" has no pools while ADMISSION_CONTROL_ENABLED is off.
+"""
+@api_view(['GET'])
+def getStats(request):
+    return Response({
+        "endpoints": getEndpointStats(),
+        "jobDetailsCache": getJobDetailsCacheStats(),
+        "admission": admission_control.stats()
+    },
+    status=status.HTTP_200_OK
+    )
@@ -21,8 +21,8 @@ export const getUserData = async (token: string) => {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
+            Authorization: `Bearer ${token}`,
         },
-        body: JSON.stringify({ token }),
     })
     const data = await response.json()
     if (response.ok) {
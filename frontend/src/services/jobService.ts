@@ -1,6 +1,11 @@
 import { BASE_URL } from '../constants/apiConstants'
 import { removeToken } from '../utils/token'
 
+const authHeaders = (token?: string) => ({
+    'Content-Type': 'application/json',
+    ...(token ? { Authorization: `Bearer ${token}` } : {}),
+})
+
 const handleResponse = async (response: Response) => {
     const data = await response.json()
     if (response.ok) {
@@ -18,10 +23,8 @@ const handleResponse = async (response: Response) => {
 export const getJobsList = async (token?: string, minimumSalary?: number, employmentType?: string[], searchRoleName?: string, page_number: number = 1, page_size: number = 10) => {
     const response = await fetch(`${BASE_URL}/dashboard/get-jobs-list`, {
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ token, minimumSalary, employmentType, searchRoleName, page_number, page_size }),
+        headers: authHeaders(token),
+        body: JSON.stringify({ minimumSalary, employmentType, searchRoleName, page_number, page_size }),
     })
     return handleResponse(response)
 }
@@ -29,10 +32,8 @@ export const getJobsList = async (token?: string, minimumSalary?: number, employ
 export const getJobDetails = async (token?: string, jobId?: string) => {
     const response = await fetch(`${BASE_URL}/dashboard/get-job-details`, {
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ token, jobId }),
+        headers: authHeaders(token),
+        body: JSON.stringify({ jobId }),
     })
     return handleResponse(response)
 }
@@ -40,10 +41,8 @@ export const getJobDetails = async (token?: string, jobId?: string) => {
 export const getSimilarJobs = async (token?: string, jobId?: string) => {
     const response = await fetch(`${BASE_URL}/dashboard/get-similar-jobs`, {
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ token, jobId }),
+        headers: authHeaders(token),
+        body: JSON.stringify({ jobId }),
     })
     return handleResponse(response)
 }
@@ -1,3 +1,87 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 
-# Create your tests here.
+from config import api_settings
+from .tokens import issueToken, verifyToken
+
+
+class TokenAuthenticationTests(TestCase):
+
+    def login(self):
+        response = self.client.post(
+            '/login/validate-user',
+            {"username": "rahul", "password": "rahul@2021"},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["token"]
+
+    def test_login_issues_a_verifiable_token(self):
+        token = self.login()
+
+        self.assertEqual(verifyToken(token), {"sub": "rahul"})
+        response = self.client.post('/login/get_user_data', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+
+    def test_tampered_and_expired_tokens_are_rejected(self):
+        token = issueToken("rahul")
+
+        self.assertIsNone(verifyToken(token[:-2] + 'xx'))
+        self.assertIsNone(verifyToken('abc'))
+        with override_settings(AUTH_TOKEN_MAX_AGE=-1):
+            self.assertIsNone(verifyToken(token))
+
+    def test_rejects_before_parsing_the_body_or_querying(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/dashboard/get-jobs-list',
+                'not json',
+                content_type='application/json',
+                HTTP_AUTHORIZATION='Bearer forged'
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errorMessage": "NAVIGATE TO LOGIN"})
+        self.assertEqual(len(queries), 0)
+
+    def test_body_token_is_only_accepted_when_enabled(self):
+        response = self.client.post(
+            '/login/get_user_data', {"token": self.login()}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        with override_settings(AUTH_ACCEPT_BODY_TOKEN=True):
+            response = self.client.post(
+                '/login/get_user_data', {"token": self.login()}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(
+    MIDDLEWARE=api_settings.MIDDLEWARE,
+    REST_FRAMEWORK=api_settings.REST_FRAMEWORK,
+    TEMPLATES=api_settings.TEMPLATES,
+)
+class ApiSettingsProfileTests(TestCase):
+
+    def test_login_works_without_sessions_or_auth(self):
+        response = self.client.post(
+            '/login/validate-user',
+            {"username": "rahul", "password": "rahul@2021"},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.cookies)
+
+        token = response.json()["token"]
+        response = self.client.post('/login/get_user_data', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "Rahul")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+
+    def test_unauthenticated_calls_are_still_rejected(self):
+        response = self.client.post('/dashboard/get-jobs-list', {}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errorMessage": "NAVIGATE TO LOGIN"})
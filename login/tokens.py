@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core import signing
+
+# Keeps these tokens from validating anything else signed with SECRET_KEY
+TOKEN_SALT = 'login.tokens'
+
+
+def issueToken(username):
+    """
+    Returns a stateless token for username: an HMAC-signed, timestamped payload
+    that verifyToken can check without any database or cache lookup.
+    """
+    return signing.dumps({"sub": username}, salt=TOKEN_SALT, compress=True)
+
+
+def verifyToken(token):
+    """
+    Returns the payload of a valid, unexpired token, or None.
+    """
+    if not token or not isinstance(token, str):
+        return None
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=settings.AUTH_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
@@ -3,6 +3,9 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
+from django.conf import settings
+
+from .tokens import issueToken
 
 
 @api_view(['POST'])
@@ -10,7 +13,8 @@ def login_view(request):
     """
     POST /login/
     Body: {"username": "...", "password": "..."]
-    Response: {"validuser":true, "token":"xyz"}
+    Response: {"validuser":true, "token":"xyz", "expiresIn": 86400}
+    The token is signed and expiring; send it back as "Authorization: Bearer <token>".
     """
     username = request.data.get('username')
     password = request.data.get('password')
@@ -18,7 +22,8 @@ def login_view(request):
     if(username == 'rahul' and password == 'rahul@2021'):
         return Response({
             "validuser":True,
-            "token":'abc'
+            "token":issueToken(username),
+            "expiresIn":settings.AUTH_TOKEN_MAX_AGE
         },
         status=status.HTTP_200_OK
         )
@@ -29,25 +34,9 @@ def login_view(request):
 
 @api_view(['POST'])
 def get_user_data(request):
-    token = request.data.get('token')
-    if (not validate_token(token)):
-        return Response({
-            "errorMessage": "NAVIGATE TO LOGIN"
-        },
-        status=status.HTTP_400_BAD_REQUEST
-        )
+    # The token was already verified by login.middleware.TokenAuthenticationMiddleware
     return Response({
         "name":"Rahul",
         "position":"Lead Software Devloper and AI-ML Expert",
         "avatar_url":"imageLink"
     })
-
-
-
-@staticmethod
-def validate_token(token:str):
-    if(token == 'abc'):
-        return True
-    return False
-
-